@@ -0,0 +1,132 @@
+"""Micro-benchmark: decode cost of /process-candidate push envelopes by message size.
+
+Compares the previous multi-pass path (FastAPI json.loads + model, base64,
+json.loads, EventPayload, ApplicationUpsertedData) with the single-pass
+decoder in ``scoring.api.envelope``.
+
+    python benchmarks/bench_decode.py
+    python benchmarks/bench_decode.py --sizes 1024 65536 --json decode.json
+"""
+
+import argparse
+import base64
+import json
+import timeit
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from scoring.api.envelope import decode_envelope, decode_upserted_data
+from scoring.models import (
+    ApplicationUpsertedData,
+    EventAttributes,
+    EventPayload,
+    PubSubEnvelope,
+)
+
+DEFAULT_SIZES = [512, 4 * 1024, 32 * 1024, 256 * 1024]
+
+
+def build_body(target_bytes: int) -> bytes:
+    """Build a push request body whose decoded payload is roughly ``target_bytes``."""
+    after = {
+        "application_id": "app-1",
+        "candidate_id": "cand-1",
+        "vacancy_id": "vac-1",
+        "files": {
+            "resume": {"external_storage": {"gcs_uri": "gs://bucket/ws/cand-1/resume.pdf"}},
+        },
+        "created_at": "2026-01-27T13:52:56Z",
+        "updated_at": "2026-01-27T13:52:56Z",
+    }
+    payload = {"data": {"before": None, "after": after}, "error": None}
+    i = 0
+    while len(json.dumps(payload)) < target_bytes:
+        after["files"][f"attachment_{i}"] = {
+            "name": f"attachment-{i}.pdf",
+            "mime_type": "application/pdf",
+            "external_storage": {"gcs_uri": f"gs://bucket/ws/cand-1/attachment-{i}.pdf"},
+        }
+        i += 1
+    now = datetime.now(UTC).isoformat()
+    envelope = {
+        "message": {
+            "data": base64.b64encode(json.dumps(payload).encode()).decode(),
+            "attributes": {
+                "event_id": str(uuid4()),
+                "event_type": "uats.application.upserted",
+                "status": "success",
+                "workspace_id": "ws-1",
+                "timestamp": now,
+                "source_service": "bench",
+            },
+            "messageId": "msg-1",
+            "publishTime": now,
+        },
+        "subscription": "projects/bench/subscriptions/bench",
+    }
+    return json.dumps(envelope).encode()
+
+
+def decode_multi_pass(body: bytes) -> ApplicationUpsertedData:
+    envelope = PubSubEnvelope(**json.loads(body))
+    EventAttributes.from_pubsub_attributes(envelope.message.attributes)
+    raw = base64.b64decode(envelope.message.data)
+    event_payload = EventPayload(**json.loads(raw))
+    return ApplicationUpsertedData(**(event_payload.data or {}))
+
+
+def decode_single_pass(body: bytes) -> ApplicationUpsertedData:
+    envelope = decode_envelope(body)
+    EventAttributes.from_pubsub_attributes(envelope.message.attributes)
+    return decode_upserted_data(envelope.message.data)
+
+
+def _per_call_us(fn, body: bytes, min_time: float) -> float:
+    timer = timeit.Timer(lambda: fn(body))
+    number, _ = timer.autorange()
+    repeats = max(3, int(min_time / 0.2))
+    best = min(timer.repeat(repeat=repeats, number=number))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Approximate decoded payload sizes in bytes",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="Seconds to spend per measurement"
+    )
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'size':>10} {'body':>10} {'multi-pass us':>14} {'single-pass us':>15} {'speedup':>8}")
+    for size in args.sizes:
+        body = build_body(size)
+        assert decode_multi_pass(body) == decode_single_pass(body)
+        multi = _per_call_us(decode_multi_pass, body, args.min_time)
+        single = _per_call_us(decode_single_pass, body, args.min_time)
+        rows.append(
+            {
+                "payload_bytes": size,
+                "body_bytes": len(body),
+                "multi_pass_us": round(multi, 2),
+                "single_pass_us": round(single, 2),
+                "speedup": round(multi / single, 2),
+            }
+        )
+        print(f"{size:>10} {len(body):>10} {multi:>14.1f} {single:>15.1f} {multi / single:>7.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "decode", "results": rows}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
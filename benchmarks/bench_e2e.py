@@ -0,0 +1,316 @@
+"""End-to-end throughput benchmark for the scoring service.
+
+Drives the real FastAPI app (``scoring.main:app``) in-process through
+/process-candidate, /score and /scores, with Firestore, Gemini and Pub/Sub
+replaced by the latency-simulating fakes in ``fakes.py``. Reports requests per
+second, p50/p95/p99 latency per endpoint and event-loop lag, and writes the
+results as JSON so runs can be compared over time.
+
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --scenario mixed --concurrency 50 --requests 2000 \\
+        --llm-latency 2000:9000 --resume-kb 32 --output results/e2e.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import httpx
+import structlog
+from fakes import (
+    FakeFirestoreStore,
+    FakeLLMBackend,
+    FakePublisherClient,
+    LatencyDistribution,
+)
+
+from scoring.config import Settings
+from scoring.main import app
+from scoring.models import ScoringResult
+from scoring.services.llm_backend import SimulatedGeminiBackend
+from scoring.services.lru import LRUCache
+
+SCENARIOS = {
+    "process-candidate": {"process-candidate": 1.0},
+    "score": {"score": 1.0},
+    "scores": {"scores": 1.0},
+    "mixed": {"process-candidate": 0.7, "score": 0.1, "scores": 0.2},
+}
+
+WORKSPACES = [f"ws-{i}" for i in range(5)]
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(values: list[float]) -> dict:
+    values = sorted(values)
+    return {
+        "p50_ms": round(_percentile(values, 50), 2),
+        "p95_ms": round(_percentile(values, 95), 2),
+        "p99_ms": round(_percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+    }
+
+
+def build_envelope(workspace_id: str, extra_files: int) -> dict:
+    application_id = f"app-{uuid4().hex[:12]}"
+    files = {
+        f"attachment_{i}": {"external_storage": {"gcs_uri": f"gs://bench/{application_id}/{i}"}}
+        for i in range(extra_files)
+    }
+    payload = {
+        "data": {
+            "before": None,
+            "after": {
+                "application_id": application_id,
+                "candidate_id": f"cand-{random.randint(0, 9999)}",
+                "vacancy_id": f"vac-{random.randint(0, 99)}",
+                "files": files or None,
+            },
+        },
+        "error": None,
+    }
+    now = datetime.now(UTC).isoformat()
+    return {
+        "message": {
+            "data": base64.b64encode(json.dumps(payload).encode()).decode(),
+            "attributes": {
+                "event_id": str(uuid4()),
+                "event_type": "uats.application.upserted",
+                "status": "success",
+                "workspace_id": workspace_id,
+                "timestamp": now,
+                "source_service": "bench",
+            },
+            "messageId": application_id,
+            "publishTime": now,
+        },
+        "subscription": "projects/bench/subscriptions/bench",
+    }
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, args) -> httpx.Response:
+    workspace_id = random.choice(WORKSPACES)
+    if endpoint == "process-candidate":
+        return await client.post(
+            "/process-candidate", json=build_envelope(workspace_id, args.extra_files)
+        )
+    if endpoint == "score":
+        return await client.post(
+            "/score",
+            json={
+                "workspace_id": workspace_id,
+                "candidate_reference_id": f"cand-{random.randint(0, 9999)}",
+                "vacancy_reference_id": f"vac-{random.randint(0, 99)}",
+                "application_id": f"app-{uuid4().hex[:12]}",
+            },
+        )
+    return await client.get("/scores", params={"workspace_id": workspace_id, "limit": 50})
+
+
+async def monitor_loop_lag(samples: list[float], interval: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+def seed_results(store: FakeFirestoreStore, per_workspace: int) -> None:
+    for workspace_id in WORKSPACES:
+        for i in range(per_workspace):
+            store.results[(workspace_id, f"seed-{i}")] = ScoringResult(
+                application_id=f"seed-{i}",
+                candidate_id=f"cand-{i}",
+                vacancy_id=f"vac-{i % 100}",
+                workspace_id=workspace_id,
+                score=random.randint(0, 100),
+                reasoning="Seeded result.",
+                model="gemini-2.5-flash",
+                latency_ms=1000,
+                scored_at=datetime.now(UTC),
+            )
+
+
+async def run(args) -> dict:
+    store = FakeFirestoreStore(
+        read_latency=args.firestore_read_latency,
+        write_latency=args.firestore_write_latency,
+        resume_bytes=args.resume_kb * 1024,
+        vacancy_bytes=args.vacancy_kb * 1024,
+    )
+    seed_results(store, args.seed_results)
+
+    app.state.settings = Settings(
+        gcp_project_id="bench", gcs_bucket="bench", otel_enabled=False
+    )
+    app.state.firestore_client = None
+    # Synthetic candidates repeat, so the score cache is off unless asked for
+    app.state.score_cache_front = LRUCache(4096) if args.score_cache else None
+    app.state.publisher_client = FakePublisherClient(args.publish_latency)
+    if args.llm_backend == "simulated":
+        app.state.llm_backend = SimulatedGeminiBackend(app.state.settings)
+    else:
+        app.state.llm_backend = FakeLLMBackend(args.llm_latency, error_rate=args.llm_error_rate)
+
+    mix = SCENARIOS[args.scenario]
+    endpoints, weights = list(mix), list(mix.values())
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    lag_samples: list[float] = []
+    remaining = args.requests
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            endpoint = random.choices(endpoints, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await send(client, endpoint, args)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            statuses[endpoint][status] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("scoring.api.dependencies.FirestoreRepository", store.repository):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            stop = asyncio.Event()
+            lag_task = asyncio.create_task(monitor_loop_lag(lag_samples, 0.01, stop))
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await lag_task
+
+    per_endpoint = {}
+    for endpoint, values in latencies.items():
+        ok = sum(n for s, n in statuses[endpoint].items() if s.startswith("2"))
+        per_endpoint[endpoint] = {
+            "requests": len(values),
+            "errors": len(values) - ok,
+            "statuses": dict(statuses[endpoint]),
+            "rps": round(len(values) / elapsed, 2),
+            **summarize(values),
+        }
+    all_values = [v for values in latencies.values() for v in values]
+    return {
+        "overall": {
+            "requests": len(all_values),
+            "elapsed_s": round(elapsed, 3),
+            "rps": round(len(all_values) / elapsed, 2),
+            **summarize(all_values),
+        },
+        "endpoints": per_endpoint,
+        "event_loop_lag": summarize(lag_samples),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="process-candidate")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--resume-kb", type=int, default=4, help="Inline resume text size")
+    parser.add_argument("--vacancy-kb", type=int, default=4, help="Vacancy description size")
+    parser.add_argument(
+        "--extra-files", type=int, default=0, help="Extra file entries per push message"
+    )
+    parser.add_argument(
+        "--seed-results", type=int, default=200, help="Stored results per workspace for /scores"
+    )
+    latency = LatencyDistribution.parse
+    parser.add_argument(
+        "--llm-latency", type=latency, default=latency("200:1000"), metavar="MEDIAN[:P99]"
+    )
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--score-cache", action="store_true", help="Reuse scores for identical LLM inputs"
+    )
+    parser.add_argument(
+        "--llm-backend",
+        choices=["fake", "simulated"],
+        default="fake",
+        help="fake: --llm-latency distribution; simulated: LLM_SIM_* settings",
+    )
+    parser.add_argument(
+        "--firestore-read-latency", type=latency, default=latency("5:30"), metavar="MEDIAN[:P99]"
+    )
+    parser.add_argument(
+        "--firestore-write-latency", type=latency, default=latency("10:50"), metavar="MEDIAN[:P99]"
+    )
+    parser.add_argument(
+        "--publish-latency", type=latency, default=latency("5:40"), metavar="MEDIAN[:P99]"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--output", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    results = asyncio.run(run(args))
+    report = {
+        "benchmark": "e2e",
+        "started_at": datetime.now(UTC).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            k: v.to_dict() if isinstance(v, LatencyDistribution) else v
+            for k, v in vars(args).items()
+            if k != "output"
+        },
+        **results,
+    }
+
+    overall = results["overall"]
+    print(
+        f"{args.scenario}: {overall['requests']} requests in {overall['elapsed_s']}s "
+        f"-> {overall['rps']} req/s"
+    )
+    print(f"{'endpoint':<20} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for endpoint, stats in results["endpoints"].items():
+        print(
+            f"{endpoint:<20} {stats['rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+            f"{stats['p99_ms']:>8} {stats['errors']:>7}"
+        )
+    lag = results["event_loop_lag"]
+    print(f"event loop lag: p50={lag['p50_ms']}ms p99={lag['p99_ms']}ms max={lag['max_ms']}ms")
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
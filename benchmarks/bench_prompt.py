@@ -0,0 +1,91 @@
+"""Micro-benchmark: per-call prompt and generation config assembly by vacancy size.
+
+Compares building the vacancy section and ``GenerateContentConfig`` on every
+call (the cache is cleared first) with the memoized path that
+``LLMService.score_candidate`` takes once a vacancy has been seen.
+
+    python benchmarks/bench_prompt.py
+    python benchmarks/bench_prompt.py --sizes 2048 65536 --json prompt.json
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("GCP_PROJECT_ID", "bench-project")
+os.environ.setdefault("GCS_BUCKET", "bench-bucket")
+
+from fakes import make_ats_documents, make_candidate, make_vacancy  # noqa: E402
+
+from scoring.services import prompt  # noqa: E402
+from scoring.services.llm import generation_config  # noqa: E402
+
+DEFAULT_SIZES = [1024, 8 * 1024, 32 * 1024, 128 * 1024]
+
+
+def assemble_uncached(candidate, vacancy, docs) -> str:
+    prompt._vacancy_sections.clear()
+    generation_config.cache_clear()
+    generation_config(0.1, 4096, 1024, "2-4")
+    return prompt.build_user_prompt(candidate, vacancy, docs)
+
+
+def assemble_cached(candidate, vacancy, docs) -> str:
+    generation_config(0.1, 4096, 1024, "2-4")
+    section = prompt.render_vacancy_section(vacancy)
+    return prompt.build_user_prompt(candidate, vacancy, docs, section)
+
+
+def _per_call_us(fn, args: tuple, min_time: float) -> float:
+    timer = timeit.Timer(lambda: fn(*args))
+    number, _ = timer.autorange()
+    repeats = max(3, int(min_time / 0.2))
+    best = min(timer.repeat(repeat=repeats, number=number))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Approximate vacancy description sizes in bytes",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="Seconds to spend per measurement"
+    )
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    candidate = make_candidate("cand-1", "ws-1")
+    docs = make_ats_documents(4 * 1024)
+
+    rows = []
+    print(f"{'size':>10} {'uncached us':>12} {'cached us':>10} {'speedup':>8}")
+    for size in args.sizes:
+        vacancy = make_vacancy("vac-1", "ws-1", size)
+        call_args = (candidate, vacancy, docs)
+        assert assemble_uncached(*call_args) == assemble_cached(*call_args)
+        uncached = _per_call_us(assemble_uncached, call_args, args.min_time)
+        cached = _per_call_us(assemble_cached, call_args, args.min_time)
+        rows.append(
+            {
+                "vacancy_bytes": size,
+                "uncached_us": round(uncached, 2),
+                "cached_us": round(cached, 2),
+                "speedup": round(uncached / cached, 2),
+            }
+        )
+        print(f"{size:>10} {uncached:>12.1f} {cached:>10.1f} {uncached / cached:>7.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "prompt", "results": rows}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cold-start benchmark: time to import scoring.main in fresh interpreters.
+
+Also reports, for one run, which heavy modules were already loaded by the
+import (they should all be deferred to lifespan).
+
+    python benchmarks/bench_startup.py --runs 10 --json startup.json
+
+For the full lifespan breakdown (module imports and client init) start the
+service with STARTUP_PROFILE=true and read the ``startup_profile`` log line.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "google.genai",
+    "google.cloud.firestore",
+    "google.cloud.pubsub_v1",
+    "opentelemetry.sdk.trace",
+    "opentelemetry.exporter.cloud_trace",
+    "opentelemetry.exporter.cloud_monitoring",
+]
+
+_PROBE = f"""
+import sys, time, json
+start = time.perf_counter()
+import scoring.main
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"import_ms": elapsed, "loaded": loaded}}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    env = {"GCP_PROJECT_ID": "bench", "GCS_BUCKET": "bench", "OTEL_ENABLED": "false"}
+    env.update(os.environ)
+    samples = []
+    loaded: list[str] = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True, env=env
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["import_ms"])
+        loaded = result["loaded"]
+
+    summary = {
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(samples), 1),
+        "import_ms_min": round(min(samples), 1),
+        "import_ms_max": round(max(samples), 1),
+        "heavy_modules_loaded_at_import": loaded,
+    }
+    print(
+        f"import scoring.main: median {summary['import_ms_median']}ms "
+        f"(min {summary['import_ms_min']}, max {summary['import_ms_max']}) over {args.runs} runs"
+    )
+    print(f"heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "startup", **summary}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
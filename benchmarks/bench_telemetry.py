@@ -0,0 +1,220 @@
+"""Telemetry overhead benchmark: CPU time per request with tracing off and on.
+
+Drives the real FastAPI app through /process-candidate, as ``bench_e2e.py``
+does, once per sampling configuration, each in a fresh interpreter (a
+process has one global tracer provider):
+
+    off        no tracer provider, no request instrumentation
+    always-on  every trace exported (OTEL_TRACE_SAMPLE_RATIO=1)
+    ratio      --ratio of traces exported
+    tail       --ratio, plus traces slower than --tail-latency-ms or failed
+
+Spans are exported through the service's batch span processor to an exporter
+that serializes them to JSON and discards them, a stand-in for the encoding
+work of the Cloud Trace and OTLP exporters. CPU time is the whole process's,
+so it includes the exporter thread.
+
+    python benchmarks/bench_telemetry.py
+    python benchmarks/bench_telemetry.py --requests 5000 --ratio 0.05 --output results/otel.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import structlog
+from bench_e2e import _git_revision, build_envelope
+from fakes import FakeFirestoreStore, FakeLLMBackend, FakePublisherClient, LatencyDistribution
+
+CONFIGS = ["off", "always-on", "ratio", "tail"]
+
+
+def _settings_overrides(config: str, args) -> dict:
+    if config == "always-on":
+        return {"otel_trace_sample_ratio": 1.0}
+    if config == "ratio":
+        return {"otel_trace_sample_ratio": args.ratio}
+    return {
+        "otel_trace_sample_ratio": args.ratio,
+        "otel_tail_sampling": True,
+        "otel_tail_latency_ms": args.tail_latency_ms,
+    }
+
+
+async def measure(config: str, args) -> dict:
+    """Runs in the child process: one configuration, reported as one JSON line."""
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    from scoring.config import Settings
+    from scoring.main import app
+    from scoring.observability.sampling import build_sampler
+    from scoring.observability.setup import instrument_app, span_processor
+
+    class SerializingExporter(SpanExporter):
+        def __init__(self) -> None:
+            self.spans = 0
+            self.bytes = 0
+
+        def export(self, spans: Sequence) -> SpanExportResult:
+            for span in spans:
+                self.bytes += len(span.to_json(indent=None))
+            self.spans += len(spans)
+            return SpanExportResult.SUCCESS
+
+    settings = Settings(gcp_project_id="bench", gcs_bucket="bench", otel_enabled=False)
+    exporter = SerializingExporter()
+    provider = None
+    if config != "off":
+        settings = settings.model_copy(update=_settings_overrides(config, args))
+        provider = TracerProvider(sampler=build_sampler(settings))
+        provider.add_span_processor(span_processor(settings, exporter))
+        trace.set_tracer_provider(provider)
+        instrument_app(app, settings, provider)
+
+    store = FakeFirestoreStore(
+        read_latency=LatencyDistribution(), write_latency=LatencyDistribution()
+    )
+    app.state.settings = settings
+    app.state.firestore_client = None
+    app.state.score_cache_front = None
+    app.state.publisher_client = FakePublisherClient(LatencyDistribution())
+    app.state.llm_backend = FakeLLMBackend(args.llm_latency, error_rate=args.llm_error_rate)
+
+    remaining = args.warmup
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await client.post("/process-candidate", json=build_envelope("ws-0", 0))
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("scoring.api.dependencies.FirestoreRepository", store.repository):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            if provider is not None:
+                provider.force_flush()
+            exporter.spans = exporter.bytes = 0
+
+            remaining = args.requests
+            cpu_started, started = time.process_time(), time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            if provider is not None:
+                provider.force_flush()
+            cpu_s = time.process_time() - cpu_started
+            elapsed = time.perf_counter() - started
+
+    return {
+        "config": config,
+        "requests": args.requests,
+        "elapsed_s": round(elapsed, 3),
+        "cpu_us_per_request": round(cpu_s / args.requests * 1_000_000, 1),
+        "spans_exported": exporter.spans,
+        "spans_per_request": round(exporter.spans / args.requests, 2),
+        "export_bytes_per_request": round(exporter.bytes / args.requests),
+    }
+
+
+def run_config(config: str, args) -> dict:
+    latency = args.llm_latency
+    argv = [
+        f"--requests={args.requests}",
+        f"--warmup={args.warmup}",
+        f"--concurrency={args.concurrency}",
+        f"--ratio={args.ratio}",
+        f"--tail-latency-ms={args.tail_latency_ms}",
+        f"--llm-latency={latency.median_ms}:{latency.p99_ms}",
+        f"--llm-error-rate={args.llm_error_rate}",
+        f"--child={config}",
+    ]
+    if args.seed is not None:
+        argv.append(f"--seed={args.seed}")
+    env = {"GCP_PROJECT_ID": "bench", "GCS_BUCKET": "bench"}
+    env.update(os.environ)
+    out = subprocess.run(
+        [sys.executable, __file__, *argv],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--ratio", type=float, default=0.1, help="Head sampling ratio")
+    parser.add_argument(
+        "--tail-latency-ms", type=float, default=100.0, help="Tail retention latency threshold"
+    )
+    latency = LatencyDistribution.parse
+    parser.add_argument(
+        "--llm-latency", type=latency, default=latency("2:40"), metavar="MEDIAN[:P99]"
+    )
+    parser.add_argument("--llm-error-rate", type=float, default=0.01)
+    parser.add_argument("--configs", nargs="+", choices=CONFIGS, default=CONFIGS)
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--output", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--child", choices=CONFIGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.child, args))))
+        return
+
+    results = [run_config(config, args) for config in args.configs]
+    baseline = next((r for r in results if r["config"] == "off"), None)
+    print(f"{'config':<10} {'cpu us/req':>11} {'overhead':>9} {'spans/req':>10} {'bytes/req':>10}")
+    for result in results:
+        overhead = ""
+        if baseline is not None:
+            extra = result["cpu_us_per_request"] - baseline["cpu_us_per_request"]
+            result["overhead_us_per_request"] = round(extra, 1)
+            overhead = f"{extra:+.1f}"
+        print(
+            f"{result['config']:<10} {result['cpu_us_per_request']:>11} {overhead:>9} "
+            f"{result['spans_per_request']:>10} {result['export_bytes_per_request']:>10}"
+        )
+
+    if args.output:
+        report = {
+            "benchmark": "telemetry",
+            "started_at": datetime.now(UTC).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "config": {
+                k: v.to_dict() if isinstance(v, LatencyDistribution) else v
+                for k, v in vars(args).items()
+                if k not in ("output", "child")
+            },
+            "results": results,
+        }
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
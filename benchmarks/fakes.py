@@ -0,0 +1,261 @@
+"""In-process fakes for Firestore, Gemini and Pub/Sub used by the benchmarks.
+
+Each fake waits on a ``LatencyDistribution`` instead of the network, so the
+real FastAPI app, ScoringService, LLMService and EventPublisher can be driven
+at high concurrency without GCP access.
+"""
+
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from scoring.models import (
+    ATSCandidate,
+    AtsDocuments,
+    ATSVacancy,
+    ATSVacancyAddress,
+    CachedScore,
+    CandidateJob,
+    DocumentFile,
+    ScoringResult,
+)
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.326
+
+
+@dataclass
+class LatencyDistribution:
+    """Log-normal latency described by its median and p99, in milliseconds."""
+
+    median_ms: float = 0.0
+    p99_ms: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse ``"MEDIAN"`` or ``"MEDIAN:P99"`` (milliseconds)."""
+        median, _, p99 = spec.partition(":")
+        return cls(float(median), float(p99 or median))
+
+    def sample_ms(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        if self.p99_ms <= self.median_ms:
+            return self.median_ms
+        sigma = math.log(self.p99_ms / self.median_ms) / _Z99
+        return random.lognormvariate(math.log(self.median_ms), sigma)
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample_ms() / 1000)
+
+    def wait_blocking(self) -> None:
+        time.sleep(self.sample_ms() / 1000)
+
+    def to_dict(self) -> dict:
+        return {"median_ms": self.median_ms, "p99_ms": self.p99_ms}
+
+
+def make_candidate(candidate_id: str, workspace_id: str) -> ATSCandidate:
+    return ATSCandidate(
+        id=candidate_id,
+        name=f"Candidate {candidate_id}",
+        email=f"{candidate_id}@example.com",
+        phone="+31612345678",
+        address="Amsterdam, Netherlands",
+        job=CandidateJob(title="Verpleegkundige", company="Zorggroep West"),
+        workspace_id=workspace_id,
+    )
+
+
+def make_vacancy(vacancy_id: str, workspace_id: str, description_bytes: int) -> ATSVacancy:
+    sentence = "Wij zoeken een gemotiveerde collega voor ons team in de regio Westland. "
+    return ATSVacancy(
+        id=vacancy_id,
+        title=f"Vacancy {vacancy_id}",
+        description=(sentence * (description_bytes // len(sentence) + 1))[:description_bytes],
+        hard_requirements="BIG registratie, MBO4 Tandartsassistent",
+        soft_requirements="Teamplayer, communicatief sterk",
+        about_company="Moderne tandartspraktijk in het Westland",
+        address=ATSVacancyAddress(city="Westland", country="Netherlands"),
+        status="open",
+        workspace_id=workspace_id,
+    )
+
+
+def make_ats_documents(resume_bytes: int) -> AtsDocuments:
+    line = "2019-2025 Verpleegkundige, Zorggroep West. Verantwoordelijk voor patientenzorg. "
+    return AtsDocuments(
+        resume=(line * (resume_bytes // len(line) + 1))[:resume_bytes],
+        assessment="Kandidaat zoekt werk in ouderenzorg, beschikbaar per direct.",
+    )
+
+
+class FakeFirestoreRepository:
+    """In-memory stand-in for ``FirestoreRepository``.
+
+    Candidates, vacancies and documents are synthesized on demand; scoring
+    results are kept in a dict shared by every instance created from the same
+    ``FakeFirestoreStore``.
+    """
+
+    def __init__(self, store: "FakeFirestoreStore") -> None:
+        self._store = store
+
+    async def get_candidate(self, workspace_id: str, candidate_reference_id: str) -> ATSCandidate:
+        await self._store.read_latency.wait()
+        return make_candidate(candidate_reference_id, workspace_id)
+
+    async def get_vacancy(self, workspace_id: str, vacancy_reference_id: str) -> ATSVacancy:
+        await self._store.read_latency.wait()
+        return make_vacancy(vacancy_reference_id, workspace_id, self._store.vacancy_bytes)
+
+    async def get_ats_documents(
+        self, workspace_id: str, candidate_reference_id: str
+    ) -> AtsDocuments:
+        await self._store.read_latency.wait()
+        return self._store.ats_documents
+
+    async def get_ats_document_file_uris(
+        self, workspace_id: str, candidate_reference_id: str
+    ) -> list[str]:
+        await self._store.read_latency.wait()
+        return []
+
+    async def get_ats_documents_and_files(
+        self, workspace_id: str, candidate_reference_id: str
+    ) -> tuple[AtsDocuments, list[DocumentFile]]:
+        await self._store.read_latency.wait()
+        return self._store.ats_documents, []
+
+    async def save_scoring_result(self, result: ScoringResult) -> str:
+        await self._store.write_latency.wait()
+        self._store.results[(result.workspace_id, result.application_id)] = result
+        return result.application_id
+
+    async def get_scoring_result(self, workspace_id: str, application_id: str) -> ScoringResult:
+        await self._store.read_latency.wait()
+        try:
+            return self._store.results[(workspace_id, application_id)]
+        except KeyError:
+            raise ValueError(
+                f"Scoring result for application {application_id} "
+                f"not found in workspace {workspace_id}"
+            )
+
+    async def query_scoring_results(
+        self,
+        workspace_id: str,
+        candidate_id: str | None = None,
+        vacancy_id: str | None = None,
+        limit: int = 50,
+    ) -> list[ScoringResult]:
+        await self._store.read_latency.wait()
+        results = [
+            r
+            for (ws, _), r in self._store.results.items()
+            if ws == workspace_id
+            and (candidate_id is None or r.candidate_id == candidate_id)
+            and (vacancy_id is None or r.vacancy_id == vacancy_id)
+        ]
+        results.sort(key=lambda r: r.scored_at, reverse=True)
+        return results[:limit]
+
+    async def get_cached_score(self, workspace_id: str, fingerprint: str) -> CachedScore | None:
+        await self._store.read_latency.wait()
+        return self._store.score_cache.get((workspace_id, fingerprint))
+
+    async def save_cached_score(self, workspace_id: str, entry: CachedScore) -> None:
+        await self._store.write_latency.wait()
+        self._store.score_cache[(workspace_id, entry.fingerprint)] = entry
+
+
+class FakeFirestoreStore:
+    def __init__(
+        self,
+        read_latency: LatencyDistribution,
+        write_latency: LatencyDistribution,
+        resume_bytes: int = 4096,
+        vacancy_bytes: int = 4096,
+    ) -> None:
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.vacancy_bytes = vacancy_bytes
+        self.ats_documents = make_ats_documents(resume_bytes)
+        self.results: dict[tuple[str, str], ScoringResult] = {}
+        self.score_cache: dict[tuple[str, str], CachedScore] = {}
+
+    def repository(self, *args, **kwargs) -> FakeFirestoreRepository:
+        """Drop-in for the ``FirestoreRepository(client=..., settings=...)`` constructor."""
+        return FakeFirestoreRepository(self)
+
+
+class FakeLLMBackend:
+    """``LLMBackend`` with a fixed latency distribution, independent of prompt size.
+
+    Prompt tokens are estimated at ~4 characters per token, as for Gemini.
+    """
+
+    def __init__(self, latency: LatencyDistribution, error_rate: float = 0.0) -> None:
+        self._latency = latency
+        self._error_rate = error_rate
+
+    async def warm_up(self) -> None:
+        pass
+
+    async def generate_content(self, model: str, contents: list, config) -> SimpleNamespace:
+        await self._latency.wait()
+        if self._error_rate and random.random() < self._error_rate:
+            raise RuntimeError("simulated Gemini error")
+        prompt_chars = sum(len(c) for c in contents if isinstance(c, str))
+        prompt_chars += len(config.system_instruction or "")
+        text = json.dumps(
+            {"score": random.randint(0, 100), "reasoning": "Simulated reasoning for benchmark."}
+        )
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = len(text) // 4
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                thoughts_token_count=None,
+                total_token_count=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class _FakeFuture:
+    def __init__(self, latency: LatencyDistribution, message_id: str) -> None:
+        self._latency = latency
+        self._message_id = message_id
+
+    def result(self, timeout: float | None = None) -> str:
+        # Blocks like the real future, so any event-loop stall shows up in the lag metric
+        self._latency.wait_blocking()
+        return self._message_id
+
+
+class FakePublisherClient:
+    """Stand-in for ``pubsub_v1.PublisherClient``."""
+
+    def __init__(self, latency: LatencyDistribution) -> None:
+        self._latency = latency
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def topic_path(self, project: str, topic: str) -> str:
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> _FakeFuture:
+        with self._lock:
+            self.published += 1
+            message_id = str(self.published)
+        return _FakeFuture(self._latency, message_id)
+
+    def resume_publish(self, topic: str, ordering_key: str) -> None:
+        pass
@@ -0,0 +1,78 @@
+"""Score many applications with one Gemini batch prediction job.
+
+Reads applications as JSONL, one {"workspace_id", "application_id",
+"candidate_reference_id", "vacancy_reference_id"} object per line (the
+/score request body). Prompts are compiled from Firestore exactly as for
+/score and submitted as one batch job; when it finishes, the results are
+validated, bulk-written to Firestore and announced with carv.score.calculated
+events. Uses the service's own configuration (.env and environment).
+
+Vertex jobs take minutes to hours. A job can be submitted without waiting and
+collected later by its ID. BATCH_BACKEND=local runs the job offline under
+BATCH_LOCAL_DIR instead, with simulated responses.
+
+Examples:
+  # submit, wait and write the results
+  python scripts/batch_score.py applications.jsonl --name ws-1-backfill
+
+  # submit only, then collect later
+  python scripts/batch_score.py applications.jsonl --no-wait
+  python scripts/batch_score.py --collect projects/.../batchPredictionJobs/123
+
+  # offline, against the Firestore emulator
+  BATCH_BACKEND=local FIRESTORE_EMULATOR_HOST=localhost:8086 \\
+      python scripts/batch_score.py applications.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import UTC, datetime
+
+from scoring.api.dependencies import build_batch_scorer
+from scoring.main import app, lifespan
+from scoring.models import BatchScoringRun, ScoreRequest
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", help="JSONL file of applications to score")
+    parser.add_argument("--name", default="scoring-batch", help="Batch job display name")
+    parser.add_argument(
+        "--no-wait", action="store_true", help="Submit the job and exit without collecting"
+    )
+    parser.add_argument("--collect", metavar="JOB_ID", help="Collect an earlier job")
+    args = parser.parse_args()
+    if not args.input and not args.collect:
+        parser.error("give an input file or --collect JOB_ID")
+    return args
+
+
+def _read_requests(path: str) -> list[ScoreRequest]:
+    with open(path) as f:
+        return [ScoreRequest.model_validate_json(line) for line in f if line.strip()]
+
+
+async def main() -> int:
+    args = _parse_args()
+    async with lifespan(app):
+        scorer = build_batch_scorer(app.state)
+        if args.collect:
+            run = BatchScoringRun(
+                job_id=args.collect, name=args.name, created_at=datetime.now(UTC)
+            )
+        else:
+            run = await scorer.submit(args.name, _read_requests(args.input))
+            print(f"Batch job {run.job_id}", file=sys.stderr)
+        if run.status == "running" and not args.no_wait:
+            run = await scorer.wait(run)
+            if run.status == "running":
+                run = await scorer.collect(run)
+
+    print(json.dumps(run.model_dump(mode="json"), indent=2))
+    return 1 if run.status == "failed" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
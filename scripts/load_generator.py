@@ -0,0 +1,363 @@
+"""Replay a synthetic uats.application.upserted stream at a target rate.
+
+Builds envelopes with test_local.build_envelope and fires them open-loop (a
+slow service does not slow the sender down) at a fixed or linearly ramping
+rate. The stream mixes workspaces (skewed, like real traffic), vacancies and
+candidates, plus duplicate redeliveries, deletions and irrelevant event types.
+
+Targets:
+  http    POST to the /process-candidate push endpoint and time each response
+  pubsub  publish to a topic on the Pub/Sub emulator (PUBSUB_EMULATOR_HOST) and
+          time each publish ack; processing latency is then on the service side
+
+Examples:
+  # 20 msg/s for 60s against a local service
+  python scripts/load_generator.py --rate 20 --duration 60
+
+  # ramp from 5 to 100 msg/s over 5 minutes, 20 workspaces, write a report
+  python scripts/load_generator.py --rate 5 --ramp-to 100 --duration 300 \\
+      --workspaces 20 --output load-report.json
+
+  # publish to the emulator topic the push subscription reads from
+  PUBSUB_EMULATOR_HOST=localhost:8085 python scripts/load_generator.py \\
+      --target pubsub --project carv-app-dev --topic carv-events-dev --rate 50
+
+Candidate and vacancy IDs are synthetic: run the service against seeded data
+or the simulated backends, otherwise scoring requests fail with 500s.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from test_local import build_envelope
+
+HISTOGRAM_BOUNDS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+@dataclass
+class TrafficMix:
+    workspaces: int = 5
+    vacancies_per_workspace: int = 20
+    candidates_per_workspace: int = 500
+    workspace_skew: float = 1.2
+    duplicate_rate: float = 0.05
+    deletion_rate: float = 0.02
+    irrelevant_rate: float = 0.1
+    files_rate: float = 0.5
+    bucket: str = "carv-dev-ats-candidate-documents"
+
+
+class EventStream:
+    """Generates envelopes according to a TrafficMix."""
+
+    IRRELEVANT = [
+        ("uats.application.deleted", "success"),
+        ("uats.candidate.upserted", "success"),
+        ("uats.application.upserted", "failure"),
+    ]
+
+    def __init__(self, mix: TrafficMix, rng: random.Random) -> None:
+        self._mix = mix
+        self._rng = rng
+        self._workspace_ids = [f"load-ws-{i:03d}" for i in range(mix.workspaces)]
+        # Zipf-like weights: a few large workspaces dominate, as in production
+        self._workspace_weights = [
+            1 / (rank + 1) ** mix.workspace_skew for rank in range(mix.workspaces)
+        ]
+        self._recent: list[dict] = []
+        self._sequence = 0
+
+    def next(self) -> tuple[str, dict]:
+        """Return (kind, envelope); kind is used to break down the report."""
+        mix, rng = self._mix, self._rng
+        if self._recent and rng.random() < mix.duplicate_rate:
+            return "duplicate", rng.choice(self._recent)
+
+        self._sequence += 1
+        workspace_id = rng.choices(self._workspace_ids, self._workspace_weights)[0]
+        candidate_id = f"cand-{rng.randrange(mix.candidates_per_workspace):05d}"
+        vacancy_id = f"vac-{rng.randrange(mix.vacancies_per_workspace):03d}"
+        files = None
+        if rng.random() < mix.files_rate:
+            files = {
+                "resume": {
+                    "external_storage": {
+                        "gcs_uri": f"gs://{mix.bucket}/{workspace_id}/{candidate_id}/resume.pdf"
+                    }
+                }
+            }
+
+        kind, event_type, status, deleted = "upsert", "uats.application.upserted", "success", False
+        roll = rng.random()
+        if roll < mix.irrelevant_rate:
+            kind = "irrelevant"
+            event_type, status = rng.choice(self.IRRELEVANT)
+        elif roll < mix.irrelevant_rate + mix.deletion_rate:
+            kind, deleted = "deletion", True
+
+        envelope = build_envelope(
+            application_id=f"load-{self._sequence:08d}",
+            candidate_id=candidate_id,
+            vacancy_id=vacancy_id,
+            workspace_id=workspace_id,
+            files=files,
+            event_type=event_type,
+            status=status,
+            deleted=deleted,
+            source_service="load-generator",
+        )
+        self._recent.append(envelope)
+        if len(self._recent) > 1000:
+            self._recent.pop(0)
+        return kind, envelope
+
+
+@dataclass
+class Report:
+    latencies_ms: list[float] = field(default_factory=list)
+    outcomes: Counter = field(default_factory=Counter)
+    kinds: Counter = field(default_factory=Counter)
+    sent: int = 0
+    dropped: int = 0
+
+    def record(self, kind: str, outcome: str, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.outcomes[outcome] += 1
+        self.kinds[kind] += 1
+
+    def histogram(self) -> list[tuple[str, int]]:
+        buckets = Counter()
+        for value in self.latencies_ms:
+            for bound in HISTOGRAM_BOUNDS_MS:
+                if value <= bound:
+                    buckets[f"<={bound}ms"] += 1
+                    break
+            else:
+                buckets[f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] += 1
+        labels = [f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+        return [(label, buckets[label]) for label in labels]
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        values = sorted(self.latencies_ms)
+        return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+    def to_dict(self, elapsed_s: float) -> dict:
+        return {
+            "sent": self.sent,
+            "completed": len(self.latencies_ms),
+            "dropped": self.dropped,
+            "elapsed_s": round(elapsed_s, 3),
+            "achieved_rate": round(self.sent / elapsed_s, 2) if elapsed_s else 0.0,
+            "latency_ms": {f"p{q}": round(self.percentile(q), 2) for q in (50, 90, 95, 99)},
+            "histogram": dict(self.histogram()),
+            "outcomes": dict(self.outcomes),
+            "kinds": dict(self.kinds),
+        }
+
+
+def classify_http(response: httpx.Response) -> str:
+    if response.status_code == 200:
+        try:
+            body = response.json()
+        except ValueError:
+            return "http 200 (non-json)"
+        if body.get("status") == "skipped":
+            return f"skipped: {body.get('reason')}"
+        return body.get("status", "ok")
+    return f"http {response.status_code}"
+
+
+class HttpTarget:
+    def __init__(self, url: str, timeout: float, max_in_flight: int) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_in_flight),
+        )
+
+    async def send(self, envelope: dict) -> str:
+        return classify_http(await self._client.post("/process-candidate", json=envelope))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class PubSubTarget:
+    def __init__(self, project: str, topic: str) -> None:
+        from google.cloud import pubsub_v1
+
+        if not os.environ.get("PUBSUB_EMULATOR_HOST"):
+            print("Refusing to publish: PUBSUB_EMULATOR_HOST is not set")
+            sys.exit(1)
+        self._client = pubsub_v1.PublisherClient()
+        self._topic_path = self._client.topic_path(project, topic)
+
+    async def send(self, envelope: dict) -> str:
+        message = envelope["message"]
+        future = self._client.publish(
+            self._topic_path,
+            data=base64.b64decode(message["data"]),
+            **message["attributes"],
+        )
+        await asyncio.wrap_future(future)
+        return "published"
+
+    async def close(self) -> None:
+        pass
+
+
+def current_rate(args, elapsed: float) -> float:
+    if args.ramp_to is None:
+        return args.rate
+    progress = min(1.0, elapsed / args.duration)
+    return args.rate + (args.ramp_to - args.rate) * progress
+
+
+async def run(args) -> tuple[Report, float]:
+    mix = TrafficMix(
+        workspaces=args.workspaces,
+        vacancies_per_workspace=args.vacancies,
+        candidates_per_workspace=args.candidates,
+        workspace_skew=args.workspace_skew,
+        duplicate_rate=args.duplicate_rate,
+        deletion_rate=args.deletion_rate,
+        irrelevant_rate=args.irrelevant_rate,
+        files_rate=args.files_rate,
+    )
+    stream = EventStream(mix, random.Random(args.seed))
+    if args.target == "http":
+        target = HttpTarget(args.url, args.timeout, args.max_in_flight)
+    else:
+        target = PubSubTarget(args.project, args.topic)
+
+    report = Report()
+    in_flight: set[asyncio.Task] = set()
+    semaphore = asyncio.Semaphore(args.max_in_flight)
+
+    async def fire(kind: str, envelope: dict) -> None:
+        start = time.perf_counter()
+        try:
+            outcome = await target.send(envelope)
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}"
+        finally:
+            semaphore.release()
+        report.record(kind, outcome, (time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    next_send = started
+    last_progress = started
+    while (now := time.perf_counter()) - started < args.duration:
+        if now < next_send:
+            await asyncio.sleep(next_send - now)
+            continue
+        # Open-loop: past the in-flight cap, drop rather than slow the schedule down
+        if semaphore.locked():
+            report.dropped += 1
+        else:
+            await semaphore.acquire()
+            task = asyncio.create_task(fire(*stream.next()))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            report.sent += 1
+        next_send += 1 / current_rate(args, now - started)
+
+        if now - last_progress >= 5:
+            last_progress = now
+            print(
+                f"  t={now - started:6.1f}s rate={current_rate(args, now - started):6.1f}/s "
+                f"sent={report.sent} done={len(report.latencies_ms)} "
+                f"in_flight={len(in_flight)} p95={report.percentile(95):.0f}ms"
+            )
+    elapsed = time.perf_counter() - started
+
+    if in_flight:
+        print(f"  waiting for {len(in_flight)} in-flight requests...")
+        await asyncio.gather(*in_flight)
+    await target.close()
+    return report, elapsed
+
+
+def print_report(report: Report, elapsed: float) -> None:
+    summary = report.to_dict(elapsed)
+    print(
+        f"\nSent {summary['sent']} in {summary['elapsed_s']}s "
+        f"({summary['achieved_rate']}/s), dropped {summary['dropped']}"
+    )
+    print("Latency: " + "  ".join(f"{k}={v}ms" for k, v in summary["latency_ms"].items()))
+
+    print("\nLatency histogram:")
+    total = max(1, len(report.latencies_ms))
+    for label, count in report.histogram():
+        bar = "#" * round(40 * count / total)
+        print(f"  {label:>10} {count:>7}  {bar}")
+
+    print("\nOutcomes:")
+    for outcome, count in report.outcomes.most_common():
+        print(f"  {count:>7}  {outcome}")
+    print("\nEvent kinds:")
+    for kind, count in report.kinds.most_common():
+        print(f"  {count:>7}  {kind}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay synthetic application upsert events at a target rate",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--target", choices=["http", "pubsub"], default="http")
+    parser.add_argument("--url", default="http://localhost:8080", help="Service base URL")
+    parser.add_argument("--project", default="carv-app-dev", help="Project for --target pubsub")
+    parser.add_argument("--topic", default="carv-events-dev", help="Topic for --target pubsub")
+    parser.add_argument("--rate", type=float, default=10.0, help="Messages per second")
+    parser.add_argument(
+        "--ramp-to", type=float, default=None, help="Ramp linearly to this rate over --duration"
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to send for")
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=300.0, help="HTTP timeout in seconds")
+    parser.add_argument("--workspaces", type=int, default=5)
+    parser.add_argument("--vacancies", type=int, default=20, help="Vacancies per workspace")
+    parser.add_argument("--candidates", type=int, default=500, help="Candidates per workspace")
+    parser.add_argument(
+        "--workspace-skew", type=float, default=1.2, help="Zipf exponent, 0 for uniform"
+    )
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--deletion-rate", type=float, default=0.02)
+    parser.add_argument("--irrelevant-rate", type=float, default=0.1)
+    parser.add_argument(
+        "--files-rate", type=float, default=0.5, help="Share of events with a resume GCS URI"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    end_rate = args.ramp_to if args.ramp_to is not None else args.rate
+    print(
+        f"--- Load: {args.rate:g} -> {end_rate:g} msg/s for {args.duration:g}s "
+        f"({args.target}) ---"
+    )
+    report, elapsed = asyncio.run(run(args))
+    print_report(report, elapsed)
+
+    if args.output:
+        path = Path(args.output)
+        path.write_text(json.dumps({"config": vars(args), **report.to_dict(elapsed)}, indent=2))
+        print(f"\nWrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,19 +35,24 @@ def build_envelope(
     vacancy_id: str,
     workspace_id: str,
     files: dict | None = None,
+    event_type: str = "uats.application.upserted",
+    status: str = "success",
+    deleted: bool = False,
+    source_service: str = "local-test",
 ) -> dict:
     now = datetime.now(UTC).isoformat()
-    after = {
+    snapshot = {
         "application_id": application_id,
         "candidate_id": candidate_id,
         "vacancy_id": vacancy_id,
     }
     if files:
-        after["files"] = files
+        snapshot["files"] = files
     payload = {
         "data": {
-            "before": None,
-            "after": after,
+            # Deletions carry the last snapshot in "before" and a null "after"
+            "before": snapshot if deleted else None,
+            "after": None if deleted else snapshot,
         },
         "error": None,
     }
@@ -56,11 +61,11 @@ def build_envelope(
             "data": base64.b64encode(json.dumps(payload).encode()).decode(),
             "attributes": {
                 "event_id": str(uuid4()),
-                "event_type": "uats.application.upserted",
-                "status": "success",
+                "event_type": event_type,
+                "status": status,
                 "workspace_id": workspace_id,
                 "timestamp": now,
-                "source_service": "local-test",
+                "source_service": source_service,
             },
             "messageId": f"local-{application_id}",
             "publishTime": now,
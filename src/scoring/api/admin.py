@@ -0,0 +1,104 @@
+import asyncio
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from starlette.datastructures import State
+
+from scoring.api.dependencies import build_firestore_repo, get_firestore_repo
+from scoring.api.routes import CHANGE_EVENTS, handle_application_event, handle_entity_change
+from scoring.models import PubSubEnvelope, ReplayRequest, ReplayRun
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.replay import (
+    DeadLetterReplayer,
+    PubSubDeadLetterSubscription,
+    ReplayHandler,
+)
+
+logger = structlog.get_logger()
+router = APIRouter(prefix="/admin")
+
+
+def replay_handler(state: State) -> ReplayHandler:
+    """Route a dead-lettered message to the push endpoint it originally failed in."""
+
+    async def handle(envelope: PubSubEnvelope) -> str:
+        if envelope.message.attributes.get("event_type") in CHANGE_EVENTS:
+            response = await handle_entity_change(envelope, state)
+        else:
+            response = await handle_application_event(envelope, state)
+        return response.status
+
+    return handle
+
+
+def _create_subscriber_client():
+    from google.cloud import pubsub_v1
+
+    return pubsub_v1.SubscriberClient()
+
+
+async def build_dlq_replayer(state: State) -> DeadLetterReplayer:
+    # The subscriber is only needed for replays, so it is created on first use
+    if getattr(state, "subscriber_client", None) is None:
+        state.subscriber_client = await asyncio.to_thread(_create_subscriber_client)
+    return DeadLetterReplayer(
+        subscription=PubSubDeadLetterSubscription(state.subscriber_client, state.settings),
+        handler=replay_handler(state),
+        repo=build_firestore_repo(state),
+        settings=state.settings,
+    )
+
+
+async def _start(
+    state: State,
+    response: Response,
+    body: ReplayRequest | None = None,
+    run: ReplayRun | None = None,
+) -> ReplayRun:
+    # One replay per instance: runs share the DLQ and would only contend
+    task = getattr(state, "dlq_replay_task", None)
+    if task is not None and not task.done():
+        raise HTTPException(status_code=409, detail="A replay is already running")
+    replayer = await build_dlq_replayer(state)
+    if run is None:
+        run = replayer.new_run(body)
+    run.status = "running"
+    # Checkpointed before the 202 goes out, so an immediate poll finds it
+    await replayer.checkpoint(run)
+    state.dlq_replay_task = asyncio.create_task(replayer.run(run))
+    response.status_code = 202
+    response.headers["Location"] = f"/admin/dlq-replay/{run.run_id}"
+    return run.model_copy()
+
+
+@router.post("/dlq-replay")
+async def start_replay(body: ReplayRequest, request: Request, response: Response) -> ReplayRun:
+    """Replay dead-lettered messages in the background; poll the returned run."""
+    return await _start(request.app.state, response, body=body)
+
+
+@router.post("/dlq-replay/{run_id}/resume")
+async def resume_replay(
+    run_id: str,
+    request: Request,
+    response: Response,
+    repo: FirestoreRepository = Depends(get_firestore_repo),
+) -> ReplayRun:
+    """Continue an interrupted or failed run with its filter and counters."""
+    try:
+        run = await repo.get_replay_run(run_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Replay run not found")
+    if run.status == "completed":
+        raise HTTPException(status_code=409, detail="Replay run already completed")
+    return await _start(request.app.state, response, run=run)
+
+
+@router.get("/dlq-replay/{run_id}")
+async def get_replay(
+    run_id: str, repo: FirestoreRepository = Depends(get_firestore_repo)
+) -> ReplayRun:
+    try:
+        return await repo.get_replay_run(run_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Replay run not found")
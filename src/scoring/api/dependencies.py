@@ -1,25 +1,102 @@
 from fastapi import Request
+from starlette.datastructures import State
 
 from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.batch import BatchScorer, BatchSubmitter, create_batch_submitter
+from scoring.services.breaker import CircuitBreaker
+from scoring.services.completions import CompletionBroker
+from scoring.services.jobs import JobExecutor
 from scoring.services.llm import LLMService
+from scoring.services.microbatch import MicroBatcher
 from scoring.services.publisher import EventPublisher
+from scoring.services.score_cache import ScoreCache
 from scoring.services.scoring import ScoringService
 
 
-def get_firestore_repo(request: Request) -> FirestoreRepository:
+def _breaker(state: State, dependency: str) -> CircuitBreaker | None:
+    # Breakers are created in lifespan only when enabled
+    breakers = getattr(state, "breakers", None)
+    return breakers.get(dependency) if breakers else None
+
+
+def build_firestore_repo(state: State) -> FirestoreRepository:
     return FirestoreRepository(
-        client=request.app.state.firestore_client,
-        settings=request.app.state.settings,
+        client=state.firestore_client,
+        settings=state.settings,
+        breaker=_breaker(state, "firestore"),
     )
 
 
-def get_scoring_service(request: Request) -> ScoringService:
+def build_score_cache(state: State, repo: FirestoreRepository) -> ScoreCache | None:
+    # The front cache is created in lifespan only when the score cache is enabled
+    front = getattr(state, "score_cache_front", None)
+    if front is None:
+        return None
+    return ScoreCache(repo=repo, front=front, settings=state.settings)
+
+
+def build_llm_service(state: State) -> LLMService:
+    return LLMService(
+        settings=state.settings,
+        backend=state.llm_backend,
+        breaker=_breaker(state, "gemini"),
+    )
+
+
+def build_micro_batcher(state: State) -> MicroBatcher | None:
+    if not state.settings.microbatch_enabled:
+        return None
+    return MicroBatcher(
+        build_llm_service(state), state.settings, getattr(state, "llm_scheduler", None)
+    )
+
+
+def build_scoring_service(state: State) -> ScoringService:
+    """Wire a ScoringService from app state; also used outside requests."""
+    repo = build_firestore_repo(state)
     return ScoringService(
-        repo=get_firestore_repo(request),
-        llm=LLMService(settings=request.app.state.settings),
+        repo=repo,
+        llm=build_llm_service(state),
         publisher=EventPublisher(
-            client=request.app.state.publisher_client,
-            settings=request.app.state.settings,
+            client=state.publisher_client,
+            settings=state.settings,
+            breaker=_breaker(state, "pubsub"),
         ),
-        settings=request.app.state.settings,
+        settings=state.settings,
+        score_cache=build_score_cache(state, repo),
+        completions=getattr(state, "completion_broker", None),
+        scheduler=getattr(state, "llm_scheduler", None),
+        batcher=getattr(state, "micro_batcher", None),
+        usage=getattr(state, "usage_ledger", None),
     )
+
+
+def build_batch_scorer(state: State, submitter: BatchSubmitter | None = None) -> BatchScorer:
+    return BatchScorer(
+        repo=build_firestore_repo(state),
+        llm=LLMService(settings=state.settings, backend=state.llm_backend),
+        publisher=EventPublisher(
+            client=state.publisher_client,
+            settings=state.settings,
+            breaker=_breaker(state, "pubsub"),
+        ),
+        submitter=submitter or create_batch_submitter(state.settings),
+        settings=state.settings,
+        usage=getattr(state, "usage_ledger", None),
+    )
+
+
+def get_firestore_repo(request: Request) -> FirestoreRepository:
+    return build_firestore_repo(request.app.state)
+
+
+def get_scoring_service(request: Request) -> ScoringService:
+    return build_scoring_service(request.app.state)
+
+
+def get_job_executor(request: Request) -> JobExecutor | None:
+    return getattr(request.app.state, "job_executor", None)
+
+
+def get_completion_broker(request: Request) -> CompletionBroker | None:
+    return getattr(request.app.state, "completion_broker", None)
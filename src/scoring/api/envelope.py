@@ -0,0 +1,51 @@
+"""Single-pass decoding of Pub/Sub push envelopes.
+
+The raw request body is validated straight from bytes by pydantic-core, and the
+base64 ``data`` field is validated straight from the decoded bytes, so no
+intermediate ``json.loads`` dicts are built along the way.
+"""
+
+import base64
+
+from pydantic import TypeAdapter
+
+from scoring.models import (
+    ApplicationUpsertedData,
+    ApplicationUpsertedPayload,
+    EntityUpsertedData,
+    EntityUpsertedPayload,
+    PubSubEnvelope,
+)
+
+_envelope_adapter = TypeAdapter(PubSubEnvelope)
+_upserted_payload_adapter = TypeAdapter(ApplicationUpsertedPayload)
+_entity_payload_adapter = TypeAdapter(EntityUpsertedPayload)
+
+
+class InvalidMessageError(ValueError):
+    """The message data is not a valid base64-encoded event payload."""
+
+
+def decode_envelope(body: bytes) -> PubSubEnvelope:
+    """Validate a push request body. Raises ``pydantic.ValidationError``."""
+    return _envelope_adapter.validate_json(body)
+
+
+def decode_upserted_data(data: str) -> ApplicationUpsertedData:
+    try:
+        raw = base64.b64decode(data)
+        payload = _upserted_payload_adapter.validate_json(raw)
+    # Covers binascii.Error, non-ASCII input and pydantic's ValidationError
+    except ValueError as e:
+        raise InvalidMessageError(str(e)) from e
+    return payload.data or ApplicationUpsertedData()
+
+
+def decode_entity_data(data: str) -> EntityUpsertedData:
+    try:
+        raw = base64.b64decode(data)
+        payload = _entity_payload_adapter.validate_json(raw)
+    # Covers binascii.Error, non-ASCII input and pydantic's ValidationError
+    except ValueError as e:
+        raise InvalidMessageError(str(e)) from e
+    return payload.data or EntityUpsertedData()
@@ -1,28 +1,76 @@
-import base64
-import json
+import math
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.datastructures import State
 
-from scoring.api.dependencies import get_scoring_service
-from scoring.models import ApplicationUpsertedData, EventAttributes, EventPayload, PubSubEnvelope
-from scoring.services.scoring import ScoringService
+from scoring.api.dependencies import build_firestore_repo, build_scoring_service
+from scoring.api.envelope import (
+    InvalidMessageError,
+    decode_entity_data,
+    decode_envelope,
+    decode_upserted_data,
+)
+from scoring.models import (
+    EntityChangedResponse,
+    EventAttributes,
+    ProcessCandidateResponse,
+    PubSubEnvelope,
+    ReadinessResponse,
+)
+from scoring.observability.metrics import record_scores_marked_stale
+from scoring.services.breaker import CircuitOpenError
+from scoring.services.scheduler import SchedulerQueueFullError
+from scoring.services.usage import TokenBudgetExceededError
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+_PUSH_BODY_SCHEMA = {
+    "requestBody": {
+        "content": {"application/json": {"schema": PubSubEnvelope.model_json_schema()}},
+        "required": True,
+    }
+}
 
-@router.post("/process-candidate")
-async def process_candidate(
-    envelope: PubSubEnvelope,
-    scoring_service: ScoringService = Depends(get_scoring_service),
-):
+# Change events that make stored scores stale, and the score field they match
+CHANGE_EVENTS = {
+    "uats.vacancy.upserted": "vacancy_id",
+    "uats.candidate.upserted": "candidate_id",
+}
+
+
+@router.post(
+    "/process-candidate", response_model_exclude_none=True, openapi_extra=_PUSH_BODY_SCHEMA
+)
+async def process_candidate(request: Request) -> ProcessCandidateResponse:
+    # The body is validated straight from bytes rather than through FastAPI's
+    # json.loads + model pass, and the scoring service is only built once the
+    # message is known to be worth processing.
+    try:
+        envelope = decode_envelope(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    return await handle_application_event(envelope, request.app.state)
+
+
+async def handle_application_event(
+    envelope: PubSubEnvelope, state: State
+) -> ProcessCandidateResponse:
+    """Score the application in an upsert event; also used by DLQ replay.
+
+    Failures raise ``HTTPException`` (or ``CircuitOpenError``) so the push
+    endpoint nacks the message.
+    """
     # Parse event attributes
     try:
         attributes = EventAttributes.from_pubsub_attributes(envelope.message.attributes)
     except Exception as e:
         logger.error("invalid_event_attributes", error=str(e))
-        return {"status": "skipped", "reason": "invalid event attributes"}
+        return ProcessCandidateResponse(status="skipped", reason="invalid event attributes")
 
     # Only process successful upsert events
     if attributes.event_type != "uats.application.upserted" or attributes.status != "success":
@@ -31,21 +79,21 @@ async def process_candidate(
             event_type=attributes.event_type,
             status=attributes.status,
         )
-        return {"status": "skipped", "reason": "irrelevant event type or status"}
+        return ProcessCandidateResponse(
+            status="skipped", reason="irrelevant event type or status"
+        )
 
     # Decode payload
     try:
-        raw = base64.b64decode(envelope.message.data)
-        event_payload = EventPayload(**json.loads(raw))
-        upserted = ApplicationUpsertedData(**(event_payload.data or {}))
-    except Exception as e:
+        upserted = decode_upserted_data(envelope.message.data)
+    except InvalidMessageError as e:
         logger.error("invalid_event_message", error=str(e))
-        return {"status": "skipped", "reason": "invalid message format"}
+        return ProcessCandidateResponse(status="skipped", reason="invalid message format")
 
     # Skip deletion events (after is null)
     if upserted.after is None:
         logger.info("deletion_event_skipped")
-        return {"status": "skipped", "reason": "deletion event"}
+        return ProcessCandidateResponse(status="skipped", reason="deletion event")
 
     after = upserted.after
 
@@ -60,6 +108,7 @@ async def process_candidate(
                 if gcs_uri:
                     file_uris.append(gcs_uri)
 
+    scoring_service = build_scoring_service(state)
     try:
         result = await scoring_service.process(
             application_id=after.application_id,
@@ -67,13 +116,20 @@ async def process_candidate(
             vacancy_reference_id=after.vacancy_id,
             workspace_id=attributes.workspace_id,
             file_uris=file_uris or None,
+            lane="event",
+        )
+        return ProcessCandidateResponse(
+            status="ok",
+            application_id=after.application_id,
+            score=result.score,
+            reasoning=result.reasoning,
         )
-        return {
-            "status": "ok",
-            "application_id": after.application_id,
-            "score": result.score,
-            "reasoning": result.reasoning,
-        }
+    except (CircuitOpenError, TokenBudgetExceededError):
+        raise
+    except SchedulerQueueFullError:
+        # Pub/Sub redelivers with backoff; the workspace's backlog stays on the bus
+        logger.warning("workspace_queue_full", workspace_id=attributes.workspace_id)
+        raise HTTPException(status_code=429, detail="Workspace queue full")
     except Exception as e:
         logger.error(
             "processing_failed",
@@ -83,6 +139,109 @@ async def process_candidate(
         raise HTTPException(status_code=500, detail="Processing failed")
 
 
+@router.post("/entity-changed", response_model_exclude_none=True, openapi_extra=_PUSH_BODY_SCHEMA)
+async def entity_changed(request: Request) -> EntityChangedResponse:
+    """Mark scores stale after a vacancy or candidate change and queue rescoring."""
+    try:
+        envelope = decode_envelope(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    return await handle_entity_change(envelope, request.app.state)
+
+
+async def handle_entity_change(envelope: PubSubEnvelope, state: State) -> EntityChangedResponse:
+    """Handle a vacancy or candidate change event; also used by DLQ replay."""
+
+    try:
+        attributes = EventAttributes.from_pubsub_attributes(envelope.message.attributes)
+    except Exception as e:
+        logger.error("invalid_event_attributes", error=str(e))
+        return EntityChangedResponse(status="skipped", reason="invalid event attributes")
+
+    field = CHANGE_EVENTS.get(attributes.event_type)
+    if field is None or attributes.status != "success":
+        logger.info("event_skipped", event_type=attributes.event_type, status=attributes.status)
+        return EntityChangedResponse(status="skipped", reason="irrelevant event type or status")
+
+    try:
+        change = decode_entity_data(envelope.message.data)
+    except InvalidMessageError as e:
+        logger.error("invalid_event_message", error=str(e))
+        return EntityChangedResponse(status="skipped", reason="invalid message format")
+
+    # Deleted entities cannot be rescored; their scores are left as they are
+    if change.after is None:
+        return EntityChangedResponse(status="skipped", reason="deletion event")
+    reference_id = change.after.get(field)
+    if not reference_id:
+        return EntityChangedResponse(status="skipped", reason=f"missing {field}")
+
+    repo = build_firestore_repo(state)
+    entity = field.removesuffix("_id")
+    try:
+        application_ids = await repo.mark_scores_stale(
+            attributes.workspace_id, field, reference_id
+        )
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(
+            "mark_stale_failed",
+            workspace_id=attributes.workspace_id,
+            entity=entity,
+            reference_id=reference_id,
+            error=str(e),
+        )
+        raise HTTPException(status_code=500, detail="Marking scores stale failed")
+    record_scores_marked_stale(entity, len(application_ids))
+
+    worker = getattr(state, "rescore_worker", None)
+    queued = 0
+    if worker is not None:
+        queued = sum(worker.enqueue(attributes.workspace_id, a) for a in application_ids)
+    return EntityChangedResponse(
+        status="ok", marked_stale=len(application_ids), queued=queued
+    )
+
+
+async def circuit_open_handler(request: Request, exc: CircuitOpenError) -> JSONResponse:
+    # Retryable: Pub/Sub redelivers pushes with backoff, clients honour Retry-After
+    logger.warning("dependency_circuit_open", dependency=exc.dependency, path=request.url.path)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.dependency} is unavailable"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after_s))},
+    )
+
+
+async def budget_exceeded_handler(
+    request: Request, exc: TokenBudgetExceededError
+) -> JSONResponse:
+    # Deferred, not failed: pushes are redelivered with backoff (and dead-lettered
+    # once the subscription's attempts run out, for replay after the reset)
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Workspace is over its daily token budget"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after_s))},
+    )
+
+
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(request: Request, response: Response) -> ReadinessResponse:
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        response.status_code = 503
+        return ReadinessResponse(status="warming")
+    report = warmup.report()
+    if report.status != "ready":
+        response.status_code = 503
+    # Reported, not gating: an open breaker reflects a shared dependency, and
+    # taking every instance out of rotation would not help it recover
+    breakers = getattr(request.app.state, "breakers", None) or {}
+    report.breakers = {name: b.state for name, b in breakers.items()}
+    return report
@@ -1,10 +1,38 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from scoring.api.dependencies import get_firestore_repo, get_scoring_service
-from scoring.models import ScoreRequest
+from scoring.api.dependencies import (
+    get_completion_broker,
+    get_firestore_repo,
+    get_job_executor,
+    get_scoring_service,
+)
+from scoring.models import (
+    CandidateScoreRequest,
+    ScoreListResponse,
+    ScoreRequest,
+    ScoringJob,
+    ScoringResult,
+    UsageListResponse,
+)
 from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.breaker import CircuitOpenError
+from scoring.services.completions import (
+    CompletionBroker,
+    CompletionFilter,
+    Subscription,
+    TooManySubscribersError,
+)
+from scoring.services.jobs import JobExecutor, JobQueueFullError
+from scoring.services.scheduler import SchedulerQueueFullError
 from scoring.services.scoring import ScoringService
+from scoring.services.usage import TokenBudgetExceededError, usage_day
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -15,12 +43,12 @@ async def get_score(
     application_id: str,
     workspace_id: str = Query(...),
     repo: FirestoreRepository = Depends(get_firestore_repo),
-):
+) -> ScoringResult:
     try:
         result = await repo.get_scoring_result(workspace_id, application_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Scoring result not found")
-    return result.model_dump()
+    return result
 
 
 @router.get("/scores")
@@ -30,56 +58,225 @@ async def list_scores(
     vacancy_id: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     repo: FirestoreRepository = Depends(get_firestore_repo),
-):
+) -> ScoreListResponse:
     results = await repo.query_scoring_results(
         workspace_id=workspace_id,
         candidate_id=candidate_id,
         vacancy_id=vacancy_id,
         limit=limit,
     )
-    return {
-        "results": [r.model_dump() for r in results],
-        "count": len(results),
-    }
+    return ScoreListResponse(results=results, count=len(results))
+
+
+@router.get("/usage")
+async def get_usage(
+    workspace_id: str = Query(...),
+    days: int = Query(default=7, ge=1, le=92),
+    repo: FirestoreRepository = Depends(get_firestore_repo),
+) -> UsageListResponse:
+    # One ledger document per UTC day, newest first; days without usage are left out
+    today = datetime.now(UTC)
+    entries = await repo.get_token_usage(
+        workspace_id, [usage_day(today - timedelta(days=i)) for i in range(days)]
+    )
+    return UsageListResponse(days=entries, count=len(entries))
+
+
+async def _submit_job(
+    executor: JobExecutor | None,
+    response: Response,
+    workspace_id: str,
+    kind: str,
+    application_id: str,
+    work: Callable[[], Awaitable[ScoringResult]],
+) -> ScoringJob:
+    if executor is None:
+        raise HTTPException(status_code=503, detail="Async jobs are not available")
+    try:
+        job = await executor.submit(workspace_id, kind, application_id, work)
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=503, detail="Too many open jobs", headers={"Retry-After": "5"}
+        )
+    response.status_code = 202
+    response.headers["Location"] = f"/jobs/{job.job_id}?workspace_id={workspace_id}"
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    workspace_id: str = Query(...),
+    repo: FirestoreRepository = Depends(get_firestore_repo),
+) -> ScoringJob:
+    try:
+        return await repo.get_job(workspace_id, job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
+async def score_event_stream(
+    broker: CompletionBroker, sub: Subscription, heartbeat_s: float
+) -> AsyncIterator[bytes]:
+    """Server-sent events for a subscription; unsubscribes when the client goes away."""
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                result = await asyncio.wait_for(sub.get(), heartbeat_s)
+            except TimeoutError:
+                yield b": heartbeat\n\n"
+                continue
+            dropped = sub.take_dropped()
+            if dropped:
+                # Completions were lost; the client should refetch via /scores
+                yield f"event: overflow\ndata: {json.dumps({'dropped': dropped})}\n\n".encode()
+            event_id = f"{result.application_id}:{result.scored_at.isoformat()}"
+            yield (
+                f"event: score\nid: {event_id}\ndata: {result.model_dump_json()}\n\n"
+            ).encode()
+    finally:
+        broker.unsubscribe(sub)
+
+
+@router.get("/score-events")
+async def score_events(
+    request: Request,
+    workspace_id: str = Query(...),
+    vacancy_id: str | None = Query(default=None),
+    application_id: list[str] = Query(default=[]),
+    broker: CompletionBroker | None = Depends(get_completion_broker),
+) -> StreamingResponse:
+    # Streams score completions as they happen, so clients need not poll
+    # GET /scores/{application_id}
+    if broker is None:
+        raise HTTPException(status_code=503, detail="Score streams are not available")
+    completion_filter = CompletionFilter(workspace_id, vacancy_id, frozenset(application_id))
+    try:
+        sub = broker.subscribe(completion_filter)
+    except TooManySubscribersError:
+        raise HTTPException(
+            status_code=503, detail="Too many open streams", headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(
+        score_event_stream(broker, sub, request.app.state.settings.sse_heartbeat_s),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _workspace_busy() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many scoring requests queued for this workspace",
+        headers={"Retry-After": "5"},
+    )
 
 
 @router.post("/score")
 async def trigger_score(
     body: ScoreRequest,
+    response: Response,
+    run_async: bool = Query(default=False, alias="async"),
     scoring_service: ScoringService = Depends(get_scoring_service),
-):
-    try:
-        result = await scoring_service.process(
+    executor: JobExecutor | None = Depends(get_job_executor),
+) -> ScoringResult | ScoringJob:
+    # With async=true the request returns 202 and a job to poll at /jobs/{id}
+    def work() -> Awaitable[ScoringResult]:
+        return scoring_service.process(
             application_id=body.application_id,
             candidate_reference_id=body.candidate_reference_id,
             vacancy_reference_id=body.vacancy_reference_id,
             workspace_id=body.workspace_id,
+            lane="interactive",
         )
+
+    if run_async:
+        return await _submit_job(
+            executor, response, body.workspace_id, "score", body.application_id, work
+        )
+
+    try:
+        result = await work()
+    except (CircuitOpenError, TokenBudgetExceededError):
+        raise
+    except SchedulerQueueFullError:
+        raise _workspace_busy()
     except Exception as e:
         logger.error("score_trigger_failed", error=str(e))
         raise HTTPException(status_code=500, detail="Scoring failed")
-    return result.model_dump()
+    return result
+
+
+@router.post("/score-candidate")
+async def score_candidate(
+    body: CandidateScoreRequest,
+    scoring_service: ScoringService = Depends(get_scoring_service),
+) -> ScoreListResponse:
+    # One candidate's applications, scored with one LLM call per
+    # multi_vacancy_max vacancies; the results are in request order
+    try:
+        results = await scoring_service.process_candidate(
+            workspace_id=body.workspace_id,
+            candidate_reference_id=body.candidate_reference_id,
+            applications=body.applications,
+            lane="interactive",
+        )
+    except (CircuitOpenError, TokenBudgetExceededError):
+        raise
+    except SchedulerQueueFullError:
+        raise _workspace_busy()
+    except Exception as e:
+        logger.error(
+            "score_candidate_failed",
+            candidate_reference_id=body.candidate_reference_id,
+            error=str(e),
+        )
+        raise HTTPException(status_code=500, detail="Scoring failed")
+    return ScoreListResponse(results=results, count=len(results))
 
 
 @router.post("/re-score/{application_id}")
 async def re_score(
     application_id: str,
+    response: Response,
     workspace_id: str = Query(...),
+    force: bool = Query(default=False),
+    run_async: bool = Query(default=False, alias="async"),
     repo: FirestoreRepository = Depends(get_firestore_repo),
     scoring_service: ScoringService = Depends(get_scoring_service),
-):
+    executor: JobExecutor | None = Depends(get_job_executor),
+) -> ScoringResult | ScoringJob:
+    # Without force, the stored result is returned unchanged when the inputs
+    # still fingerprint the same; only the Firestore reads are paid.
     try:
         existing = await repo.get_scoring_result(workspace_id, application_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Scoring result not found")
 
-    try:
-        result = await scoring_service.process(
+    def work() -> Awaitable[ScoringResult]:
+        return scoring_service.process(
             application_id=application_id,
             candidate_reference_id=existing.candidate_id,
             vacancy_reference_id=existing.vacancy_id,
             workspace_id=workspace_id,
+            file_uris=existing.file_uris,
+            previous=existing,
+            force=force,
+            lane="interactive",
+        )
+
+    if run_async:
+        return await _submit_job(
+            executor, response, workspace_id, "re-score", application_id, work
         )
+
+    try:
+        result = await work()
+    except (CircuitOpenError, TokenBudgetExceededError):
+        raise
+    except SchedulerQueueFullError:
+        raise _workspace_busy()
     except Exception as e:
         logger.error(
             "re_score_failed",
@@ -87,4 +284,4 @@ async def re_score(
             error=str(e),
         )
         raise HTTPException(status_code=500, detail="Re-scoring failed")
-    return result.model_dump()
+    return result
@@ -1,5 +1,41 @@
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
+OrderingKeyStrategy = Literal["none", "workspace", "application", "vacancy"]
+Lane = Literal["interactive", "event", "backfill"]
+ScoringTier = Literal["fast", "standard", "thorough"]
+
+
+class GeminiTier(BaseModel):
+    """Generation settings of a scoring tier: depth traded against latency."""
+
+    # Tokens Gemini may spend thinking before it answers; 0 turns thinking
+    # off and -1 or None lets the model decide (None sends no thinking config)
+    thinking_budget: int | None = None
+    # Includes thinking tokens; capped by gemini_max_tokens, None uses it as is
+    max_output_tokens: int | None = None
+    # Reasoning length asked for in the system prompt
+    reasoning_sentences: str
+
+
+class ModelPrice(BaseModel):
+    """List price of a Gemini model in USD per million tokens."""
+
+    input_per_mtok: float
+    # Thinking tokens are billed as output
+    output_per_mtok: float
+
+
+class TokenBudget(BaseModel):
+    """Daily token budget of a workspace, in total tokens per UTC day."""
+
+    # Past it, scorings run on usage_soft_budget_tier
+    soft_tokens: int | None = None
+    # Past it, work in usage_defer_lanes is refused until the next day
+    hard_tokens: int | None = None
+
 
 class Settings(BaseSettings):
     model_config = {"env_prefix": "", "case_sensitive": False, "env_file": ".env"}
@@ -12,9 +48,183 @@ class Settings(BaseSettings):
     gemini_model: str = "gemini-2.5-flash"
     gemini_temperature: float = 0.1
     gemini_max_tokens: int = 16384 #65535 default
+    # Scoring tiers. A call uses the tier of its workspace, else of its lane
+    # (interactive: /score, event: push, backfill: rescores and backfills),
+    # else gemini_default_tier, e.g. GEMINI_WORKSPACE_TIERS='{"ws-import": "fast"}'.
+    # "standard" is the request scoring sent before tiers existed; the others
+    # are opt-in
+    gemini_tiers: dict[ScoringTier, GeminiTier] = {
+        "fast": GeminiTier(thinking_budget=0, max_output_tokens=1024, reasoning_sentences="1-2"),
+        "standard": GeminiTier(reasoning_sentences="2-4"),
+        "thorough": GeminiTier(
+            thinking_budget=8192, max_output_tokens=16384, reasoning_sentences="3-5"
+        ),
+    }
+    gemini_default_tier: ScoringTier = "standard"
+    gemini_lane_tiers: dict[Lane, ScoringTier] = {}
+    gemini_workspace_tiers: dict[str, ScoringTier] = {}
+    # Multi-vacancy scoring (POST /score-candidate, backfills): one call scores
+    # a candidate against up to multi_vacancy_max vacancies
+    multi_vacancy_enabled: bool = True
+    multi_vacancy_max: int = 5
+    # Micro-batching of single scorings in microbatch_lanes: cache misses for
+    # the same vacancy within microbatch_window_ms are sent as one call with
+    # the vacancy once and up to microbatch_max_size candidates, keeping the
+    # estimated prompt under microbatch_max_prompt_tokens
+    microbatch_enabled: bool = False
+    microbatch_lanes: list[Lane] = ["event", "backfill"]
+    microbatch_window_ms: float = 250.0
+    microbatch_max_size: int = 8
+    microbatch_max_prompt_tokens: int = 100_000
+    # A candidate document sent both as inline text and as the attached file
+    # the text was extracted from (same ATS document) is sent once, as
+    # whichever is estimated to cost fewer tokens. Text shorter than
+    # documents_min_text_chars is taken to be an incomplete extraction and
+    # never replaces the file. Files cost documents_pdf_page_tokens per page,
+    # assuming documents_pdf_default_pages when the page count is unknown.
+    documents_dedupe_enabled: bool = True
+    documents_min_text_chars: int = 500
+    documents_pdf_page_tokens: int = 258
+    documents_pdf_default_pages: int = 6
+    # Token accounting: tokens and estimated cost per workspace and model are
+    # exported as metrics and added to a daily ledger in Firestore every
+    # usage_flush_interval_s. Budgets (usage_budgets by workspace, else
+    # usage_default_budget) are checked against the ledger, read at most every
+    # usage_refresh_s per workspace, e.g.
+    # USAGE_BUDGETS='{"ws-trial": {"soft_tokens": 2000000, "hard_tokens": 5000000}}'
+    usage_ledger_enabled: bool = True
+    usage_flush_interval_s: float = 10.0
+    usage_refresh_s: float = 60.0
+    usage_model_prices: dict[str, ModelPrice] = {
+        "gemini-2.5-flash": ModelPrice(input_per_mtok=0.30, output_per_mtok=2.50),
+        "gemini-2.5-flash-lite": ModelPrice(input_per_mtok=0.10, output_per_mtok=0.40),
+        "gemini-2.5-pro": ModelPrice(input_per_mtok=1.25, output_per_mtok=10.0),
+    }
+    # Price multiplier for batch prediction (scripts/batch_score.py)
+    usage_batch_discount: float = 0.5
+    usage_budgets: dict[str, TokenBudget] = {}
+    usage_default_budget: TokenBudget | None = None
+    usage_soft_budget_tier: ScoringTier = "fast"
+    usage_defer_lanes: list[Lane] = ["event", "backfill"]
+
+    # LLM backend: "vertex" calls Gemini, "simulated" runs fully offline
+    llm_backend: Literal["vertex", "simulated"] = "vertex"
+    # Simulated backend latency model and failure rates
+    llm_sim_base_latency_ms: float = 1500.0
+    llm_sim_ms_per_1k_prompt_tokens: float = 120.0
+    llm_sim_ms_per_output_token: float = 4.0
+    llm_sim_latency_jitter: float = 0.3
+    llm_sim_tail_rate: float = 0.02
+    llm_sim_tail_multiplier: float = 5.0
+    llm_sim_rate_limit_rate: float = 0.0
+    llm_sim_timeout_rate: float = 0.0
+    llm_sim_timeout_s: float = 60.0
+    llm_sim_thinking_tokens: int = 800
+    llm_sim_tokens_per_file: int = 1548  # ~6 PDF pages at 258 tokens each
+    llm_sim_seed: int | None = None
+
+    # Score cache keyed by a fingerprint of the full LLM input; entries are
+    # per workspace, held in Firestore with an in-process LRU in front. Files
+    # are keyed by GCS URI, not content, so only enable it where files are
+    # never overwritten in place.
+    score_cache_enabled: bool = False
+    score_cache_ttl_s: int = 7 * 24 * 3600
+    score_cache_size: int = 4096
+
+    # Rescoring of stale scores after vacancy/candidate changes. Changes to
+    # the same application within the debounce window collapse into one rescore.
+    stale_rescore_enabled: bool = True
+    stale_rescore_debounce_s: float = 30.0
+    stale_rescore_rate_per_s: float = 1.0
+    stale_rescore_concurrency: int = 2
+    stale_rescore_max_pending: int = 10000
+
+    # Async scoring jobs (POST /score?async=true): runs per instance, and
+    # submissions beyond concurrency + queue are rejected with 503
+    jobs_max_concurrency: int = 8
+    jobs_max_queued: int = 100
+    job_ttl_s: int = 24 * 3600
+
+    # Score completion streams (GET /score-events)
+    sse_heartbeat_s: float = 15.0
+    sse_buffer_size: int = 100
+    sse_max_subscribers: int = 1000
+    # Also stream completions from other instances via Firestore listeners
+    sse_cross_instance: bool = False
+
+    # Requests Cloud Run sends one instance at once; keep it equal to
+    # max_instance_request_concurrency in terraform/cloudrun.tf
+    instance_request_concurrency: int = 10
+    # Concurrent LLM calls per instance, shared between traffic lanes by
+    # weight: under contention a lane gets at least weight / sum(weights).
+    # Lanes only contend when calls wait for a slot, so there must be fewer
+    # slots than requests; None means 3/4 of instance_request_concurrency.
+    llm_max_concurrency: int | None = None
+    llm_lane_weights: dict[Lane, float] = {"interactive": 6.0, "event": 3.0, "backfill": 1.0}
+    # Within a lane, slots are shared between workspaces by weight (default
+    # 1.0); caps bound a workspace's calls in flight, e.g.
+    # LLM_WORKSPACE_CAPS='{"ws-big-import": 4}'. None means uncapped.
+    llm_workspace_weights: dict[str, float] = {}
+    llm_workspace_caps: dict[str, int] = {}
+    llm_workspace_default_cap: int | None = None
+    # Calls a workspace may have waiting for a slot before new ones are refused
+    llm_workspace_max_queued: int = 200
+
+    # Circuit breakers around Gemini, Firestore and Pub/Sub. Over the last
+    # window, a breaker opens when the error rate or the share of slow calls
+    # reaches its threshold (after at least breaker_min_calls calls), fails
+    # fast for breaker_open_s, then lets breaker_half_open_probes calls probe.
+    breaker_enabled: bool = True
+    breaker_window_s: float = 30.0
+    breaker_min_calls: int = 20
+    breaker_error_rate: float = 0.5
+    breaker_slow_rate: float = 0.8
+    breaker_slow_call_ms: dict[str, float] = {
+        "gemini": 60000.0,
+        "firestore": 5000.0,
+        "pubsub": 10000.0,
+    }
+    breaker_open_s: float = 30.0
+    breaker_half_open_probes: int = 3
+
+    # Dead-letter replay (scripts/replay_dlq.py, POST /admin/dlq-replay).
+    # Pulled messages not replayed are leased for dlq_replay_lease_s and
+    # released when the run ends; replayed event IDs are remembered for
+    # dlq_replay_ttl_s so a message is never replayed twice.
+    dlq_subscription: str = "scoring-dlq-pull"
+    dlq_replay_batch_size: int = 10
+    dlq_replay_rate_per_s: float = 2.0
+    dlq_replay_concurrency: int = 4
+    dlq_replay_pull_timeout_s: float = 10.0
+    dlq_replay_lease_s: int = 600
+    dlq_replay_ttl_s: int = 30 * 24 * 3600
+
+    # Workspace backfill (scripts/backfill_workspace.py): applications are read
+    # in pages of backfill_page_size and the unscored ones scored in the
+    # backfill lane. Runs are kept for backfill_ttl_s.
+    backfill_page_size: int = 200
+    backfill_rate_per_s: float = 2.0
+    backfill_concurrency: int = 4
+    backfill_ttl_s: int = 30 * 24 * 3600
+
+    # Batch prediction for large backfills (scripts/batch_score.py). "vertex"
+    # submits Vertex AI batch jobs with input and output under batch_gcs_prefix
+    # (default gs://<gcs_bucket>/batch-scoring); "local" writes jobs under
+    # batch_local_dir and answers them offline.
+    batch_backend: Literal["vertex", "local"] = "vertex"
+    batch_gcs_prefix: str | None = None
+    batch_local_dir: str = "batch-jobs"
+    batch_poll_interval_s: float = 60.0
+    batch_timeout_s: float = 24 * 3600
+    batch_fetch_concurrency: int = 16
 
     # Pub/Sub topic (shared event bus)
     event_bus_topic: str = "carv-events-dev"
+    # Ordering key for outgoing events, per workspace as consumers expect;
+    # overrides are keyed by event type and opt into a finer key, e.g.
+    # PUBLISH_ORDERING_KEY_OVERRIDES='{"carv.score.calculated": "application"}'
+    publish_ordering_key: OrderingKeyStrategy = "workspace"
+    publish_ordering_key_overrides: dict[str, OrderingKeyStrategy] = {}
 
     # GCS
     gcs_bucket: str
@@ -22,8 +232,37 @@ class Settings(BaseSettings):
     # Service identity
     source_service: str = "carv-os-scoring"
 
+    # Warm-up before /ready reports ready (per attempt; failed checks are retried)
+    warmup_timeout_s: float = 10.0
+    warmup_retry_max_interval_s: float = 10.0
+
     # Observability
     otel_enabled: bool = True
+    # Traces go to Cloud Trace, or over OTLP/gRPC to a collector at
+    # otel_otlp_endpoint (needs the "otlp" extra); metrics follow the same choice
+    otel_exporter: Literal["cloud_trace", "otlp"] = "cloud_trace"
+    otel_otlp_endpoint: str = "http://localhost:4317"
+    # Head sampling: the share of new traces exported. Children follow their
+    # parent; remote parents (traceparent headers) only when told to.
+    otel_trace_sample_ratio: float = 1.0
+    otel_trace_follow_remote_parent: bool = True
+    # Tail retention: traces not sampled are still recorded and exported when
+    # a span fails or the request takes at least otel_tail_latency_ms. Up to
+    # otel_tail_max_traces unfinished traces are held in memory.
+    otel_tail_sampling: bool = False
+    otel_tail_latency_ms: float = 5000.0
+    otel_tail_max_traces: int = 2048
+    # Batch span processor: spans queued beyond max_queue_size are dropped
+    otel_bsp_max_queue_size: int = 2048
+    otel_bsp_schedule_delay_ms: int = 5000
+    otel_bsp_max_export_batch_size: int = 512
+    otel_bsp_export_timeout_ms: int = 30000
+    # Request spans: comma-separated URL regexes not traced, and whether ASGI
+    # receive/send messages get spans of their own
+    otel_excluded_urls: str = "health,ready"
+    otel_asgi_message_spans: bool = False
+    # Log per-module import and per-client init times at startup
+    startup_profile: bool = False
 
 
 def get_settings() -> Settings:
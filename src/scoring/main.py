@@ -1,16 +1,29 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
 import structlog
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from google.cloud import pubsub_v1
-from google.cloud.firestore import AsyncClient
 
-from scoring.api.routes import router
+from scoring.api.admin import router as admin_router
+from scoring.api.dependencies import (
+    build_firestore_repo,
+    build_micro_batcher,
+    build_scoring_service,
+)
+from scoring.api.routes import budget_exceeded_handler, circuit_open_handler, router
 from scoring.api.scores import router as scores_router
-from scoring.config import get_settings
-from scoring.observability.setup import init_observability
+from scoring.config import Settings, get_settings
+from scoring.observability.startup import StartupProfiler
+from scoring.services.breaker import CircuitOpenError, build_breakers
+from scoring.services.completions import CompletionBroker, FirestoreCompletionSource
+from scoring.services.jobs import JobExecutor
+from scoring.services.lru import LRUCache
+from scoring.services.rescore import RescoreWorker
+from scoring.services.scheduler import LLMScheduler
+from scoring.services.usage import TokenBudgetExceededError, UsageLedger
+from scoring.services.warmup import build_warmup
 
 # Load .env into os.environ so that PUBSUB_EMULATOR_HOST (read directly
 # by the google-cloud-pubsub client) and other vars are available before
@@ -28,12 +41,13 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+# The Google client libraries and OTel exporters are imported during
+# lifespan, not with this module, so they load in parallel with each other
+# and with observability setup instead of serially before startup begins.
+_CLIENT_MODULES = ["google.cloud.firestore", "google.cloud.pubsub_v1", "google.genai"]
+
 
-def _ensure_emulator_topics(
-    client: pubsub_v1.PublisherClient,
-    project_id: str,
-    topic_names: list[str],
-) -> None:
+def _ensure_emulator_topics(client, project_id: str, topic_names: list[str]) -> None:
     """Create topics on the Pub/Sub emulator if they don't exist."""
     for name in topic_names:
         topic_path = client.topic_path(project_id, name)
@@ -45,17 +59,10 @@ def _ensure_emulator_topics(
             pass
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    settings = get_settings()
-    app.state.settings = settings
-
-    if settings.otel_enabled:
-        init_observability(settings)
-        logger.info("otel_initialized")
+def _create_publisher_client(settings: Settings):
+    from google.cloud import pubsub_v1
 
-    app.state.firestore_client = AsyncClient(project=settings.gcp_project_id)
-    app.state.publisher_client = pubsub_v1.PublisherClient(
+    client = pubsub_v1.PublisherClient(
         publisher_options=pubsub_v1.types.PublisherOptions(
             enable_message_ordering=True,
         )
@@ -63,20 +70,138 @@ async def lifespan(app: FastAPI):
 
     # Auto-create topics when running against the Pub/Sub emulator
     if os.environ.get("PUBSUB_EMULATOR_HOST"):
-        _ensure_emulator_topics(
-            app.state.publisher_client,
-            settings.gcp_project_id,
-            [settings.event_bus_topic],
+        _ensure_emulator_topics(client, settings.gcp_project_id, [settings.event_bus_topic])
+        logger.info("pubsub_emulator_mode", host=os.environ["PUBSUB_EMULATOR_HOST"])
+    return client
+
+
+def _init_observability(settings: Settings, app: FastAPI) -> None:
+    from scoring.observability.setup import init_observability
+
+    try:
+        init_observability(settings, app)
+    except Exception as e:
+        # Runs in the background: the service keeps serving without telemetry
+        logger.error("otel_init_failed", error=str(e))
+        return
+    logger.info("otel_initialized")
+
+
+async def _import_modules(profiler: StartupProfiler, names: list[str]) -> None:
+    if profiler.enabled:
+        # One at a time, so each module's import cost is measured on its own
+        for name in names:
+            await asyncio.to_thread(profiler.import_module, name)
+    else:
+        await asyncio.gather(
+            *(asyncio.to_thread(profiler.import_module, name) for name in names)
         )
-        logger.info(
-            "pubsub_emulator_mode",
-            host=os.environ["PUBSUB_EMULATOR_HOST"],
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    app.state.settings = settings
+    profiler = StartupProfiler(enabled=settings.startup_profile)
+    app.state.startup_profile = profiler
+
+    # Exporters resolve credentials and open gRPC channels; that runs in a
+    # worker thread off the critical path. Spans and metrics recorded before
+    # the providers are installed are dropped.
+    if settings.otel_enabled:
+        app.state.observability_task = asyncio.create_task(
+            asyncio.to_thread(profiler.timed, "observability", _init_observability, settings, app)
         )
+        if profiler.enabled:
+            await app.state.observability_task
+
+    await _import_modules(profiler, _CLIENT_MODULES)
+
+    from google.cloud.firestore import AsyncClient
+
+    from scoring.services.llm_backend import create_llm_backend
+
+    # The publisher is thread-based and may talk to the emulator, so it is
+    # built in a worker thread; the async clients are bound to this loop.
+    publisher_task = asyncio.create_task(
+        asyncio.to_thread(profiler.timed, "publisher_client", _create_publisher_client, settings)
+    )
+    app.state.firestore_client = profiler.timed(
+        "firestore_client", lambda: AsyncClient(project=settings.gcp_project_id)
+    )
+    app.state.llm_backend = profiler.timed("llm_backend", create_llm_backend, settings)
+    app.state.publisher_client = await publisher_task
+    app.state.score_cache_front = (
+        LRUCache(settings.score_cache_size) if settings.score_cache_enabled else None
+    )
 
     logger.info("clients_initialized", project=settings.gcp_project_id)
+    profiler.finish()
+
+    # Connections are warmed in the background: /ready reports 503 until
+    # every dependency has answered once, while /health stays a liveness check.
+    app.state.warmup = build_warmup(
+        app.state.firestore_client, app.state.publisher_client, app.state.llm_backend, settings
+    )
+    warmup_task = asyncio.create_task(app.state.warmup.run())
+
+    app.state.breakers = build_breakers(settings) if settings.breaker_enabled else None
+    app.state.llm_scheduler = LLMScheduler(settings)
+    app.state.usage_ledger = UsageLedger(lambda: build_firestore_repo(app.state), settings)
+    usage_task = None
+    if settings.usage_ledger_enabled:
+        usage_task = asyncio.create_task(app.state.usage_ledger.run())
+    # Created after the scheduler, whose slots its batches take
+    app.state.micro_batcher = build_micro_batcher(app.state)
+    app.state.job_executor = JobExecutor(lambda: build_firestore_repo(app.state), settings)
+
+    completion_source = None
+    if settings.sse_cross_instance:
+        from google.cloud import firestore
+
+        # Listeners need the synchronous client; it resolves credentials on creation
+        watch_client = await asyncio.to_thread(firestore.Client, project=settings.gcp_project_id)
+        completion_source = FirestoreCompletionSource(
+            settings, asyncio.get_running_loop(), watch_client
+        )
+    app.state.completion_broker = CompletionBroker(settings, completion_source)
+    if completion_source is not None:
+        completion_source.broker = app.state.completion_broker
+
+    app.state.rescore_worker = None
+    rescore_task = None
+    if settings.stale_rescore_enabled:
+        app.state.rescore_worker = RescoreWorker(
+            service_factory=lambda: build_scoring_service(app.state),
+            repo_factory=lambda: build_firestore_repo(app.state),
+            settings=settings,
+        )
+        rescore_task = asyncio.create_task(app.state.rescore_worker.run())
 
     yield
 
+    background = [t for t in (warmup_task, rescore_task) if t is not None]
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if app.state.micro_batcher is not None:
+        await app.state.micro_batcher.close()
+    await app.state.job_executor.shutdown()
+    if usage_task is not None:
+        usage_task.cancel()
+        # A flush in progress finishes or unwinds before the final one
+        await asyncio.gather(usage_task, return_exceptions=True)
+    # After the last scorings, so their usage reaches the ledger
+    await app.state.usage_ledger.close()
+    replay_task = getattr(app.state, "dlq_replay_task", None)
+    if replay_task is not None and not replay_task.done():
+        # The run records itself as interrupted and hands its leases back
+        replay_task.cancel()
+        await asyncio.gather(replay_task, return_exceptions=True)
+    if getattr(app.state, "subscriber_client", None) is not None:
+        app.state.subscriber_client.close()
+    if completion_source is not None:
+        await completion_source.close()
     app.state.firestore_client.close()
     logger.info("shutdown_complete")
 
@@ -84,3 +209,6 @@ async def lifespan(app: FastAPI):
 app = FastAPI(title="Candidate Scoring Service", lifespan=lifespan)
 app.include_router(router)
 app.include_router(scores_router)
+app.include_router(admin_router)
+app.add_exception_handler(CircuitOpenError, circuit_open_handler)
+app.add_exception_handler(TokenBudgetExceededError, budget_exceeded_handler)
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field
 
 # --- Pub/Sub push envelope (wraps all events) ---
 
@@ -60,6 +60,31 @@ class ApplicationUpsertedData(BaseModel):
     after: ApplicationSnapshot | None = None
 
 
+class ApplicationUpsertedPayload(BaseModel):
+    """EventPayload with ``data`` typed, so it validates in one JSON pass."""
+
+    data: ApplicationUpsertedData | None = None
+    error: dict[str, Any] | None = None
+
+
+# --- Incoming vacancy / candidate change events ---
+
+
+class EntityUpsertedData(BaseModel):
+    """``before``/``after`` snapshots of a vacancy or candidate.
+
+    Only the reference ID is read, so the snapshots are kept as plain dicts.
+    """
+
+    before: dict[str, Any] | None = None
+    after: dict[str, Any] | None = None
+
+
+class EntityUpsertedPayload(BaseModel):
+    data: EntityUpsertedData | None = None
+    error: dict[str, Any] | None = None
+
+
 # --- Outgoing score event data (snake_case) ---
 
 
@@ -128,6 +153,19 @@ class AtsDocuments(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+class DocumentFile(BaseModel):
+    """A candidate document attached to the prompt as a file."""
+
+    uri: str
+    # Kind of the text extracted from the file ("resume", "job_description" or
+    # "assessment") when the ATS document holding the file also holds the text
+    kind: str | None = None
+    # That text, to check it is the text the prompt would send
+    text: str | None = Field(default=None, repr=False)
+    # Page count when the ATS records it
+    pages: int | None = None
+
+
 # --- LLM response ---
 
 
@@ -136,6 +174,26 @@ class LLMScoringResponse(BaseModel):
     reasoning: str
 
 
+class LLMVacancyScore(LLMScoringResponse):
+    vacancy_id: str
+
+
+class LLMMultiScoringResponse(BaseModel):
+    """One score per vacancy, for a candidate scored against several at once."""
+
+    scores: list[LLMVacancyScore]
+
+
+class LLMCandidateScore(LLMScoringResponse):
+    candidate_id: str
+
+
+class LLMMultiCandidateScoringResponse(BaseModel):
+    """One score per candidate, for several candidates scored against one vacancy."""
+
+    scores: list[LLMCandidateScore]
+
+
 # --- Score request (HTTP API) ---
 
 
@@ -146,6 +204,51 @@ class ScoreRequest(BaseModel):
     application_id: str
 
 
+class CandidateApplication(BaseModel):
+    application_id: str
+    vacancy_reference_id: str
+
+
+class CandidateScoreRequest(BaseModel):
+    """Several applications of one candidate, scored with shared LLM calls."""
+
+    workspace_id: str
+    candidate_reference_id: str
+    applications: list[CandidateApplication] = Field(min_length=1, max_length=50)
+
+
+# --- HTTP API responses ---
+
+
+class EntityChangedResponse(BaseModel):
+    status: Literal["ok", "skipped"]
+    reason: str | None = None
+    marked_stale: int = 0
+    queued: int = 0
+
+
+class ProcessCandidateResponse(BaseModel):
+    status: Literal["ok", "skipped"]
+    reason: str | None = None
+    application_id: str | None = None
+    score: int | None = None
+    reasoning: str | None = None
+
+
+class DependencyStatus(BaseModel):
+    status: Literal["pending", "ok", "failed"] = "pending"
+    latency_ms: float | None = None
+    attempts: int = 0
+    error: str | None = None
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["ready", "warming"]
+    dependencies: dict[str, DependencyStatus] = Field(default_factory=dict)
+    # Circuit breaker state per dependency: closed, open or half_open
+    breakers: dict[str, str] = Field(default_factory=dict)
+
+
 # --- Scoring result ---
 
 
@@ -160,3 +263,183 @@ class ScoringResult(BaseModel):
     latency_ms: int
     tokens: dict = Field(default_factory=dict)
     scored_at: datetime = Field(default_factory=datetime.utcnow)
+    cache_hit: bool = False
+    # Fingerprint of everything sent to the model; None for results stored
+    # before fingerprints were recorded
+    input_fingerprint: str | None = None
+    # Set when the vacancy or candidate changed after scoring; cleared by a rescore
+    stale: bool = False
+    stale_since: datetime | None = None
+    # Scoring tier the model was called with; None for cache hits and older results
+    tier: str | None = None
+    # Files named by the triggering event, so an unchanged re-score compares
+    # the same inputs; None when read from the ATS documents
+    file_uris: list[str] | None = None
+    # Set for results written by a batch prediction job
+    batch_job_id: str | None = None
+
+
+class CachedScore(BaseModel):
+    """A score stored under the fingerprint of the LLM input that produced it."""
+
+    fingerprint: str
+    score: int = Field(ge=0, le=100)
+    reasoning: str
+    model: str
+    tokens: dict = Field(default_factory=dict)
+    created_at: datetime
+    expires_at: datetime
+
+
+class ScoreListResponse(BaseModel):
+    results: list[ScoringResult]
+    count: int
+
+
+# --- Async scoring jobs ---
+
+
+class ScoringJob(BaseModel):
+    job_id: str
+    workspace_id: str
+    kind: Literal["score", "re-score"]
+    application_id: str
+    status: Literal["queued", "running", "succeeded", "failed"] = "queued"
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: ScoringResult | None = None
+    error: str | None = None
+    expires_at: datetime
+
+
+# --- Dead-letter replay ---
+
+
+class ReplayFilter(BaseModel):
+    workspace_id: str | None = None
+    event_types: list[str] = Field(default_factory=list)
+    # Event timestamps, with a timezone
+    since: AwareDatetime | None = None
+    until: AwareDatetime | None = None
+
+    def matches(self, attributes: EventAttributes) -> bool:
+        if self.workspace_id and attributes.workspace_id != self.workspace_id:
+            return False
+        if self.event_types and attributes.event_type not in self.event_types:
+            return False
+        if self.since and attributes.timestamp < self.since:
+            return False
+        return not (self.until and attributes.timestamp >= self.until)
+
+
+class ReplayRequest(ReplayFilter):
+    max_messages: int | None = Field(default=None, gt=0)
+    rate_per_s: float | None = Field(default=None, gt=0)
+
+
+class ReplayRun(BaseModel):
+    run_id: str
+    filter: ReplayFilter = Field(default_factory=ReplayFilter)
+    max_messages: int | None = None
+    rate_per_s: float
+    status: Literal["running", "completed", "failed", "interrupted"] = "running"
+    # Checkpointed after every batch
+    pulled: int = 0
+    replayed: int = 0
+    skipped: int = 0
+    filtered_out: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    last_error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime
+
+    @property
+    def handled(self) -> int:
+        """Messages replayed or skipped, which count toward ``max_messages``."""
+        return self.replayed + self.skipped
+
+
+# --- Workspace backfill ---
+
+
+class BackfillRun(BaseModel):
+    """A pass over a workspace's applications that scores the unscored ones."""
+
+    run_id: str
+    workspace_id: str
+    rate_per_s: float
+    concurrency: int
+    status: Literal["running", "completed", "failed", "interrupted"] = "running"
+    # Document ID of the last application of the last finished page; a
+    # resumed run starts after it
+    cursor: str | None = None
+    # Applications in the workspace when the run started, for the ETA
+    total: int | None = None
+    # Checkpointed after every page
+    scanned: int = 0
+    already_scored: int = 0
+    scored: int = 0
+    # Applications without a candidate or vacancy reference
+    skipped: int = 0
+    failed: int = 0
+    last_error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime
+
+
+# --- Batch prediction ---
+
+
+class BatchScoringRun(BaseModel):
+    """Progress of one batch prediction job, from submission to bulk write."""
+
+    job_id: str
+    name: str
+    status: Literal["running", "succeeded", "failed"] = "running"
+    submitted: int = 0
+    # Applications whose inputs could not be loaded, so were never submitted
+    skipped: int = 0
+    saved: int = 0
+    # Responses that did not validate as LLMScoringResponse
+    invalid: int = 0
+    failed: int = 0
+    # Saved results whose score.calculated event could not be published
+    unpublished: int = 0
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+# --- Token usage ---
+
+
+class TokenCounts(BaseModel):
+    """Tokens spent by scorings that called the model, and their estimated cost."""
+
+    scorings: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    thinking_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class DailyTokenUsage(TokenCounts):
+    """A workspace's usage ledger entry for one UTC day, in total and per model."""
+
+    workspace_id: str
+    # YYYY-MM-DD
+    date: str
+    models: dict[str, TokenCounts] = {}
+    updated_at: datetime | None = None
+
+
+class UsageListResponse(BaseModel):
+    days: list[DailyTokenUsage]
+    count: int
@@ -1,6 +1,6 @@
 from opentelemetry import metrics
 
-from scoring.models import ScoringResult
+from scoring.models import ScoringResult, TokenCounts
 
 meter = metrics.get_meter("scoring")
 
@@ -36,13 +36,250 @@ active_processings = meter.create_up_down_counter(
     description="Number of concurrent scoring operations",
 )
 
+publish_duration = meter.create_histogram(
+    "scoring.publish.duration",
+    description="Pub/Sub publish duration in milliseconds",
+    unit="ms",
+)
+
+publish_resumed = meter.create_counter(
+    "scoring.publish.resumed",
+    description="Number of ordering keys resumed after a failed publish",
+)
+
+score_cache_lookups = meter.create_counter(
+    "scoring.score_cache.lookups",
+    description="Score cache lookups by where they were answered (front, store, miss)",
+)
+
+scores_marked_stale = meter.create_counter(
+    "scoring.stale.marked",
+    description="Scores marked stale after a vacancy or candidate change",
+)
+
+rescore_enqueued = meter.create_counter(
+    "scoring.rescore.enqueued",
+    description="Stale rescore requests by outcome (queued, collapsed, dropped)",
+)
+
+rescore_completed = meter.create_counter(
+    "scoring.rescore.completed",
+    description="Stale rescores by outcome (rescored, unchanged, skipped, failed)",
+)
+
+scoring_jobs = meter.create_counter(
+    "scoring.jobs",
+    description="Async scoring jobs by kind and outcome (queued, rejected, succeeded, failed)",
+)
+
+completions_dropped = meter.create_counter(
+    "scoring.sse.dropped",
+    description="Score completions dropped from a full stream subscriber buffer",
+)
+
+llm_queue_wait = meter.create_histogram(
+    "scoring.llm.queue_wait",
+    description="Time spent waiting for an LLM slot, by lane and workspace",
+    unit="ms",
+)
+
+llm_queue_depth = meter.create_up_down_counter(
+    "scoring.llm.queue_depth",
+    description="Requests waiting for an LLM slot, by lane",
+)
+
+llm_granted = meter.create_counter(
+    "scoring.llm.granted",
+    description="LLM slots granted, by lane and workspace",
+)
+
+llm_rejected = meter.create_counter(
+    "scoring.llm.rejected",
+    description="LLM calls rejected because the workspace queue was full",
+)
+
+breaker_state = meter.create_gauge(
+    "scoring.breaker.state",
+    description="Circuit breaker state by dependency: 0 closed, 1 half-open, 2 open",
+)
+
+breaker_transitions = meter.create_counter(
+    "scoring.breaker.transitions",
+    description="Circuit breaker state changes, by dependency and new state",
+)
+
+breaker_rejected = meter.create_counter(
+    "scoring.breaker.rejected",
+    description="Calls failed fast because the dependency's breaker was open",
+)
+
+dlq_replayed = meter.create_counter(
+    "scoring.dlq.replay",
+    description="Dead-lettered messages handled by replay, by outcome",
+)
+
+backfill_applications = meter.create_counter(
+    "scoring.backfill.applications",
+    description="Applications seen by workspace backfills, by outcome",
+)
+
+batch_results = meter.create_counter(
+    "scoring.batch.results",
+    description="Batch prediction results by outcome (saved, invalid, failed, unpublished)",
+)
+
+microbatch_size = meter.create_histogram(
+    "scoring.microbatch.size",
+    description="Scorings per micro-batched LLM call, by lane",
+)
+
+microbatch_wait = meter.create_histogram(
+    "scoring.microbatch.wait",
+    description="Time a scoring waited for its micro-batch to be sent, by lane",
+    unit="ms",
+)
+
+document_tokens_saved = meter.create_counter(
+    "scoring.documents.tokens_saved",
+    description="Estimated prompt tokens saved by sending each candidate document once",
+)
+
+llm_tokens = meter.create_counter(
+    "scoring.llm.tokens",
+    description="Tokens spent on LLM calls, by workspace, model and type",
+)
+
+llm_cost = meter.create_counter(
+    "scoring.llm.cost",
+    description="Estimated LLM cost in USD, by workspace and model",
+    unit="USD",
+)
+
+usage_budget_actions = meter.create_counter(
+    "scoring.usage.budget",
+    description="Scorings downgraded or deferred by a workspace token budget",
+)
+
+trace_decisions = meter.create_counter(
+    "scoring.telemetry.tail_decisions",
+    description="Unsampled traces retained, dropped or evicted by tail sampling",
+)
+
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
 
 def record_scoring(result: ScoringResult, llm_latency_ms: int) -> None:
     messages_processed.add(1)
-    processing_duration.record(result.latency_ms)
-    llm_duration.record(llm_latency_ms)
+    processing_duration.record(result.latency_ms, {"cache_hit": result.cache_hit})
+    if not result.cache_hit:
+        llm_duration.record(llm_latency_ms)
     score_distribution.record(result.score)
 
 
 def record_failure(error_type: str) -> None:
     messages_failed.add(1, {"error_type": error_type})
+
+
+def record_publish(
+    duration_ms: float, event_type: str, ordering_strategy: str, outcome: str
+) -> None:
+    # Labelled by strategy rather than the key itself to keep cardinality bounded
+    publish_duration.record(
+        duration_ms,
+        {"event_type": event_type, "ordering_strategy": ordering_strategy, "outcome": outcome},
+    )
+
+
+def record_publish_resumed(event_type: str, ordering_strategy: str) -> None:
+    publish_resumed.add(1, {"event_type": event_type, "ordering_strategy": ordering_strategy})
+
+
+def record_score_cache_lookup(outcome: str) -> None:
+    score_cache_lookups.add(1, {"outcome": outcome})
+
+
+def record_scores_marked_stale(entity: str, count: int) -> None:
+    scores_marked_stale.add(count, {"entity": entity})
+
+
+def record_rescore_enqueued(outcome: str) -> None:
+    rescore_enqueued.add(1, {"outcome": outcome})
+
+
+def record_rescore(outcome: str) -> None:
+    rescore_completed.add(1, {"outcome": outcome})
+
+
+def record_job(kind: str, outcome: str) -> None:
+    scoring_jobs.add(1, {"kind": kind, "outcome": outcome})
+
+
+def record_completion_dropped() -> None:
+    completions_dropped.add(1)
+
+
+def record_llm_queue_wait(lane: str, workspace_id: str, wait_ms: float) -> None:
+    llm_queue_wait.record(wait_ms, {"lane": lane, "workspace_id": workspace_id})
+
+
+def record_llm_queue_depth(lane: str, delta: int) -> None:
+    llm_queue_depth.add(delta, {"lane": lane})
+
+
+def record_llm_granted(lane: str, workspace_id: str) -> None:
+    llm_granted.add(1, {"lane": lane, "workspace_id": workspace_id})
+
+
+def record_llm_rejected(lane: str, workspace_id: str) -> None:
+    llm_rejected.add(1, {"lane": lane, "workspace_id": workspace_id})
+
+
+def record_breaker_state(dependency: str, state: str) -> None:
+    breaker_state.set(_BREAKER_STATE_VALUES[state], {"dependency": dependency})
+    breaker_transitions.add(1, {"dependency": dependency, "state": state})
+
+
+def record_breaker_rejected(dependency: str) -> None:
+    breaker_rejected.add(1, {"dependency": dependency})
+
+
+def record_dlq_replay(outcome: str) -> None:
+    dlq_replayed.add(1, {"outcome": outcome})
+
+
+def record_backfill(outcome: str, count: int = 1) -> None:
+    if count:
+        backfill_applications.add(count, {"outcome": outcome})
+
+
+def record_batch_results(outcome: str, count: int) -> None:
+    if count:
+        batch_results.add(count, {"outcome": outcome})
+
+
+def record_document_tokens_saved(kind: str, representation: str, tokens: int) -> None:
+    document_tokens_saved.add(tokens, {"kind": kind, "dropped": representation})
+
+
+def record_microbatch(lane: str, size: int, waits_ms: list[float]) -> None:
+    microbatch_size.record(size, {"lane": lane})
+    for wait_ms in waits_ms:
+        microbatch_wait.record(wait_ms, {"lane": lane})
+
+
+def record_token_usage(workspace_id: str, model: str, counts: TokenCounts) -> None:
+    labels = {"workspace_id": workspace_id, "model": model}
+    for kind in ("prompt", "completion", "thinking"):
+        tokens = getattr(counts, f"{kind}_tokens")
+        if tokens:
+            llm_tokens.add(tokens, {**labels, "type": kind})
+    if counts.cost_usd:
+        llm_cost.add(counts.cost_usd, labels)
+
+
+def record_budget_action(workspace_id: str, action: str) -> None:
+    usage_budget_actions.add(1, {"workspace_id": workspace_id, "action": action})
+
+
+def record_trace_decision(decision: str) -> None:
+    trace_decisions.add(1, {"decision": decision})
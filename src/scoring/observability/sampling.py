@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanContext, SpanKind, StatusCode, TraceFlags
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+from scoring.config import Settings
+from scoring.observability.metrics import record_trace_decision
+
+# Like setup.py, this module pulls in the OTel SDK and is only imported from
+# the background observability task.
+
+
+class RecordUnsampled(Sampler):
+    """Records the spans ``sampler`` drops instead of discarding them.
+
+    Recorded but unsampled spans are not exported as they are; the
+    ``TailRetentionProcessor`` decides once their trace has finished.
+    """
+
+    def __init__(self, sampler: Sampler) -> None:
+        self._sampler = sampler
+
+    def should_sample(
+        self,
+        parent_context: Context | None,
+        trace_id: int,
+        name: str,
+        kind: SpanKind | None = None,
+        attributes: Attributes = None,
+        links: Sequence[Link] | None = None,
+        trace_state: TraceState | None = None,
+    ) -> SamplingResult:
+        result = self._sampler.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision is Decision.DROP:
+            return SamplingResult(Decision.RECORD_ONLY, result.attributes, result.trace_state)
+        return result
+
+    def get_description(self) -> str:
+        return f"RecordUnsampled{{{self._sampler.get_description()}}}"
+
+
+def build_sampler(settings: Settings) -> Sampler:
+    """Head sampler: ``otel_trace_sample_ratio`` of new traces, parents followed.
+
+    A sampled or unsampled parent decides for its children. Remote parents
+    (a ``traceparent`` header, e.g. set by Cloud Run) are only followed with
+    ``otel_trace_follow_remote_parent``; otherwise the ratio decides for them too.
+    """
+    ratio = TraceIdRatioBased(settings.otel_trace_sample_ratio)
+    if settings.otel_trace_follow_remote_parent:
+        sampler: Sampler = ParentBased(ratio)
+    else:
+        sampler = ParentBased(ratio, remote_parent_sampled=ratio, remote_parent_not_sampled=ratio)
+    if settings.otel_tail_sampling:
+        sampler = RecordUnsampled(sampler)
+    return sampler
+
+
+def _sampled(span: ReadableSpan) -> ReadableSpan:
+    """A copy of ``span`` flagged as sampled, so span processors export it."""
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            context.trace_id,
+            context.span_id,
+            context.is_remote,
+            TraceFlags(TraceFlags.SAMPLED),
+            context.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class TailRetentionProcessor(SpanProcessor):
+    """Exports unsampled traces after all when they turn out slow or failed.
+
+    Sampled spans go straight to ``processor``. Spans recorded but not sampled
+    (see ``RecordUnsampled``) are held per trace until the trace's local root
+    span ends; the trace is then exported if any of its spans failed or the
+    root took at least ``otel_tail_latency_ms``, and discarded otherwise. The
+    decision is remembered, so spans ending after their root follow it.
+
+    At most ``otel_tail_max_traces`` traces are held; the oldest is discarded
+    to make room.
+    """
+
+    def __init__(self, processor: SpanProcessor, settings: Settings) -> None:
+        self._processor = processor
+        self._latency_ns = int(settings.otel_tail_latency_ms * 1_000_000)
+        self._max_traces = settings.otel_tail_max_traces
+        self._pending: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._decided: OrderedDict[int, bool] = OrderedDict()
+        # Spans end on the event loop and in worker threads
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Context | None = None) -> None:
+        self._processor.on_start(span, parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self._processor.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        with self._lock:
+            retained = self._decided.get(trace_id)
+            if retained is None:
+                spans = self._pending.pop(trace_id, [])
+                spans.append(span)
+                if span.parent is not None and not span.parent.is_remote:
+                    self._pending[trace_id] = spans
+                    while len(self._pending) > self._max_traces:
+                        self._pending.popitem(last=False)
+                        record_trace_decision("evicted")
+                    return
+                retained = self._retain(span, spans)
+                self._decided[trace_id] = retained
+                while len(self._decided) > self._max_traces:
+                    self._decided.popitem(last=False)
+                record_trace_decision("retained" if retained else "dropped")
+            else:
+                spans = [span]
+
+        if retained:
+            for pending in spans:
+                self._processor.on_end(_sampled(pending))
+
+    def _retain(self, root: ReadableSpan, spans: list[ReadableSpan]) -> bool:
+        if any(s.status.status_code is StatusCode.ERROR for s in spans):
+            return True
+        if root.start_time is None or root.end_time is None:
+            return False
+        return root.end_time - root.start_time >= self._latency_ns
+
+    def shutdown(self) -> None:
+        self._processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._processor.force_flush(timeout_millis)
@@ -1,35 +1,83 @@
+from fastapi import FastAPI
 from opentelemetry import metrics, trace
-from opentelemetry.exporter.cloud_monitoring import CloudMonitoringMetricsExporter
-from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.export import MetricExporter, PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
 
 from scoring.config import Settings
+from scoring.observability.sampling import TailRetentionProcessor, build_sampler
 
+# This module pulls in the OTel SDK and the GCP exporters; scoring.main only
+# imports it from the background observability task during startup.
 
-def init_observability(settings: Settings) -> None:
-    resource = Resource.create({SERVICE_NAME: "scoring-worker"})
 
-    # Traces
-    tracer_provider = TracerProvider(resource=resource)
-    tracer_provider.add_span_processor(
-        BatchSpanProcessor(
-            CloudTraceSpanExporter(project_id=settings.gcp_project_id)
+def _exporters(settings: Settings) -> tuple[SpanExporter, MetricExporter]:
+    if settings.otel_exporter == "otlp":
+        # Optional dependency: pip install ".[otlp]"
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return (
+            OTLPSpanExporter(endpoint=settings.otel_otlp_endpoint),
+            OTLPMetricExporter(endpoint=settings.otel_otlp_endpoint),
         )
+
+    from opentelemetry.exporter.cloud_monitoring import CloudMonitoringMetricsExporter
+    from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+
+    return (
+        CloudTraceSpanExporter(project_id=settings.gcp_project_id),
+        CloudMonitoringMetricsExporter(project_id=settings.gcp_project_id),
+    )
+
+
+def span_processor(settings: Settings, exporter: SpanExporter) -> SpanProcessor:
+    """Batches spans for ``exporter``, behind tail retention when enabled."""
+    processor: SpanProcessor = BatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.otel_bsp_max_queue_size,
+        schedule_delay_millis=settings.otel_bsp_schedule_delay_ms,
+        max_export_batch_size=settings.otel_bsp_max_export_batch_size,
+        export_timeout_millis=settings.otel_bsp_export_timeout_ms,
+    )
+    if settings.otel_tail_sampling:
+        processor = TailRetentionProcessor(processor, settings)
+    return processor
+
+
+def instrument_app(
+    app: FastAPI, settings: Settings, tracer_provider: TracerProvider | None = None
+) -> None:
+    """Trace each request of ``app`` with one server span.
+
+    The app has already started, so its middleware stack is rebuilt on the
+    next request to pick up the instrumentation.
+    """
+    FastAPIInstrumentor.instrument_app(
+        app,
+        excluded_urls=settings.otel_excluded_urls,
+        exclude_spans=None if settings.otel_asgi_message_spans else ["receive", "send"],
+        tracer_provider=tracer_provider,
     )
+    app.middleware_stack = None
+
+
+def init_observability(settings: Settings, app: FastAPI | None = None) -> None:
+    resource = Resource.create({SERVICE_NAME: "scoring-worker"})
+    span_exporter, metric_exporter = _exporters(settings)
+
+    # Traces
+    tracer_provider = TracerProvider(resource=resource, sampler=build_sampler(settings))
+    tracer_provider.add_span_processor(span_processor(settings, span_exporter))
     trace.set_tracer_provider(tracer_provider)
 
     # Metrics
-    metric_reader = PeriodicExportingMetricReader(
-        CloudMonitoringMetricsExporter(project_id=settings.gcp_project_id),
-        export_interval_millis=60_000,
-    )
+    metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=60_000)
     meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
     metrics.set_meter_provider(meter_provider)
 
-    # Auto-instrument FastAPI
-    FastAPIInstrumentor().instrument()
+    if app is not None:
+        instrument_app(app, settings, tracer_provider)
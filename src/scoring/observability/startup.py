@@ -0,0 +1,58 @@
+import importlib
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, TypeVar
+
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class StartupProfiler:
+    """Records how long each startup phase takes.
+
+    Phases may run concurrently in worker threads, so their durations can
+    overlap; ``total_ms`` is wall-clock time from construction to ``finish``.
+    In profile mode heavy modules are imported one at a time through
+    ``import_module`` so each gets its own timing. Otherwise the imports run
+    in parallel with client setup.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases: dict[str, float] = {}
+        self.total_ms: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def timed(self, name: str, fn: Callable[..., T], *args: Any) -> T:
+        with self.phase(name):
+            return fn(*args)
+
+    def import_module(self, name: str) -> ModuleType:
+        with self.phase(f"import {name}"):
+            return importlib.import_module(name)
+
+    def finish(self) -> None:
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        if self.enabled:
+            logger.info("startup_profile", total_ms=self.total_ms, phases=self.phases)
+        else:
+            logger.info("startup_complete", total_ms=self.total_ms)
+
+    def to_dict(self) -> dict:
+        return {"total_ms": self.total_ms, "phases": dict(self.phases)}
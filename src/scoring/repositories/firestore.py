@@ -1,23 +1,62 @@
+from contextlib import AbstractContextManager, nullcontext
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Literal
+
 import structlog
-from google.cloud.firestore import AsyncClient
 from opentelemetry import trace
 
 from scoring.config import Settings
-from scoring.models import ATSCandidate, AtsDocuments, ATSVacancy, ScoringResult
+from scoring.models import (
+    ApplicationSnapshot,
+    ATSCandidate,
+    AtsDocuments,
+    ATSVacancy,
+    BackfillRun,
+    CachedScore,
+    DailyTokenUsage,
+    DocumentFile,
+    ReplayRun,
+    ScoringJob,
+    ScoringResult,
+    TokenCounts,
+)
+from scoring.services.breaker import CircuitBreaker
+
+if TYPE_CHECKING:
+    from google.cloud.firestore import AsyncClient
 
 logger = structlog.get_logger()
 tracer = trace.get_tracer(__name__)
 
+# Firestore's limit on writes per batch
+_MAX_BATCH_WRITES = 500
+
+# AtsDocuments text fields, and the document kind each holds
+_ATS_TEXT_FIELDS = {
+    "resume": "resume",
+    "jobDescription": "job_description",
+    "assessment": "assessment",
+}
+
 
 class FirestoreRepository:
-    def __init__(self, client: AsyncClient, settings: Settings) -> None:
+    def __init__(
+        self,
+        client: "AsyncClient",
+        settings: Settings,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
         self._client = client
         self._settings = settings
+        self._breaker = breaker
+
+    def _guard(self) -> AbstractContextManager[None]:
+        return self._breaker.guard() if self._breaker else nullcontext()
 
     async def get_candidate(
         self, workspace_id: str, candidate_reference_id: str
     ) -> ATSCandidate:
-        with tracer.start_as_current_span("firestore.get_candidate"):
+        with tracer.start_as_current_span("firestore.get_candidate"), self._guard():
             doc = (
                 await self._client.collection("Workspaces")
                 .document(workspace_id)
@@ -35,7 +74,7 @@ class FirestoreRepository:
     async def get_vacancy(
         self, workspace_id: str, vacancy_reference_id: str
     ) -> ATSVacancy:
-        with tracer.start_as_current_span("firestore.get_vacancy"):
+        with tracer.start_as_current_span("firestore.get_vacancy"), self._guard():
             doc = (
                 await self._client.collection("Workspaces")
                 .document(workspace_id)
@@ -53,26 +92,28 @@ class FirestoreRepository:
     async def get_ats_documents(
         self, workspace_id: str, candidate_reference_id: str
     ) -> AtsDocuments:
-        with tracer.start_as_current_span("firestore.get_ats_documents"):
-            docs_ref = (
-                self._client.collection("Workspaces")
-                .document(workspace_id)
-                .collection("Candidates")
-                .document(candidate_reference_id)
-                .collection("AtsDocuments")
-            )
-            merged: dict = {}
-            async for doc in docs_ref.stream():
-                data = doc.to_dict()
-                if data:
-                    merged.update(data)
-            return AtsDocuments(**merged)
+        ats_documents, _ = await self.get_ats_documents_and_files(
+            workspace_id, candidate_reference_id
+        )
+        return ats_documents
 
     async def get_ats_document_file_uris(
         self, workspace_id: str, candidate_reference_id: str
     ) -> list[str]:
         """Extract GCS URIs from AtsDocuments subcollection."""
-        with tracer.start_as_current_span("firestore.get_ats_document_file_uris"):
+        _, files = await self.get_ats_documents_and_files(workspace_id, candidate_reference_id)
+        return [f.uri for f in files]
+
+    async def get_ats_documents_and_files(
+        self, workspace_id: str, candidate_reference_id: str
+    ) -> tuple[AtsDocuments, list[DocumentFile]]:
+        """The candidate's merged ATS document texts and their stored files, in one read.
+
+        When the document holding a file also holds a text field, that text
+        was extracted from the file, and the file carries the text and its
+        kind, e.g. "resume".
+        """
+        with tracer.start_as_current_span("firestore.get_ats_documents"), self._guard():
             docs_ref = (
                 self._client.collection("Workspaces")
                 .document(workspace_id)
@@ -80,20 +121,93 @@ class FirestoreRepository:
                 .document(candidate_reference_id)
                 .collection("AtsDocuments")
             )
-            uris: list[str] = []
+            merged: dict = {}
+            files: list[DocumentFile] = []
             async for doc in docs_ref.stream():
                 data = doc.to_dict()
                 if not data:
                     continue
+                merged.update(data)
                 content = data.get("content", {})
                 ext_storage = content.get("externalStorage", {})
                 gcs_uri = ext_storage.get("gcsUri")
-                if gcs_uri:
-                    uris.append(gcs_uri)
-            return uris
+                if not gcs_uri:
+                    continue
+                text_field = next((f for f in _ATS_TEXT_FIELDS if data.get(f)), None)
+                files.append(
+                    DocumentFile(
+                        uri=gcs_uri,
+                        kind=_ATS_TEXT_FIELDS.get(text_field),
+                        text=data.get(text_field),
+                        pages=content.get("pageCount"),
+                    )
+                )
+            return AtsDocuments(**merged), files
+
+    async def list_applications(
+        self, workspace_id: str, after: str | None, limit: int
+    ) -> tuple[list[ApplicationSnapshot], str | None]:
+        """A page of the workspace's applications in document ID order.
+
+        Returns the applications and the ID of the page's last document, to
+        pass as ``after`` for the next page (None when the page is empty).
+        Missing candidate or vacancy references come back as empty strings.
+        """
+        with tracer.start_as_current_span("firestore.list_applications"), self._guard():
+            collection = (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("ATSCandidateVacancyApplications")
+            )
+            query = collection.order_by("__name__").limit(limit)
+            if after is not None:
+                query = query.start_after({"__name__": collection.document(after)})
+            applications: list[ApplicationSnapshot] = []
+            last_id = None
+            async for doc in query.stream():
+                data = doc.to_dict() or {}
+                last_id = doc.id
+                applications.append(
+                    ApplicationSnapshot(
+                        application_id=str(data.get("id") or doc.id),
+                        candidate_id=data.get("candidateReferenceId") or "",
+                        vacancy_id=data.get("vacancyReferenceId") or "",
+                    )
+                )
+            return applications, last_id
+
+    async def count_applications(self, workspace_id: str) -> int:
+        with tracer.start_as_current_span("firestore.count_applications"), self._guard():
+            result = await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("ATSCandidateVacancyApplications")
+                .count()
+                .get()
+            )
+            return int(result[0][0].value)
+
+    async def scored_application_ids(
+        self, workspace_id: str, application_ids: list[str]
+    ) -> set[str]:
+        """The subset of ``application_ids`` that already have a stored score."""
+        if not application_ids:
+            return set()
+        with tracer.start_as_current_span("firestore.scored_application_ids"), self._guard():
+            scores = (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("CandidateVacancyApplicationScores")
+            )
+            refs = [scores.document(application_id) for application_id in application_ids]
+            scored: set[str] = set()
+            async for doc in self._client.get_all(refs, field_paths=["score"]):
+                if doc.exists:
+                    scored.add(doc.id)
+            return scored
 
     async def save_scoring_result(self, result: ScoringResult) -> str:
-        with tracer.start_as_current_span("firestore.save_result"):
+        with tracer.start_as_current_span("firestore.save_result"), self._guard():
             doc_ref = (
                 self._client.collection("Workspaces")
                 .document(result.workspace_id)
@@ -112,10 +226,27 @@ class FirestoreRepository:
             )
             return doc_ref.id
 
+    async def save_scoring_results(self, results: list[ScoringResult]) -> None:
+        """Write many results in batched commits, for bulk imports."""
+        with tracer.start_as_current_span("firestore.save_results") as span, self._guard():
+            span.set_attribute("firestore.result_count", len(results))
+            for start in range(0, len(results), _MAX_BATCH_WRITES):
+                batch = self._client.batch()
+                for result in results[start : start + _MAX_BATCH_WRITES]:
+                    doc_ref = (
+                        self._client.collection("Workspaces")
+                        .document(result.workspace_id)
+                        .collection("CandidateVacancyApplicationScores")
+                        .document(result.application_id)
+                    )
+                    batch.set(doc_ref, result.model_dump())
+                await batch.commit()
+            logger.info("scoring_results_saved", count=len(results))
+
     async def get_scoring_result(
         self, workspace_id: str, application_id: str
     ) -> ScoringResult:
-        with tracer.start_as_current_span("firestore.get_scoring_result"):
+        with tracer.start_as_current_span("firestore.get_scoring_result"), self._guard():
             doc = await (
                 self._client.collection("Workspaces")
                 .document(workspace_id)
@@ -137,7 +268,7 @@ class FirestoreRepository:
         vacancy_id: str | None = None,
         limit: int = 50,
     ) -> list[ScoringResult]:
-        with tracer.start_as_current_span("firestore.query_scoring_results"):
+        with tracer.start_as_current_span("firestore.query_scoring_results"), self._guard():
             query = (
                 self._client.collection("Workspaces")
                 .document(workspace_id)
@@ -153,3 +284,204 @@ class FirestoreRepository:
             async for doc in query.stream():
                 results.append(ScoringResult(**doc.to_dict()))
             return results
+
+    async def get_cached_score(self, workspace_id: str, fingerprint: str) -> CachedScore | None:
+        with tracer.start_as_current_span("firestore.get_cached_score"), self._guard():
+            doc = await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("ScoreCache")
+                .document(fingerprint)
+                .get()
+            )
+            if not doc.exists:
+                return None
+            return CachedScore(**doc.to_dict())
+
+    async def save_cached_score(self, workspace_id: str, entry: CachedScore) -> None:
+        with tracer.start_as_current_span("firestore.save_cached_score"), self._guard():
+            await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("ScoreCache")
+                .document(entry.fingerprint)
+                .set(entry.model_dump())
+            )
+
+    async def mark_scores_stale(
+        self,
+        workspace_id: str,
+        field: Literal["candidate_id", "vacancy_id"],
+        reference_id: str,
+    ) -> list[str]:
+        """Flag every score of a candidate or vacancy as stale.
+
+        Returns the affected application IDs. Scores that are already stale
+        keep their original ``stale_since``.
+        """
+        with tracer.start_as_current_span("firestore.mark_scores_stale") as span, self._guard():
+            query = (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("CandidateVacancyApplicationScores")
+                .where(field, "==", reference_id)
+                .select(["stale"])
+            )
+            now = datetime.now(UTC)
+            application_ids: list[str] = []
+            batch = self._client.batch()
+            pending = 0
+            async for doc in query.stream():
+                application_ids.append(doc.id)
+                if (doc.to_dict() or {}).get("stale"):
+                    continue
+                batch.update(doc.reference, {"stale": True, "stale_since": now})
+                pending += 1
+                if pending == _MAX_BATCH_WRITES:
+                    await batch.commit()
+                    batch = self._client.batch()
+                    pending = 0
+            if pending:
+                await batch.commit()
+
+            span.set_attribute("firestore.stale_count", len(application_ids))
+            logger.info(
+                "scores_marked_stale",
+                workspace_id=workspace_id,
+                field=field,
+                reference_id=reference_id,
+                count=len(application_ids),
+            )
+            return application_ids
+
+    async def clear_stale(self, workspace_id: str, application_id: str) -> None:
+        with tracer.start_as_current_span("firestore.clear_stale"), self._guard():
+            await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("CandidateVacancyApplicationScores")
+                .document(application_id)
+                .update({"stale": False, "stale_since": None})
+            )
+
+    async def save_job(self, job: ScoringJob) -> None:
+        with tracer.start_as_current_span("firestore.save_job"), self._guard():
+            await (
+                self._client.collection("Workspaces")
+                .document(job.workspace_id)
+                .collection("ScoringJobs")
+                .document(job.job_id)
+                .set(job.model_dump())
+            )
+
+    async def get_job(self, workspace_id: str, job_id: str) -> ScoringJob:
+        with tracer.start_as_current_span("firestore.get_job"), self._guard():
+            doc = await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("ScoringJobs")
+                .document(job_id)
+                .get()
+            )
+            if not doc.exists:
+                raise ValueError(f"Job {job_id} not found in workspace {workspace_id}")
+            return ScoringJob(**doc.to_dict())
+
+    async def save_replay_run(self, run: ReplayRun) -> None:
+        with tracer.start_as_current_span("firestore.save_replay_run"), self._guard():
+            await self._client.collection("DlqReplays").document(run.run_id).set(run.model_dump())
+
+    async def get_replay_run(self, run_id: str) -> ReplayRun:
+        with tracer.start_as_current_span("firestore.get_replay_run"), self._guard():
+            doc = await self._client.collection("DlqReplays").document(run_id).get()
+            if not doc.exists:
+                raise ValueError(f"Replay run {run_id} not found")
+            return ReplayRun(**doc.to_dict())
+
+    async def is_event_replayed(self, event_id: str) -> bool:
+        with tracer.start_as_current_span("firestore.is_event_replayed"), self._guard():
+            doc = await self._client.collection("DlqReplayedEvents").document(event_id).get()
+            return doc.exists
+
+    async def mark_event_replayed(self, event_id: str, run_id: str) -> None:
+        with tracer.start_as_current_span("firestore.mark_event_replayed"), self._guard():
+            now = datetime.now(UTC)
+            await (
+                self._client.collection("DlqReplayedEvents")
+                .document(event_id)
+                .set(
+                    {
+                        "run_id": run_id,
+                        "replayed_at": now,
+                        "expires_at": now + timedelta(seconds=self._settings.dlq_replay_ttl_s),
+                    }
+                )
+            )
+
+    async def save_backfill_run(self, run: BackfillRun) -> None:
+        with tracer.start_as_current_span("firestore.save_backfill_run"), self._guard():
+            await (
+                self._client.collection("Workspaces")
+                .document(run.workspace_id)
+                .collection("Backfills")
+                .document(run.run_id)
+                .set(run.model_dump())
+            )
+
+    async def get_backfill_run(self, workspace_id: str, run_id: str) -> BackfillRun:
+        with tracer.start_as_current_span("firestore.get_backfill_run"), self._guard():
+            doc = await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("Backfills")
+                .document(run_id)
+                .get()
+            )
+            if not doc.exists:
+                raise ValueError(f"Backfill run {run_id} not found in workspace {workspace_id}")
+            return BackfillRun(**doc.to_dict())
+
+    async def add_token_usage(
+        self, workspace_id: str, day: str, model: str, counts: TokenCounts
+    ) -> None:
+        """Add ``counts`` to the workspace's usage ledger entry for ``day``.
+
+        Counters are incremented server-side, so instances can add to the
+        same entry without reading it first.
+        """
+        from google.cloud.firestore import Increment
+
+        with tracer.start_as_current_span("firestore.add_token_usage"), self._guard():
+            increments = {
+                name: Increment(value) for name, value in counts.model_dump().items() if value
+            }
+            await (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("TokenUsage")
+                .document(day)
+                .set(
+                    {
+                        "workspace_id": workspace_id,
+                        "date": day,
+                        **increments,
+                        "models": {model: increments},
+                        "updated_at": datetime.now(UTC),
+                    },
+                    merge=True,
+                )
+            )
+
+    async def get_token_usage(self, workspace_id: str, days: list[str]) -> list[DailyTokenUsage]:
+        """The workspace's ledger entries for ``days``, in order; days without usage are skipped."""
+        with tracer.start_as_current_span("firestore.get_token_usage"), self._guard():
+            entries = (
+                self._client.collection("Workspaces")
+                .document(workspace_id)
+                .collection("TokenUsage")
+            )
+            found: dict[str, DailyTokenUsage] = {}
+            async for doc in self._client.get_all([entries.document(day) for day in days]):
+                if doc.exists:
+                    found[doc.id] = DailyTokenUsage(**doc.to_dict())
+            return [found[day] for day in days if day in found]
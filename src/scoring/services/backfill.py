@@ -0,0 +1,260 @@
+import asyncio
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import ApplicationSnapshot, BackfillRun, CandidateApplication
+from scoring.observability.metrics import record_backfill
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.breaker import CircuitOpenError
+from scoring.services.scoring import ScoringService
+from scoring.services.usage import TokenBudgetExceededError
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class BackfillProgress:
+    # Over this session only, so a resumed run is not skewed by earlier ones
+    scanned_per_s: float
+    scored_per_s: float
+    # None until the rate or the total is known
+    eta_s: float | None
+
+
+class WorkspaceBackfiller:
+    """Scores a workspace's applications that have no score yet.
+
+    Applications are read in pages of ``backfill_page_size`` in document ID
+    order. Each page is anti-joined against the stored scores, and the rest
+    are scored through ``ScoringService`` in the backfill lane: at most
+    ``rate_per_s`` started per second, ``concurrency`` in flight. The run,
+    with the cursor past the last finished page, is checkpointed to Firestore
+    after every page, so a resumed run picks up where it stopped.
+
+    With ``multi_vacancy_enabled``, a page's unscored applications of the
+    same candidate are scored together, so the candidate's documents are sent
+    once per ``multi_vacancy_max`` vacancies rather than once per application.
+
+    Failed applications are counted and passed over; running the backfill
+    again retries them, since they are still unscored. An open circuit
+    breaker, or the workspace reaching its hard token budget, ends the run
+    without moving the cursor past the current page: the page's other
+    scorings are cancelled and none of its applications are counted, since
+    a resumed run reads the page again.
+    """
+
+    def __init__(
+        self,
+        repo: FirestoreRepository,
+        scoring: ScoringService,
+        settings: Settings,
+        on_progress: Callable[[BackfillRun, BackfillProgress], None] | None = None,
+    ) -> None:
+        self._repo = repo
+        self._scoring = scoring
+        self._settings = settings
+        self._on_progress = on_progress
+        self._next_start = 0.0
+
+    def new_run(
+        self,
+        workspace_id: str,
+        rate_per_s: float | None = None,
+        concurrency: int | None = None,
+    ) -> BackfillRun:
+        now = datetime.now(UTC)
+        return BackfillRun(
+            run_id=uuid4().hex,
+            workspace_id=workspace_id,
+            rate_per_s=rate_per_s or self._settings.backfill_rate_per_s,
+            concurrency=concurrency or self._settings.backfill_concurrency,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + timedelta(seconds=self._settings.backfill_ttl_s),
+        )
+
+    async def run(self, run: BackfillRun) -> BackfillRun:
+        run.status = "running"
+        run.finished_at = None
+        if run.total is None:
+            try:
+                run.total = await self._repo.count_applications(run.workspace_id)
+            except Exception as e:
+                # Only the ETA needs it
+                logger.warning("backfill_count_failed", run_id=run.run_id, error=str(e))
+        await self.checkpoint(run)
+        logger.info(
+            "backfill_started", run_id=run.run_id, workspace_id=run.workspace_id, total=run.total
+        )
+
+        started = time.monotonic()
+        baseline = (run.scanned, run.scored)
+        slots = asyncio.Semaphore(run.concurrency)
+        try:
+            while True:
+                page, last_id = await self._repo.list_applications(
+                    run.workspace_id, run.cursor, self._settings.backfill_page_size
+                )
+                if last_id is None:
+                    break
+                await self._backfill_page(run, page, slots)
+                run.cursor = last_id
+                await self.checkpoint(run)
+                self._report(run, self.progress(run, started, baseline))
+                if len(page) < self._settings.backfill_page_size:
+                    break
+            run.status = "completed"
+        except asyncio.CancelledError:
+            run.status = "interrupted"
+            raise
+        except Exception as e:
+            run.status = "failed"
+            run.last_error = f"{type(e).__name__}: {e}"
+            logger.error("backfill_failed", run_id=run.run_id, error=run.last_error)
+        finally:
+            run.finished_at = datetime.now(UTC)
+            await self.checkpoint(run)
+            logger.info("backfill_finished", **run.model_dump(include=_SUMMARY_FIELDS))
+        return run
+
+    async def _backfill_page(
+        self, run: BackfillRun, page: list[ApplicationSnapshot], slots: asyncio.Semaphore
+    ) -> None:
+        # Added to the run once the whole page is done
+        counts: Counter[str] = Counter(scanned=len(page))
+        scorable = [a for a in page if a.candidate_id and a.vacancy_id]
+        counts["skipped"] = len(page) - len(scorable)
+        record_backfill("skipped", len(page) - len(scorable))
+
+        scored = await self._repo.scored_application_ids(
+            run.workspace_id, [a.application_id for a in scorable]
+        )
+        counts["already_scored"] = len(scored)
+        record_backfill("already_scored", len(scored))
+
+        pending = [a for a in scorable if a.application_id not in scored]
+        if self._settings.multi_vacancy_enabled:
+            by_candidate: dict[str, list[ApplicationSnapshot]] = defaultdict(list)
+            for application in pending:
+                by_candidate[application.candidate_id].append(application)
+            groups = list(by_candidate.values())
+        else:
+            groups = [[application] for application in pending]
+
+        try:
+            # A scoring that ends the run cancels the page's others
+            async with asyncio.TaskGroup() as tasks:
+                for group in groups:
+                    # The rate counts applications, so a group waits for each of its own
+                    for _ in group:
+                        await self._pace(run.rate_per_s)
+                    await slots.acquire()
+                    task = tasks.create_task(self._score(run, group, counts))
+                    task.add_done_callback(lambda _: slots.release())
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+        for name, n in counts.items():
+            setattr(run, name, getattr(run, name) + n)
+
+    async def _pace(self, rate_per_s: float) -> None:
+        now = time.monotonic()
+        if self._next_start > now:
+            await asyncio.sleep(self._next_start - now)
+        self._next_start = max(now, self._next_start) + 1.0 / rate_per_s
+
+    async def _score(
+        self, run: BackfillRun, applications: list[ApplicationSnapshot], counts: Counter[str]
+    ) -> None:
+        """Score one application, or one candidate's applications together."""
+        try:
+            if len(applications) == 1:
+                await self._scoring.process(
+                    application_id=applications[0].application_id,
+                    candidate_reference_id=applications[0].candidate_id,
+                    vacancy_reference_id=applications[0].vacancy_id,
+                    workspace_id=run.workspace_id,
+                    lane="backfill",
+                )
+            else:
+                await self._scoring.process_candidate(
+                    workspace_id=run.workspace_id,
+                    candidate_reference_id=applications[0].candidate_id,
+                    applications=[
+                        CandidateApplication(
+                            application_id=a.application_id, vacancy_reference_id=a.vacancy_id
+                        )
+                        for a in applications
+                    ],
+                    lane="backfill",
+                )
+        except (CircuitOpenError, TokenBudgetExceededError):
+            # Every further application would fail the same way: end the run
+            record_backfill("failed", len(applications))
+            raise
+        except Exception as e:
+            counts["failed"] += len(applications)
+            run.last_error = f"{type(e).__name__}: {e}"
+            record_backfill("failed", len(applications))
+            logger.warning(
+                "backfill_application_failed",
+                run_id=run.run_id,
+                application_ids=[a.application_id for a in applications],
+                error=str(e),
+            )
+            return
+        counts["scored"] += len(applications)
+        record_backfill("scored", len(applications))
+
+    @staticmethod
+    def progress(
+        run: BackfillRun, started: float, baseline: tuple[int, int] = (0, 0)
+    ) -> BackfillProgress:
+        """Throughput since ``started`` (monotonic) and the time left at that pace."""
+        elapsed = max(time.monotonic() - started, 1e-9)
+        scanned_per_s = (run.scanned - baseline[0]) / elapsed
+        scored_per_s = (run.scored - baseline[1]) / elapsed
+        eta_s = None
+        if run.total is not None and scanned_per_s > 0:
+            eta_s = max(run.total - run.scanned, 0) / scanned_per_s
+        return BackfillProgress(scanned_per_s, scored_per_s, eta_s)
+
+    def _report(self, run: BackfillRun, progress: BackfillProgress) -> None:
+        logger.info(
+            "backfill_progress",
+            run_id=run.run_id,
+            scanned=run.scanned,
+            total=run.total,
+            scored=run.scored,
+            failed=run.failed,
+            scored_per_s=round(progress.scored_per_s, 2),
+            eta_s=None if progress.eta_s is None else round(progress.eta_s),
+        )
+        if self._on_progress is not None:
+            self._on_progress(run, progress)
+
+    async def checkpoint(self, run: BackfillRun) -> None:
+        run.updated_at = datetime.now(UTC)
+        try:
+            await self._repo.save_backfill_run(run)
+        except Exception as e:
+            # The backfill carries on; a resume starts from the last checkpoint written
+            logger.warning("backfill_checkpoint_failed", run_id=run.run_id, error=str(e))
+
+
+_SUMMARY_FIELDS = {
+    "run_id",
+    "workspace_id",
+    "status",
+    "scanned",
+    "already_scored",
+    "scored",
+    "skipped",
+    "failed",
+}
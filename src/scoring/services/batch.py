@@ -0,0 +1,538 @@
+import asyncio
+import hashlib
+import json
+import posixpath
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, Protocol
+from uuid import uuid4
+
+import structlog
+from opentelemetry import trace
+from pydantic import ValidationError
+
+from scoring.config import Settings
+from scoring.models import BatchScoringRun, LLMScoringResponse, ScoreRequest, ScoringResult
+from scoring.observability.metrics import record_batch_results
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.documents import load_candidate_documents
+from scoring.services.llm import LLMService, scoring_tier
+from scoring.services.publisher import EventPublisher
+from scoring.services.scoring import score_calculated_event
+from scoring.services.usage import UsageLedger
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.cloud import storage
+
+logger = structlog.get_logger()
+tracer = trace.get_tracer(__name__)
+
+BatchState = Literal["running", "succeeded", "failed"]
+
+# Vertex echoes request labels in the output, which ties each result line
+# back to its manifest entry
+_KEY_LABEL = "batch_key"
+
+_VERTEX_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED": "succeeded",
+    "JOB_STATE_PARTIALLY_SUCCEEDED": "succeeded",
+    "JOB_STATE_FAILED": "failed",
+    "JOB_STATE_CANCELLED": "failed",
+    "JOB_STATE_EXPIRED": "failed",
+}
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """What a batch request line scores, kept in the job's manifest."""
+
+    key: str
+    workspace_id: str
+    application_id: str
+    candidate_id: str
+    vacancy_id: str
+    fingerprint: str
+    tier: str
+
+
+@dataclass(frozen=True)
+class BatchOutput:
+    key: str
+    # The GenerateContentResponse as JSON; None when the request failed
+    response: dict | None
+    error: str | None = None
+
+
+class BatchSubmitter(Protocol):
+    """Runs batch prediction jobs for ``BatchScorer``.
+
+    Input lines are ``{"key": ..., "request": <GenerateContentRequest>}``.
+    The manifest is stored with the job so results can be collected by job ID
+    from another process.
+    """
+
+    async def submit(
+        self, name: str, lines: list[dict], manifest: list[BatchItem]
+    ) -> str: ...
+
+    async def state(self, job_id: str) -> tuple[BatchState, str | None]:
+        """The job's state and, when it failed, why."""
+        ...
+
+    async def manifest(self, job_id: str) -> list[BatchItem]: ...
+
+    async def results(self, job_id: str) -> list[BatchOutput]: ...
+
+
+def _to_jsonl(rows: list[dict]) -> str:
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+
+def _from_jsonl(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _parse_output(line: dict) -> BatchOutput:
+    request = line.get("request") or {}
+    key = line.get("key") or (request.get("labels") or {}).get(_KEY_LABEL, "")
+    response = line.get("response")
+    error = line.get("status") or None
+    if response is None and error is None:
+        error = "no response"
+    return BatchOutput(key=key, response=response, error=error)
+
+
+def simulated_response(request: dict) -> dict:
+    """A schema-valid response for a batch request line, derived from its prompt.
+
+    Deterministic, so offline runs can be compared across attempts.
+    """
+    text = "".join(
+        part.get("text", "") for c in request.get("contents", []) for part in c["parts"]
+    )
+    digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    body = json.dumps(
+        {
+            "score": int.from_bytes(digest) % 101,
+            "reasoning": "Simulated batch response; the candidate was not assessed.",
+        }
+    )
+    prompt_tokens = len(text) // 4
+    output_tokens = len(body) // 4
+    return {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": body}]}, "finishReason": "STOP"}
+        ],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        },
+    }
+
+
+class LocalBatchSubmitter:
+    """File-based stand-in for Vertex batch prediction, for offline runs and tests.
+
+    Each job is a directory holding ``input.jsonl`` and ``manifest.jsonl``.
+    The job is answered in the background by ``responder`` and finishes with
+    ``output.jsonl`` in the Vertex output format, or ``error.txt``.
+    """
+
+    def __init__(
+        self, directory: str | Path, responder: Callable[[dict], dict] = simulated_response
+    ) -> None:
+        self._directory = Path(directory)
+        self._responder = responder
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def submit(self, name: str, lines: list[dict], manifest: list[BatchItem]) -> str:
+        job_id = f"{name}-{uuid4().hex[:8]}"
+        job_dir = self._directory / job_id
+        job_dir.mkdir(parents=True)
+        (job_dir / "input.jsonl").write_text(_to_jsonl(lines))
+        (job_dir / "manifest.jsonl").write_text(_to_jsonl([asdict(i) for i in manifest]))
+        self._tasks[job_id] = asyncio.create_task(self._run(job_dir))
+        return job_id
+
+    async def _run(self, job_dir: Path) -> None:
+        await asyncio.sleep(0)
+        try:
+            output = []
+            for line in _from_jsonl((job_dir / "input.jsonl").read_text()):
+                try:
+                    out = {"response": self._responder(line["request"])}
+                except Exception as e:
+                    out = {"status": f"{type(e).__name__}: {e}"}
+                output.append({"key": line["key"], "request": line["request"], **out})
+            (job_dir / "output.jsonl").write_text(_to_jsonl(output))
+        except Exception as e:
+            (job_dir / "error.txt").write_text(f"{type(e).__name__}: {e}")
+
+    async def state(self, job_id: str) -> tuple[BatchState, str | None]:
+        job_dir = self._directory / job_id
+        if (job_dir / "output.jsonl").exists():
+            return "succeeded", None
+        if (job_dir / "error.txt").exists():
+            return "failed", (job_dir / "error.txt").read_text()
+        if job_id not in self._tasks and not job_dir.exists():
+            return "failed", f"Unknown batch job {job_id}"
+        if job_id not in self._tasks:
+            # Submitted by another process that did not finish it
+            return "failed", "Batch job was interrupted"
+        return "running", None
+
+    async def manifest(self, job_id: str) -> list[BatchItem]:
+        text = (self._directory / job_id / "manifest.jsonl").read_text()
+        return [BatchItem(**row) for row in _from_jsonl(text)]
+
+    async def results(self, job_id: str) -> list[BatchOutput]:
+        text = (self._directory / job_id / "output.jsonl").read_text()
+        return [_parse_output(line) for line in _from_jsonl(text)]
+
+
+class VertexBatchSubmitter:
+    """Vertex AI batch prediction, with JSONL input and output in Cloud Storage.
+
+    Needs google-cloud-storage (the ``batch`` extra). Storage calls run in
+    worker threads, since the client is synchronous.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        client: "genai.Client | None" = None,
+        storage_client: "storage.Client | None" = None,
+    ) -> None:
+        self._settings = settings
+        if client is None:
+            from google import genai
+
+            client = genai.Client(
+                vertexai=True, project=settings.gcp_project_id, location=settings.gcp_region
+            )
+        if storage_client is None:
+            from google.cloud import storage
+
+            storage_client = storage.Client(project=settings.gcp_project_id)
+        self._client = client
+        self._storage = storage_client
+        self._prefix = (
+            settings.batch_gcs_prefix or f"gs://{settings.gcs_bucket}/batch-scoring"
+        ).rstrip("/")
+
+    def _blob(self, uri: str):
+        bucket, _, path = uri.removeprefix("gs://").partition("/")
+        return self._storage.bucket(bucket).blob(path)
+
+    async def _write(self, uri: str, text: str) -> None:
+        await asyncio.to_thread(
+            self._blob(uri).upload_from_string, text, content_type="application/jsonl"
+        )
+
+    async def _read(self, uri: str) -> str:
+        return await asyncio.to_thread(self._blob(uri).download_as_text)
+
+    async def submit(self, name: str, lines: list[dict], manifest: list[BatchItem]) -> str:
+        from google.genai import types
+
+        job_uri = f"{self._prefix}/{name}-{uuid4().hex[:8]}"
+        for line in lines:
+            line["request"].setdefault("labels", {})[_KEY_LABEL] = line["key"]
+        await self._write(f"{job_uri}/input.jsonl", _to_jsonl(lines))
+        await self._write(f"{job_uri}/manifest.jsonl", _to_jsonl([asdict(i) for i in manifest]))
+        job = await self._client.aio.batches.create(
+            model=self._settings.gemini_model,
+            src=f"{job_uri}/input.jsonl",
+            config=types.CreateBatchJobConfig(display_name=name, dest=f"{job_uri}/output"),
+        )
+        return job.name
+
+    async def state(self, job_id: str) -> tuple[BatchState, str | None]:
+        job = await self._client.aio.batches.get(name=job_id)
+        state = _VERTEX_DONE_STATES.get(job.state.value if job.state else "", "running")
+        error = job.error.message if state == "failed" and job.error else None
+        return state, error
+
+    async def _job_uri(self, job_id: str) -> str:
+        job = await self._client.aio.batches.get(name=job_id)
+        return posixpath.dirname(job.src.gcs_uri[0])
+
+    async def manifest(self, job_id: str) -> list[BatchItem]:
+        text = await self._read(f"{await self._job_uri(job_id)}/manifest.jsonl")
+        return [BatchItem(**row) for row in _from_jsonl(text)]
+
+    async def results(self, job_id: str) -> list[BatchOutput]:
+        job = await self._client.aio.batches.get(name=job_id)
+        # Vertex writes one or more predictions*.jsonl under a per-job folder
+        bucket, _, path = job.dest.gcs_uri.removeprefix("gs://").partition("/")
+        blobs = await asyncio.to_thread(
+            lambda: list(self._storage.bucket(bucket).list_blobs(prefix=path))
+        )
+        outputs = []
+        for blob in blobs:
+            if blob.name.endswith(".jsonl"):
+                text = await asyncio.to_thread(blob.download_as_text)
+                outputs.extend(_parse_output(line) for line in _from_jsonl(text))
+        return outputs
+
+
+def create_batch_submitter(settings: Settings) -> BatchSubmitter:
+    if settings.batch_backend == "local":
+        return LocalBatchSubmitter(settings.batch_local_dir)
+    return VertexBatchSubmitter(settings)
+
+
+def _response_text(response: dict) -> str:
+    candidates = response.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts if not p.get("thought"))
+
+
+def _token_usage(response: dict) -> dict:
+    usage = response.get("usageMetadata")
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage.get("promptTokenCount"),
+        "completion_tokens": usage.get("candidatesTokenCount"),
+        "thinking_tokens": usage.get("thoughtsTokenCount", 0),
+        "total_tokens": usage.get("totalTokenCount"),
+    }
+
+
+class BatchScorer:
+    """Scores many applications with one batch prediction job.
+
+    Prompts are compiled exactly as for /score, so results carry the same
+    input fingerprint and later rescores of unchanged inputs are skipped.
+    Responses are validated as ``LLMScoringResponse`` and bulk-written as
+    ``ScoringResult``\\ s, each announced with a carv.score.calculated event.
+    Batch jobs run outside the online LLM quota, so they do not take
+    scheduler slots. Their tokens are added to the usage ledger at the batch
+    price.
+    """
+
+    def __init__(
+        self,
+        repo: FirestoreRepository,
+        llm: LLMService,
+        publisher: EventPublisher,
+        submitter: BatchSubmitter,
+        settings: Settings,
+        usage: UsageLedger | None = None,
+    ) -> None:
+        self._repo = repo
+        self._llm = llm
+        self._publisher = publisher
+        self._submitter = submitter
+        self._settings = settings
+        self._usage = usage
+
+    async def _compile_one(self, key: str, request: ScoreRequest) -> tuple[dict, BatchItem]:
+        ws = request.workspace_id
+        candidate, vacancy, documents = await asyncio.gather(
+            self._repo.get_candidate(ws, request.candidate_reference_id),
+            self._repo.get_vacancy(ws, request.vacancy_reference_id),
+            load_candidate_documents(
+                self._repo, self._settings, ws, request.candidate_reference_id
+            ),
+        )
+        prepared = self._llm.prepare(
+            candidate,
+            vacancy,
+            documents.ats_documents,
+            file_uris=documents.file_uris,
+            tier=scoring_tier(self._settings, ws, "backfill"),
+        )
+        item = BatchItem(
+            key=key,
+            workspace_id=ws,
+            application_id=request.application_id,
+            candidate_id=request.candidate_reference_id,
+            vacancy_id=request.vacancy_reference_id,
+            fingerprint=prepared.fingerprint,
+            tier=prepared.tier,
+        )
+        return {"key": key, "request": self._llm.batch_request(prepared)}, item
+
+    async def compile(self, requests: list[ScoreRequest]) -> tuple[list[dict], list[BatchItem]]:
+        """Build the batch input lines and manifest; unloadable inputs are left out."""
+        semaphore = asyncio.Semaphore(self._settings.batch_fetch_concurrency)
+
+        async def one(n: int, request: ScoreRequest) -> tuple[dict, BatchItem] | None:
+            async with semaphore:
+                try:
+                    return await self._compile_one(f"r{n:06d}", request)
+                except Exception as e:
+                    logger.warning(
+                        "batch_input_skipped",
+                        workspace_id=request.workspace_id,
+                        application_id=request.application_id,
+                        error=str(e),
+                    )
+                    return None
+
+        compiled = await asyncio.gather(*(one(n, r) for n, r in enumerate(requests)))
+        compiled = [c for c in compiled if c is not None]
+        return [line for line, _ in compiled], [item for _, item in compiled]
+
+    async def submit(self, name: str, requests: list[ScoreRequest]) -> BatchScoringRun:
+        with tracer.start_as_current_span("batch.submit") as span:
+            lines, manifest = await self.compile(requests)
+            run = BatchScoringRun(
+                job_id="",
+                name=name,
+                submitted=len(lines),
+                skipped=len(requests) - len(lines),
+                created_at=datetime.now(UTC),
+            )
+            if not lines:
+                run.status = "failed"
+                run.error = "No inputs could be loaded"
+                run.finished_at = datetime.now(UTC)
+                return run
+            run.job_id = await self._submitter.submit(name, lines, manifest)
+            span.set_attribute("batch.job_id", run.job_id)
+            span.set_attribute("batch.submitted", run.submitted)
+            logger.info(
+                "batch_submitted",
+                job_id=run.job_id,
+                submitted=run.submitted,
+                skipped=run.skipped,
+            )
+            return run
+
+    async def wait(self, run: BatchScoringRun) -> BatchScoringRun:
+        """Poll until the job finishes or ``batch_timeout_s`` passes."""
+        deadline = time.monotonic() + self._settings.batch_timeout_s
+        while True:
+            state, error = await self._submitter.state(run.job_id)
+            if state != "running":
+                break
+            if time.monotonic() >= deadline:
+                state, error = "failed", "Timed out waiting for the batch job"
+                break
+            logger.info("batch_running", job_id=run.job_id)
+            await asyncio.sleep(self._settings.batch_poll_interval_s)
+        if state == "failed":
+            run.status = "failed"
+            run.error = error
+            run.finished_at = datetime.now(UTC)
+            logger.error("batch_failed", job_id=run.job_id, error=error)
+        return run
+
+    async def collect(self, run: BatchScoringRun) -> BatchScoringRun:
+        """Validate a finished job's output and bulk-write the results."""
+        with tracer.start_as_current_span("batch.collect") as span:
+            span.set_attribute("batch.job_id", run.job_id)
+            manifest = {item.key: item for item in await self._submitter.manifest(run.job_id)}
+            outputs = {o.key: o for o in await self._submitter.results(run.job_id)}
+            now = datetime.now(UTC)
+            results: list[ScoringResult] = []
+            invalid = failed = 0
+            for key, item in manifest.items():
+                output = outputs.get(key)
+                if output is None or output.response is None:
+                    failed += 1
+                    logger.warning(
+                        "batch_result_failed",
+                        job_id=run.job_id,
+                        application_id=item.application_id,
+                        error=output.error if output else "missing from output",
+                    )
+                    continue
+                try:
+                    parsed = LLMScoringResponse.model_validate_json(
+                        _response_text(output.response)
+                    )
+                except ValidationError as e:
+                    invalid += 1
+                    logger.warning(
+                        "batch_result_invalid",
+                        job_id=run.job_id,
+                        application_id=item.application_id,
+                        error=str(e),
+                    )
+                    continue
+                results.append(
+                    ScoringResult(
+                        application_id=item.application_id,
+                        candidate_id=item.candidate_id,
+                        vacancy_id=item.vacancy_id,
+                        workspace_id=item.workspace_id,
+                        score=parsed.score,
+                        reasoning=parsed.reasoning,
+                        model=self._settings.gemini_model,
+                        # Batch jobs report no per-request latency
+                        latency_ms=0,
+                        tokens=_token_usage(output.response),
+                        scored_at=now,
+                        input_fingerprint=item.fingerprint,
+                        tier=item.tier,
+                        batch_job_id=run.job_id,
+                    )
+                )
+
+            # The job has spent the tokens whether or not the results are kept
+            if self._usage is not None:
+                for result in results:
+                    self._usage.record(result.workspace_id, result.model, result.tokens, batch=True)
+            run.invalid, run.failed = invalid, failed
+            record_batch_results("invalid", run.invalid)
+            record_batch_results("failed", run.failed)
+            try:
+                await self._repo.save_scoring_results(results)
+            except Exception as e:
+                run.status = "failed"
+                run.error = f"Saving results failed: {e}"
+                run.finished_at = datetime.now(UTC)
+                logger.error("batch_save_failed", job_id=run.job_id, error=str(e))
+                return run
+            run.saved = len(results)
+            record_batch_results("saved", run.saved)
+
+            # publish blocks until Pub/Sub acknowledges, so it runs off the loop
+            published = await asyncio.gather(
+                *(asyncio.to_thread(self._publish, result) for result in results),
+                return_exceptions=True,
+            )
+            for result, outcome in zip(results, published, strict=True):
+                if isinstance(outcome, Exception):
+                    run.unpublished += 1
+                    logger.error(
+                        "batch_publish_failed",
+                        job_id=run.job_id,
+                        application_id=result.application_id,
+                        error=str(outcome),
+                    )
+            record_batch_results("unpublished", run.unpublished)
+
+            run.status = "succeeded"
+            run.finished_at = datetime.now(UTC)
+            logger.info(
+                "batch_collected",
+                job_id=run.job_id,
+                saved=run.saved,
+                invalid=run.invalid,
+                failed=run.failed,
+                unpublished=run.unpublished,
+            )
+            return run
+
+    def _publish(self, result: ScoringResult) -> None:
+        payload, attributes = score_calculated_event(result, self._settings)
+        self._publisher.publish(payload=payload, attributes=attributes)
+
+    async def run(self, name: str, requests: list[ScoreRequest]) -> BatchScoringRun:
+        run = await self.submit(name, requests)
+        if run.status == "failed":
+            return run
+        run = await self.wait(run)
+        if run.status == "failed":
+            return run
+        return await self.collect(run)
@@ -0,0 +1,162 @@
+import math
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Literal
+
+import structlog
+
+from scoring.config import Settings
+from scoring.observability.metrics import record_breaker_rejected, record_breaker_state
+
+logger = structlog.get_logger()
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+DEPENDENCIES = ("gemini", "firestore", "pubsub")
+
+
+class CircuitOpenError(RuntimeError):
+    """A dependency's breaker is open; the call was not attempted."""
+
+    def __init__(self, dependency: str, retry_after_s: float) -> None:
+        super().__init__(f"{dependency} circuit is open")
+        self.dependency = dependency
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    """Stops calling a dependency that is failing or slow, and probes for recovery.
+
+    Outcomes of the last ``breaker_window_s`` seconds are kept. Once at least
+    ``breaker_min_calls`` were made, the breaker opens when the share of
+    failures reaches ``breaker_error_rate`` or the share of calls slower than
+    the dependency's ``breaker_slow_call_ms`` reaches ``breaker_slow_rate``.
+    While open, calls raise ``CircuitOpenError`` without touching the
+    dependency. After ``breaker_open_s`` the breaker is half-open and lets
+    ``breaker_half_open_probes`` calls through; if all succeed it closes,
+    and any failure opens it again.
+
+    Exceptions listed in ``ignore`` (by default ``ValueError``, which the
+    repository raises for missing documents and validation raises for bad
+    model output) are the caller's problem and count as successes.
+    """
+
+    def __init__(
+        self,
+        dependency: str,
+        settings: Settings,
+        ignore: tuple[type[Exception], ...] = (ValueError,),
+    ) -> None:
+        self.dependency = dependency
+        self._settings = settings
+        self._ignore = ignore
+        self._slow_ms = settings.breaker_slow_call_ms.get(dependency, math.inf)
+        # (finished_at, failed, slow)
+        self._window: deque[tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._state: BreakerState = "closed"
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == "open" and self._retry_after() <= 0:
+            self._transition("half_open")
+        return self._state
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self._settings.breaker_open_s - time.monotonic()
+
+    def _transition(self, state: BreakerState) -> None:
+        previous, self._state = self._state, state
+        if state == "open":
+            self._opened_at = time.monotonic()
+        if state == "half_open":
+            self._probes = 0
+            self._probe_successes = 0
+        if state == "closed":
+            self._window.clear()
+            self._failures = self._slow = 0
+        record_breaker_state(self.dependency, state)
+        log = logger.warning if state == "open" else logger.info
+        log(
+            "circuit_breaker_transition",
+            dependency=self.dependency,
+            previous=previous,
+            state=state,
+        )
+
+    def _admit(self) -> bool:
+        """Reserve permission to call; returns whether the call is a probe."""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and self._probes < self._settings.breaker_half_open_probes:
+            self._probes += 1
+            return True
+        record_breaker_rejected(self.dependency)
+        retry_after = max(self._retry_after(), 1.0) if state == "open" else 1.0
+        raise CircuitOpenError(self.dependency, retry_after)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one call to the dependency; raises ``CircuitOpenError`` while open."""
+        probe = self._admit()
+        start = time.monotonic()
+        try:
+            yield
+        except self._ignore:
+            self._record(probe, failed=False, start=start)
+            raise
+        except Exception:
+            self._record(probe, failed=True, start=start)
+            raise
+        except BaseException:
+            # Cancelled: no verdict, but free the probe for another caller
+            if probe and self._state == "half_open":
+                self._probes -= 1
+            raise
+        self._record(probe, failed=False, start=start)
+
+    def _record(self, probe: bool, failed: bool, start: float) -> None:
+        now = time.monotonic()
+        slow = (now - start) * 1000 > self._slow_ms
+        if probe:
+            if self._state != "half_open":
+                return
+            if failed or slow:
+                self._transition("open")
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self._settings.breaker_half_open_probes:
+                    self._transition("closed")
+            return
+        if self._state != "closed":
+            # Started before the breaker opened; the verdict is already in
+            return
+
+        self._window.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        horizon = now - self._settings.breaker_window_s
+        while self._window and self._window[0][0] < horizon:
+            _, old_failed, old_slow = self._window.popleft()
+            self._failures -= old_failed
+            self._slow -= old_slow
+
+        calls = len(self._window)
+        if calls < self._settings.breaker_min_calls:
+            return
+        if (
+            self._failures / calls >= self._settings.breaker_error_rate
+            or self._slow / calls >= self._settings.breaker_slow_rate
+        ):
+            self._transition("open")
+
+
+def build_breakers(settings: Settings) -> dict[str, CircuitBreaker]:
+    return {name: CircuitBreaker(name, settings) for name in DEPENDENCIES}
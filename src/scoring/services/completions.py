@@ -0,0 +1,202 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Protocol
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import ScoringResult
+from scoring.observability.metrics import record_completion_dropped
+from scoring.services.lru import LRUCache
+
+logger = structlog.get_logger()
+
+
+class TooManySubscribersError(RuntimeError):
+    """The instance already serves ``sse_max_subscribers`` streams."""
+
+
+@dataclass(frozen=True)
+class CompletionFilter:
+    workspace_id: str
+    vacancy_id: str | None = None
+    application_ids: frozenset[str] = frozenset()
+
+    def matches(self, result: ScoringResult) -> bool:
+        if result.workspace_id != self.workspace_id:
+            return False
+        if self.vacancy_id and result.vacancy_id != self.vacancy_id:
+            return False
+        return not self.application_ids or result.application_id in self.application_ids
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One stream's buffer. When full, the oldest completion is dropped."""
+
+    filter: CompletionFilter
+    maxsize: int
+    dropped: int = 0
+    _queue: asyncio.Queue = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._queue = asyncio.Queue(self.maxsize)
+
+    def offer(self, result: ScoringResult) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+            record_completion_dropped()
+        self._queue.put_nowait(result)
+
+    async def get(self) -> ScoringResult:
+        return await self._queue.get()
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class CompletionSource(Protocol):
+    """Feeds completions from other instances for the workspaces being watched."""
+
+    def watch(self, workspace_id: str) -> None: ...
+
+    def unwatch(self, workspace_id: str) -> None: ...
+
+
+class CompletionBroker:
+    """Fans scoring completions out to stream subscribers on this instance.
+
+    ``ScoringService`` publishes its own completions; an optional
+    ``CompletionSource`` adds those from other instances. A completion seen
+    from both is delivered once.
+    """
+
+    def __init__(self, settings: Settings, source: CompletionSource | None = None) -> None:
+        self._settings = settings
+        self._source = source
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._seen: LRUCache[tuple[str, str, str], bool] = LRUCache(4096)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, completion_filter: CompletionFilter) -> Subscription:
+        if self.subscriber_count >= self._settings.sse_max_subscribers:
+            raise TooManySubscribersError(f"{self.subscriber_count} subscribers")
+        sub = Subscription(completion_filter, self._settings.sse_buffer_size)
+        workspace_id = completion_filter.workspace_id
+        if not self._subscribers[workspace_id] and self._source is not None:
+            self._source.watch(workspace_id)
+        self._subscribers[workspace_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        workspace_id = sub.filter.workspace_id
+        subs = self._subscribers.get(workspace_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[workspace_id]
+            if self._source is not None:
+                self._source.unwatch(workspace_id)
+
+    def publish(self, result: ScoringResult) -> int:
+        subs = self._subscribers.get(result.workspace_id)
+        if not subs:
+            return 0
+        key = (result.workspace_id, result.application_id, result.scored_at.isoformat())
+        if key in self._seen:
+            return 0
+        self._seen.put(key, True)
+        delivered = 0
+        for sub in subs:
+            if sub.filter.matches(result):
+                sub.offer(result)
+                delivered += 1
+        return delivered
+
+
+class FirestoreCompletionSource:
+    """Watches stored scores so completions on other instances reach local streams.
+
+    Uses a listener per watched workspace on the synchronous Firestore client,
+    whose callbacks run on a background thread and are handed to the event loop.
+    Listeners are started and stopped in worker threads, one at a time and in
+    the order asked, since both block on gRPC. Only scores written after the
+    listener started are forwarded.
+    """
+
+    def __init__(self, settings: Settings, loop: asyncio.AbstractEventLoop, client) -> None:
+        self._settings = settings
+        self._loop = loop
+        self._client = client
+        self._watches: dict[str, object] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self.broker: CompletionBroker | None = None
+
+    def watch(self, workspace_id: str) -> None:
+        self._spawn(self._start, workspace_id)
+
+    def unwatch(self, workspace_id: str) -> None:
+        self._spawn(self._stop, workspace_id)
+
+    async def close(self) -> None:
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        async with self._lock:
+            for workspace_id in list(self._watches):
+                await asyncio.to_thread(self._stop, workspace_id)
+        await asyncio.to_thread(self._client.close)
+
+    def _spawn(self, step, workspace_id: str) -> None:
+        task = self._loop.create_task(self._run(step, workspace_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, step, workspace_id: str) -> None:
+        async with self._lock:
+            try:
+                await asyncio.to_thread(step, workspace_id)
+            except Exception as e:
+                logger.warning(
+                    "completion_watch_failed",
+                    workspace_id=workspace_id,
+                    step=step.__name__.lstrip("_"),
+                    error=str(e),
+                )
+
+    def _start(self, workspace_id: str) -> None:
+        from datetime import UTC, datetime
+
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (
+            self._client.collection("Workspaces")
+            .document(workspace_id)
+            .collection("CandidateVacancyApplicationScores")
+            .where(filter=FieldFilter("scored_at", ">", datetime.now(UTC)))
+        )
+        self._watches[workspace_id] = query.on_snapshot(self._on_snapshot)
+        logger.info("completion_watch_started", workspace_id=workspace_id)
+
+    def _stop(self, workspace_id: str) -> None:
+        watch = self._watches.pop(workspace_id, None)
+        if watch is not None:
+            watch.unsubscribe()
+            logger.info("completion_watch_stopped", workspace_id=workspace_id)
+
+    def _on_snapshot(self, _docs, changes, _read_time) -> None:
+        for change in changes:
+            if change.type.name == "REMOVED" or self.broker is None:
+                continue
+            try:
+                result = ScoringResult(**change.document.to_dict())
+            except Exception as e:
+                logger.warning("completion_watch_invalid_document", error=str(e))
+                continue
+            self._loop.call_soon_threadsafe(self.broker.publish, result)
@@ -0,0 +1,141 @@
+import hashlib
+from dataclasses import dataclass, field
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import AtsDocuments, DocumentFile
+from scoring.observability.metrics import record_document_tokens_saved
+from scoring.repositories.firestore import FirestoreRepository
+
+logger = structlog.get_logger()
+
+# Gemini bills roughly 4 characters of text per token
+_CHARS_PER_TOKEN = 4
+
+# AtsDocuments text fields, by the document kind they hold
+_TEXT_FIELDS = {
+    "resume": "resume",
+    "job_description": "job_description",
+    "assessment": "assessment",
+}
+
+
+def _content_hash(text: str) -> str:
+    normalized = " ".join(text.split()).casefold()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class DocumentPlan:
+    """What is sent for a candidate's documents, and what was left out."""
+
+    ats_documents: AtsDocuments
+    file_uris: list[str]
+    # (document kind, representation left out: "text" or "file", estimated tokens)
+    dropped: list[tuple[str, str, int]] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return sum(tokens for _, _, tokens in self.dropped)
+
+
+def plan_documents(
+    ats_documents: AtsDocuments, files: list[DocumentFile], settings: Settings
+) -> DocumentPlan:
+    """Send each document once, in its cheapest complete representation.
+
+    A document is only known to be sent twice when an attached file is the
+    source of an inline text: the ATS document holding the file also holds
+    that text. Of such a pair, the text is kept when it is at least
+    ``documents_min_text_chars`` long (shorter text is taken to be a failed or
+    partial extraction) and costs no more tokens than the file's pages;
+    otherwise the file is kept. Inline texts with the same normalized content
+    and files with the same URI are sent once. Any other file is always sent.
+    """
+    texts: dict[str, str] = {}
+    seen_hashes: set[str] = set()
+    dropped: list[tuple[str, str, int]] = []
+    for kind, name in _TEXT_FIELDS.items():
+        text = getattr(ats_documents, name)
+        if not text:
+            continue
+        digest = _content_hash(text)
+        if digest in seen_hashes:
+            dropped.append((kind, "text", len(text) // _CHARS_PER_TOKEN))
+            continue
+        seen_hashes.add(digest)
+        texts[kind] = text
+
+    unique_files = list({f.uri: f for f in files}.values())
+    sources: dict[str, list[DocumentFile]] = {}
+    for f in unique_files:
+        text = texts.get(f.kind) if f.kind else None
+        if text and f.text and _content_hash(f.text) == _content_hash(text):
+            sources.setdefault(f.kind, []).append(f)
+
+    left_out: set[str] = set()
+    for kind, of_kind in sources.items():
+        text = texts[kind]
+        text_tokens = len(text) // _CHARS_PER_TOKEN
+        file_tokens = sum(
+            (f.pages or settings.documents_pdf_default_pages) * settings.documents_pdf_page_tokens
+            for f in of_kind
+        )
+        if len(text) >= settings.documents_min_text_chars and text_tokens <= file_tokens:
+            left_out.update(f.uri for f in of_kind)
+            dropped.append((kind, "file", file_tokens))
+        else:
+            del texts[kind]
+            dropped.append((kind, "text", text_tokens))
+
+    planned = ats_documents.model_copy(
+        update={name: texts.get(kind) for kind, name in _TEXT_FIELDS.items()}
+    )
+    # Attachment order is kept as given
+    return DocumentPlan(planned, [f.uri for f in unique_files if f.uri not in left_out], dropped)
+
+
+async def load_candidate_documents(
+    repo: FirestoreRepository,
+    settings: Settings,
+    workspace_id: str,
+    candidate_reference_id: str,
+    file_uris: list[str] | None = None,
+) -> DocumentPlan:
+    """Read a candidate's ATS documents and plan how they are sent.
+
+    ``file_uris`` from the event take precedence; without them the files
+    recorded on the ATS documents are attached. An event file is only
+    recognised as the source of an inline text when an ATS document records
+    the same URI.
+    """
+    ats_documents, stored = await repo.get_ats_documents_and_files(
+        workspace_id, candidate_reference_id
+    )
+    if file_uris:
+        by_uri = {f.uri: f for f in stored}
+        files = [by_uri.get(uri) or DocumentFile(uri=uri) for uri in file_uris]
+    else:
+        files = stored
+        if files:
+            logger.info(
+                "file_uris_from_ats_documents",
+                count=len(files),
+                uris=[f.uri for f in files],
+            )
+
+    if not settings.documents_dedupe_enabled:
+        return DocumentPlan(ats_documents, [f.uri for f in files])
+
+    plan = plan_documents(ats_documents, files, settings)
+    for kind, representation, tokens in plan.dropped:
+        record_document_tokens_saved(kind, representation, tokens)
+    if plan.dropped:
+        logger.info(
+            "documents_deduplicated",
+            candidate_reference_id=candidate_reference_id,
+            dropped=[f"{kind}:{representation}" for kind, representation, _ in plan.dropped],
+            tokens_saved=plan.tokens_saved,
+        )
+    return plan
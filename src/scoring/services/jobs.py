@@ -0,0 +1,113 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import ScoringJob, ScoringResult
+from scoring.observability.metrics import record_job
+from scoring.repositories.firestore import FirestoreRepository
+
+logger = structlog.get_logger()
+
+
+class JobQueueFullError(RuntimeError):
+    """The instance already holds as many jobs as it is allowed to queue."""
+
+
+class JobExecutor:
+    """Runs scoring jobs in the background and persists their state.
+
+    At most ``jobs_max_concurrency`` jobs run at once and up to
+    ``jobs_max_queued`` more wait for a slot; beyond that ``submit`` raises
+    ``JobQueueFullError``. Every state change is written to Firestore, so any
+    instance can answer a poll. Jobs still open at shutdown are recorded as
+    failed.
+    """
+
+    def __init__(
+        self, repo_factory: Callable[[], FirestoreRepository], settings: Settings
+    ) -> None:
+        self._repo_factory = repo_factory
+        self._settings = settings
+        self._slots = asyncio.Semaphore(settings.jobs_max_concurrency)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._jobs: dict[str, ScoringJob] = {}
+
+    @property
+    def open_jobs(self) -> int:
+        return len(self._tasks)
+
+    async def submit(
+        self,
+        workspace_id: str,
+        kind: str,
+        application_id: str,
+        work: Callable[[], Awaitable[ScoringResult]],
+    ) -> ScoringJob:
+        capacity = self._settings.jobs_max_concurrency + self._settings.jobs_max_queued
+        if self.open_jobs >= capacity:
+            record_job(kind, "rejected")
+            raise JobQueueFullError(f"{self.open_jobs} jobs already open")
+
+        now = datetime.now(UTC)
+        job = ScoringJob(
+            job_id=uuid4().hex,
+            workspace_id=workspace_id,
+            kind=kind,
+            application_id=application_id,
+            created_at=now,
+            expires_at=now + timedelta(seconds=self._settings.job_ttl_s),
+        )
+        # Persisted before the 202 goes out, so an immediate poll finds it
+        await self._repo_factory().save_job(job)
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job, work))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._forget(job.job_id))
+        record_job(kind, "queued")
+        return job.model_copy()
+
+    def _forget(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+
+    async def _run(self, job: ScoringJob, work: Callable[[], Awaitable[ScoringResult]]) -> None:
+        repo = self._repo_factory()
+        async with self._slots:
+            job.status = "running"
+            job.started_at = datetime.now(UTC)
+            await self._save(repo, job)
+            try:
+                job.result = await work()
+                job.status = "succeeded"
+            except Exception as e:
+                job.status = "failed"
+                job.error = f"{type(e).__name__}: {e}"
+                logger.error("scoring_job_failed", job_id=job.job_id, error=job.error)
+            job.finished_at = datetime.now(UTC)
+            await self._save(repo, job)
+            record_job(job.kind, job.status)
+
+    async def _save(self, repo: FirestoreRepository, job: ScoringJob) -> None:
+        try:
+            await repo.save_job(job)
+        except Exception as e:
+            # The job itself carries on; a poll sees the last state written
+            logger.warning("scoring_job_save_failed", job_id=job.job_id, error=str(e))
+
+    async def shutdown(self) -> None:
+        jobs = list(self._jobs.values())
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        # Their own saves must not land after the interrupted state
+        await asyncio.gather(*tasks, return_exceptions=True)
+        repo = self._repo_factory()
+        for job in jobs:
+            job.status = "failed"
+            job.error = "interrupted: instance shut down"
+            job.finished_at = datetime.now(UTC)
+            await self._save(repo, job)
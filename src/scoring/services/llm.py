@@ -1,68 +1,386 @@
+import hashlib
+import json
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 import structlog
-from google import genai
-from google.genai import types
 from opentelemetry import trace
+from pydantic import BaseModel
+
+from scoring.config import GeminiTier, Lane, ScoringTier, Settings
+from scoring.models import (
+    ATSCandidate,
+    AtsDocuments,
+    ATSVacancy,
+    LLMMultiCandidateScoringResponse,
+    LLMMultiScoringResponse,
+    LLMScoringResponse,
+)
+from scoring.services.breaker import CircuitBreaker
+from scoring.services.prompt import (
+    PromptLayout,
+    build_multi_vacancy_prompt,
+    build_user_prompt,
+    candidate_batch_part,
+    render_vacancy_section,
+    system_prompt,
+)
+
+if TYPE_CHECKING:
+    from google.genai import types
 
-from scoring.config import Settings
-from scoring.models import ATSCandidate, AtsDocuments, ATSVacancy, LLMScoringResponse
-from scoring.services.prompt import SYSTEM_PROMPT, build_user_prompt
+    from scoring.services.llm_backend import LLMBackend
 
 logger = structlog.get_logger()
 tracer = trace.get_tracer(__name__)
 
+# Output allowance for each scoring after the first in a multi-scoring call
+_MULTI_SCORING_OUTPUT_TOKENS = 512
+
+# Response schema per prompt layout, and the field naming each entry's key
+_RESPONSE_SCHEMAS: dict[PromptLayout, tuple[type[BaseModel], str | None]] = {
+    "single": (LLMScoringResponse, None),
+    "vacancies": (LLMMultiScoringResponse, "vacancy_id"),
+    "candidates": (LLMMultiCandidateScoringResponse, "candidate_id"),
+}
+
+
+@lru_cache(maxsize=32)
+def generation_config(
+    temperature: float,
+    max_output_tokens: int,
+    thinking_budget: int | None = None,
+    reasoning_sentences: str = "2-4",
+    layout: PromptLayout = "single",
+) -> "types.GenerateContentConfig":
+    """Generation config shared by every scoring call with the same settings.
+
+    The system prompt and response schema only vary by tier and prompt
+    layout, so the config is built once per combination instead of per
+    request. The SDK does not mutate it. Without a thinking budget no
+    thinking config is sent and the model thinks dynamically.
+    """
+    from google.genai import types
+
+    thinking_config = None
+    if thinking_budget is not None:
+        thinking_config = types.ThinkingConfig(thinking_budget=thinking_budget)
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt(reasoning_sentences, layout),
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        thinking_config=thinking_config,
+        response_mime_type="application/json",
+        response_schema=_RESPONSE_SCHEMAS[layout][0],
+    )
+
+
+def scoring_tier(settings: Settings, workspace_id: str, lane: Lane) -> ScoringTier:
+    """The tier for a call: the workspace's, else the lane's, else the default."""
+    return settings.gemini_workspace_tiers.get(
+        workspace_id, settings.gemini_lane_tiers.get(lane, settings.gemini_default_tier)
+    )
+
+
+def split_token_usage(token_usage: dict, n: int) -> list[dict]:
+    """Share one call's token usage between ``n`` results; the first gets the remainder."""
+    shares = [{} for _ in range(n)]
+    for name, total in token_usage.items():
+        for i, share in enumerate(shares):
+            share[name] = total // n + (total % n if i == 0 else 0)
+    return shares
+
+
+@lru_cache(maxsize=1)
+def _response_schema_json() -> str:
+    return json.dumps(LLMScoringResponse.model_json_schema(), sort_keys=True)
+
+
+@dataclass(frozen=True)
+class PreparedPrompt:
+    user_prompt: str
+    file_uris: tuple[str, ...]
+    fingerprint: str
+    vacancy_hash: str
+    tier: ScoringTier = "standard"
+
+
+@dataclass(frozen=True)
+class PreparedMultiPrompt:
+    """Several scorings in one call, which the model answers per key.
+
+    Each segment is a text part with the PDFs attached before it: the
+    candidate's files before the whole prompt in the "vacancies" layout,
+    each candidate's files before their section in the "candidates" layout.
+    """
+
+    segments: tuple[tuple[tuple[str, ...], str], ...]
+    keys: tuple[str, ...]
+    layout: PromptLayout
+    tier: ScoringTier = "standard"
+
+    @property
+    def user_prompt(self) -> str:
+        return "\n".join(text for _, text in self.segments)
+
 
 class LLMService:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        backend: "LLMBackend | None" = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
         self._settings = settings
-        self._client = genai.Client(
-            vertexai=True,
-            project=settings.gcp_project_id,
-            location=settings.gcp_region,
+        self._breaker = breaker
+        if backend is None:
+            from scoring.services.llm_backend import create_llm_backend
+
+            backend = create_llm_backend(settings)
+        self._backend = backend
+
+    def tier_settings(self, tier: ScoringTier) -> GeminiTier:
+        """The tier's generation settings, with output capped by gemini_max_tokens."""
+        settings = self._settings.gemini_tiers[tier]
+        max_tokens = self._settings.gemini_max_tokens
+        if settings.max_output_tokens is not None and settings.max_output_tokens <= max_tokens:
+            return settings
+        return settings.model_copy(update={"max_output_tokens": max_tokens})
+
+    def prepare(
+        self,
+        candidate: ATSCandidate,
+        vacancy: ATSVacancy,
+        ats_documents: AtsDocuments,
+        file_uris: list[str] | None = None,
+        tier: ScoringTier | None = None,
+    ) -> PreparedPrompt:
+        """Compile the user prompt and fingerprint everything sent to the model.
+
+        The fingerprint covers the system and user prompts, the attached file
+        URIs, the model and the generation settings of the tier (default
+        ``gemini_default_tier``), so two calls with the same fingerprint would
+        send the model an identical request.
+        """
+        tier = tier or self._settings.gemini_default_tier
+        generation = self.tier_settings(tier)
+        vacancy_section = render_vacancy_section(vacancy)
+        user_prompt = build_user_prompt(candidate, vacancy, ats_documents, vacancy_section)
+        uris = tuple(file_uris or ())
+        h = hashlib.blake2b(digest_size=20)
+        for part in (
+            self._settings.gemini_model,
+            repr(self._settings.gemini_temperature),
+            str(generation.max_output_tokens),
+            str(generation.thinking_budget),
+            _response_schema_json(),
+            system_prompt(generation.reasoning_sentences),
+            *uris,
+            user_prompt,
+        ):
+            h.update(part.encode())
+            h.update(b"\0")
+        return PreparedPrompt(user_prompt, uris, h.hexdigest(), vacancy_section.content_hash, tier)
+
+    def batch_request(self, prepared: PreparedPrompt) -> dict:
+        """The request ``score_candidate`` would send, as a batch prediction line.
+
+        Uses the Vertex REST field names, since batch input is read as JSON.
+        """
+        parts: list[dict] = [
+            {"fileData": {"fileUri": uri, "mimeType": "application/pdf"}}
+            for uri in prepared.file_uris
+        ]
+        parts.append({"text": prepared.user_prompt})
+        generation = self.tier_settings(prepared.tier)
+        config: dict = {
+            "temperature": self._settings.gemini_temperature,
+            "maxOutputTokens": generation.max_output_tokens,
+            "responseMimeType": "application/json",
+            "responseJsonSchema": LLMScoringResponse.model_json_schema(),
+        }
+        if generation.thinking_budget is not None:
+            config["thinkingConfig"] = {"thinkingBudget": generation.thinking_budget}
+        return {
+            "contents": [{"role": "user", "parts": parts}],
+            "systemInstruction": {
+                "parts": [{"text": system_prompt(generation.reasoning_sentences)}]
+            },
+            "generationConfig": config,
+        }
+
+    def prepare_vacancies(
+        self,
+        candidate: ATSCandidate,
+        vacancies: dict[str, ATSVacancy],
+        ats_documents: AtsDocuments,
+        file_uris: list[str] | None = None,
+        tier: ScoringTier | None = None,
+    ) -> PreparedMultiPrompt:
+        """Compile one prompt with the candidate and files once and every vacancy.
+
+        ``vacancies`` is keyed by the ID the model is asked to answer with.
+        """
+        sections = {key: render_vacancy_section(v) for key, v in vacancies.items()}
+        return PreparedMultiPrompt(
+            segments=(
+                (
+                    tuple(file_uris or ()),
+                    build_multi_vacancy_prompt(candidate, ats_documents, sections),
+                ),
+            ),
+            keys=tuple(sections),
+            layout="vacancies",
+            tier=tier or self._settings.gemini_default_tier,
         )
 
+    def prepare_candidates(
+        self,
+        vacancy: ATSVacancy,
+        candidates: dict[str, tuple[str, tuple[str, ...]]],
+        tier: ScoringTier | None = None,
+    ) -> PreparedMultiPrompt:
+        """Compile one prompt with the vacancy once and every candidate.
+
+        ``candidates`` maps the key the model is asked to answer with to the
+        candidate's rendered section and file URIs.
+        """
+        segments = [((), render_vacancy_section(vacancy).text)]
+        for key, (section, file_uris) in candidates.items():
+            segments.append((file_uris, candidate_batch_part(key, section)))
+        return PreparedMultiPrompt(
+            segments=tuple(segments),
+            keys=tuple(candidates),
+            layout="candidates",
+            tier=tier or self._settings.gemini_default_tier,
+        )
+
+    async def _generate(
+        self,
+        span: trace.Span,
+        segments: tuple[tuple[tuple[str, ...], str], ...],
+        config: "types.GenerateContentConfig",
+    ) -> tuple[str, dict]:
+        # google.genai is imported during lifespan, not when this module loads
+        from google.genai import types
+
+        contents = []
+        for file_uris, text in segments:
+            for uri in file_uris:
+                contents.append(types.Part.from_uri(file_uri=uri, mime_type="application/pdf"))
+            contents.append(text)
+
+        with self._breaker.guard() if self._breaker else nullcontext():
+            response = await self._backend.generate_content(
+                model=self._settings.gemini_model, contents=contents, config=config
+            )
+
+        token_usage = {}
+        if response.usage_metadata:
+            token_usage = {
+                "prompt_tokens": response.usage_metadata.prompt_token_count,
+                "completion_tokens": response.usage_metadata.candidates_token_count,
+                "thinking_tokens": response.usage_metadata.thoughts_token_count or 0,
+                "total_tokens": response.usage_metadata.total_token_count,
+            }
+            span.set_attribute("llm.tokens.total", token_usage.get("total_tokens", 0))
+        return response.text, token_usage
+
+    async def score_multi(
+        self, prepared: PreparedMultiPrompt
+    ) -> tuple[dict[str, LLMScoringResponse], dict]:
+        """Run several scorings in one call.
+
+        Returns a response per key and the usage of the whole call. A
+        response that leaves out any key raises ``ValueError``.
+        """
+        with tracer.start_as_current_span("llm.score_multi") as span:
+            span.set_attribute("llm.model", self._settings.gemini_model)
+            span.set_attribute("llm.tier", prepared.tier)
+            span.set_attribute("llm.layout", prepared.layout)
+            span.set_attribute("llm.scorings", len(prepared.keys))
+            generation = self.tier_settings(prepared.tier)
+            # Thinking is shared; each further scoring only adds its answer
+            max_output_tokens = min(
+                generation.max_output_tokens
+                + _MULTI_SCORING_OUTPUT_TOKENS * (len(prepared.keys) - 1),
+                self._settings.gemini_max_tokens,
+            )
+            text, token_usage = await self._generate(
+                span,
+                prepared.segments,
+                generation_config(
+                    self._settings.gemini_temperature,
+                    max_output_tokens,
+                    generation.thinking_budget,
+                    generation.reasoning_sentences,
+                    prepared.layout,
+                ),
+            )
+
+            schema, key_field = _RESPONSE_SCHEMAS[prepared.layout]
+            parsed = schema.model_validate_json(text)
+            results = {
+                getattr(s, key_field): LLMScoringResponse(score=s.score, reasoning=s.reasoning)
+                for s in parsed.scores
+                if getattr(s, key_field) in prepared.keys
+            }
+            missing = [key for key in prepared.keys if key not in results]
+            if missing:
+                raise ValueError(f"Multi-scoring response has no score for {missing}")
+
+            logger.info(
+                "llm_multi_scoring_complete",
+                layout=prepared.layout,
+                scorings=len(results),
+                tier=prepared.tier,
+                tokens=token_usage,
+            )
+            return results, token_usage
+
     async def score_candidate(
         self,
         candidate: ATSCandidate,
         vacancy: ATSVacancy,
         ats_documents: AtsDocuments,
         file_uris: list[str] | None = None,
+        prepared: PreparedPrompt | None = None,
+        tier: ScoringTier | None = None,
     ) -> tuple[LLMScoringResponse, dict]:
+        """Score with the tier's thinking budget, output cap and reasoning length.
+
+        ``tier`` applies when nothing is ``prepared``; a prepared prompt
+        carries its own. Thinking tokens are reported as ``thinking_tokens``.
+        """
         with tracer.start_as_current_span("llm.score") as span:
             span.set_attribute("llm.model", self._settings.gemini_model)
 
-            user_prompt = build_user_prompt(candidate, vacancy, ats_documents)
+            if prepared is None:
+                prepared = self.prepare(candidate, vacancy, ats_documents, file_uris, tier)
+            span.set_attribute("llm.vacancy_hash", prepared.vacancy_hash)
+            span.set_attribute("llm.fingerprint", prepared.fingerprint)
+            span.set_attribute("llm.tier", prepared.tier)
+            generation = self.tier_settings(prepared.tier)
 
-            contents = []
-            for uri in (file_uris or []):
-                contents.append(types.Part.from_uri(file_uri=uri, mime_type="application/pdf"))
-            contents.append(user_prompt)
-
-            response = await self._client.aio.models.generate_content(
-                model=self._settings.gemini_model,
-                contents=contents,
-                config=types.GenerateContentConfig(
-                    system_instruction=SYSTEM_PROMPT,
-                    temperature=self._settings.gemini_temperature,
-                    max_output_tokens=self._settings.gemini_max_tokens,
-                    response_mime_type="application/json",
-                    response_schema=LLMScoringResponse,
+            text, token_usage = await self._generate(
+                span,
+                ((prepared.file_uris, prepared.user_prompt),),
+                generation_config(
+                    self._settings.gemini_temperature,
+                    generation.max_output_tokens,
+                    generation.thinking_budget,
+                    generation.reasoning_sentences,
                 ),
             )
 
-            token_usage = {}
-            if response.usage_metadata:
-                token_usage = {
-                    "prompt_tokens": response.usage_metadata.prompt_token_count,
-                    "completion_tokens": response.usage_metadata.candidates_token_count,
-                    "total_tokens": response.usage_metadata.total_token_count,
-                }
-                span.set_attribute("llm.tokens.total", token_usage.get("total_tokens", 0))
-
-            result = LLMScoringResponse.model_validate_json(response.text)
+            result = LLMScoringResponse.model_validate_json(text)
 
             logger.info(
                 "llm_scoring_complete",
                 score=result.score,
+                tier=prepared.tier,
                 tokens=token_usage,
             )
 
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import math
+import random
+import re
+from typing import Protocol
+
+import httpx
+import structlog
+from google import genai
+from google.genai import errors, types
+
+from scoring.config import Settings
+from scoring.models import LLMMultiCandidateScoringResponse, LLMMultiScoringResponse
+
+logger = structlog.get_logger()
+
+# Gemini bills roughly 4 characters of text per token
+_CHARS_PER_TOKEN = 4
+
+# Multi-scoring schemas, with the key field of each entry and the prompt
+# header the keys are read from (see prompt.PromptLayout)
+_MULTI_SCHEMAS = {
+    LLMMultiScoringResponse: (
+        "vacancy_id",
+        re.compile(r"^\*\*Vacancy ID\*\*: (.+)$", re.MULTILINE),
+    ),
+    LLMMultiCandidateScoringResponse: (
+        "candidate_id",
+        re.compile(r"^\*\*Candidate ID\*\*: (.+)$", re.MULTILINE),
+    ),
+}
+
+_REASONING_SENTENCES = [
+    "The candidate's experience is broadly relevant to the responsibilities of the role.",
+    "Several hard requirements are met, although certification details are not confirmed.",
+    "Availability and location appear compatible with the vacancy.",
+    "There is a gap in directly comparable work history for this position.",
+    "Language skills match the stated requirements.",
+    "Salary expectations are not mentioned, so they were not weighed in the score.",
+]
+
+
+class LLMBackend(Protocol):
+    """Executes a single ``generate_content`` call for ``LLMService``."""
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: list,
+        config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse: ...
+
+    async def warm_up(self) -> None:
+        """Open connections ahead of the first request."""
+        ...
+
+
+class VertexGeminiBackend:
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._client = genai.Client(
+            vertexai=True,
+            project=settings.gcp_project_id,
+            location=settings.gcp_region,
+        )
+
+    async def warm_up(self) -> None:
+        # Model metadata lookup: fetches an access token and opens the HTTP
+        # session that generate_content reuses
+        await self._client.aio.models.get(model=self._settings.gemini_model)
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: list,
+        config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse:
+        return await self._client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+
+class SimulatedGeminiBackend:
+    """Offline stand-in for Gemini, for capacity testing without Vertex access.
+
+    Latency grows with prompt and output size, with log-normal jitter and an
+    occasional slow tail. A configurable share of calls fails with a 429
+    RESOURCE_EXHAUSTED ``ClientError`` or times out like the real client's
+    HTTP transport. Responses are schema-valid ``LLMScoringResponse`` JSON, or
+    the matching multi-scoring JSON for multi-vacancy and multi-candidate prompts, with
+    prompt, candidate and thinking token counts in ``usage_metadata``.
+    """
+
+    def __init__(self, settings: Settings, rng: random.Random | None = None) -> None:
+        self._settings = settings
+        self._rng = rng or random.Random(settings.llm_sim_seed)
+
+    async def warm_up(self) -> None:
+        pass
+
+    def _prompt_tokens(self, contents: list, config: types.GenerateContentConfig) -> int:
+        system = config.system_instruction
+        chars = len(system) if isinstance(system, str) else 0
+        files = 0
+        for part in contents:
+            if isinstance(part, str):
+                chars += len(part)
+            else:
+                files += 1
+        return chars // _CHARS_PER_TOKEN + files * self._settings.llm_sim_tokens_per_file
+
+    def _latency_s(self, prompt_tokens: int, output_tokens: int) -> float:
+        s = self._settings
+        mean_ms = (
+            s.llm_sim_base_latency_ms
+            + prompt_tokens / 1000 * s.llm_sim_ms_per_1k_prompt_tokens
+            + output_tokens * s.llm_sim_ms_per_output_token
+        )
+        # Log-normal jitter with the same mean
+        sigma = s.llm_sim_latency_jitter
+        latency_ms = mean_ms * self._rng.lognormvariate(-(sigma**2) / 2, sigma)
+        if self._rng.random() < s.llm_sim_tail_rate:
+            latency_ms *= s.llm_sim_tail_multiplier
+        return latency_ms / 1000
+
+    def _score(self) -> dict:
+        reasoning = " ".join(self._rng.sample(_REASONING_SENTENCES, self._rng.randint(2, 4)))
+        score = min(100, max(0, round(self._rng.gauss(60, 20))))
+        return {"score": score, "reasoning": reasoning}
+
+    def _response_text(self, contents: list, config: types.GenerateContentConfig) -> str:
+        if config.response_schema not in _MULTI_SCHEMAS:
+            return json.dumps(self._score())
+        key_field, header = _MULTI_SCHEMAS[config.response_schema]
+        prompt = "\n".join(part for part in contents if isinstance(part, str))
+        return json.dumps(
+            {"scores": [{key_field: key, **self._score()} for key in header.findall(prompt)]}
+        )
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: list,
+        config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse:
+        s = self._settings
+        prompt_tokens = self._prompt_tokens(contents, config)
+        text = self._response_text(contents, config)
+        candidate_tokens = math.ceil(len(text) / _CHARS_PER_TOKEN)
+        thinking_tokens = 0
+        if s.llm_sim_thinking_tokens:
+            thinking_tokens = int(s.llm_sim_thinking_tokens * self._rng.lognormvariate(0, 0.5))
+            budget = config.thinking_config.thinking_budget if config.thinking_config else None
+            if budget is not None and budget >= 0:
+                thinking_tokens = min(thinking_tokens, budget)
+
+        roll = self._rng.random()
+        if roll < s.llm_sim_rate_limit_rate:
+            # Quota rejections come back quickly
+            await asyncio.sleep(self._rng.uniform(0.02, 0.2))
+            raise errors.ClientError(
+                429,
+                {
+                    "error": {
+                        "code": 429,
+                        "message": "Resource exhausted. Please try again later.",
+                        "status": "RESOURCE_EXHAUSTED",
+                    }
+                },
+            )
+        if roll < s.llm_sim_rate_limit_rate + s.llm_sim_timeout_rate:
+            await asyncio.sleep(s.llm_sim_timeout_s)
+            raise httpx.ReadTimeout("Simulated Gemini request timed out")
+
+        await asyncio.sleep(self._latency_s(prompt_tokens, candidate_tokens + thinking_tokens))
+
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=[types.Part(text=text)]),
+                    finish_reason=types.FinishReason.STOP,
+                )
+            ],
+            model_version=model,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=candidate_tokens,
+                thoughts_token_count=thinking_tokens or None,
+                total_token_count=prompt_tokens + candidate_tokens + thinking_tokens,
+            ),
+        )
+
+
+def create_llm_backend(settings: Settings) -> LLMBackend:
+    if settings.llm_backend == "simulated":
+        logger.warning("llm_backend_simulated")
+        return SimulatedGeminiBackend(settings)
+    return VertexGeminiBackend(settings)
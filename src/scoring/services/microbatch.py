@@ -0,0 +1,195 @@
+import asyncio
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+import structlog
+from opentelemetry import trace
+
+from scoring.config import Lane, ScoringTier, Settings
+from scoring.models import ATSCandidate, AtsDocuments, ATSVacancy, LLMScoringResponse
+from scoring.observability.metrics import record_microbatch
+from scoring.services.llm import LLMService, PreparedPrompt, split_token_usage
+from scoring.services.prompt import render_candidate_section, render_vacancy_section
+from scoring.services.scheduler import LLMScheduler
+
+logger = structlog.get_logger()
+tracer = trace.get_tracer(__name__)
+
+# Prompt size estimate for the token budget: Gemini bills roughly 4
+# characters of text per token; files are estimated as in documents.py
+_CHARS_PER_TOKEN = 4
+
+# (workspace, lane, tier, vacancy content hash)
+_BatchKey = tuple[str, Lane, ScoringTier, str]
+
+
+@dataclass
+class _Entry:
+    """One distinct scoring in a batch; identical requests share its future."""
+
+    candidate: ATSCandidate
+    ats_documents: AtsDocuments
+    prepared: PreparedPrompt
+    candidate_section: str
+    future: asyncio.Future
+    enqueued: float
+
+
+@dataclass
+class _Batch:
+    key: _BatchKey
+    vacancy: ATSVacancy
+    tokens: int
+    # By input fingerprint
+    entries: dict[str, _Entry] = field(default_factory=dict)
+    timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher:
+    """Coalesces scorings of the same vacancy into one LLM call.
+
+    A scoring waits up to ``microbatch_window_ms`` for others in the same
+    workspace, lane and tier whose vacancy renders identically. The batch is
+    sent when the window closes, when it holds ``microbatch_max_size``
+    candidates, or before an addition would take its estimated prompt past
+    ``microbatch_max_prompt_tokens``. It goes out as one prompt with the
+    vacancy once and a section per candidate, in one scheduler slot, and
+    each waiting scoring gets its own response and a share of the tokens. A
+    batch of one is sent as a plain single scoring.
+
+    Requests with the same input fingerprint within a batch are scored once.
+    A failed call fails every scoring in its batch.
+    """
+
+    def __init__(
+        self,
+        llm: LLMService,
+        settings: Settings,
+        scheduler: LLMScheduler | None = None,
+    ) -> None:
+        self._llm = llm
+        self._settings = settings
+        self._scheduler = scheduler
+        self._pending: dict[_BatchKey, _Batch] = {}
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def score(
+        self,
+        workspace_id: str,
+        lane: Lane,
+        candidate: ATSCandidate,
+        vacancy: ATSVacancy,
+        ats_documents: AtsDocuments,
+        prepared: PreparedPrompt,
+    ) -> tuple[LLMScoringResponse, dict]:
+        """Score ``prepared`` as part of the next batch for its vacancy."""
+        key = (workspace_id, lane, prepared.tier, prepared.vacancy_hash)
+        batch = self._pending.get(key)
+        entry = batch.entries.get(prepared.fingerprint) if batch else None
+        if entry is None:
+            section = render_candidate_section(candidate, ats_documents)
+            file_tokens = (
+                self._settings.documents_pdf_page_tokens
+                * self._settings.documents_pdf_default_pages
+            )
+            tokens = len(section) // _CHARS_PER_TOKEN + len(prepared.file_uris) * file_tokens
+            if (
+                batch is not None
+                and batch.tokens + tokens > self._settings.microbatch_max_prompt_tokens
+            ):
+                self._flush(batch)
+                batch = None
+            if batch is None:
+                batch = self._open(key, vacancy)
+            entry = _Entry(
+                candidate,
+                ats_documents,
+                prepared,
+                section,
+                asyncio.get_running_loop().create_future(),
+                time.monotonic(),
+            )
+            batch.entries[prepared.fingerprint] = entry
+            batch.tokens += tokens
+            if len(batch.entries) >= self._settings.microbatch_max_size:
+                self._flush(batch)
+        # A caller that gives up must not cancel the scoring for the others
+        return await asyncio.shield(entry.future)
+
+    def _open(self, key: _BatchKey, vacancy: ATSVacancy) -> _Batch:
+        batch = _Batch(key, vacancy, len(render_vacancy_section(vacancy).text) // _CHARS_PER_TOKEN)
+        batch.timer = asyncio.get_running_loop().call_later(
+            self._settings.microbatch_window_ms / 1000, self._flush, batch
+        )
+        self._pending[key] = batch
+        return batch
+
+    def _flush(self, batch: _Batch) -> None:
+        if self._pending.get(batch.key) is not batch:
+            return
+        del self._pending[batch.key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: _Batch) -> None:
+        workspace_id, lane, tier, _ = batch.key
+        entries = list(batch.entries.values())
+        now = time.monotonic()
+        record_microbatch(lane, len(entries), [(now - e.enqueued) * 1000 for e in entries])
+
+        with tracer.start_as_current_span("llm.microbatch") as span:
+            span.set_attribute("microbatch.size", len(entries))
+            span.set_attribute("scoring.lane", lane)
+            slot = (
+                self._scheduler.slot(lane, workspace_id) if self._scheduler else nullcontext()
+            )
+            try:
+                async with slot:
+                    if len(entries) == 1:
+                        entry = entries[0]
+                        response, token_usage = await self._llm.score_candidate(
+                            entry.candidate,
+                            batch.vacancy,
+                            entry.ats_documents,
+                            prepared=entry.prepared,
+                        )
+                        results = [(response, token_usage)]
+                    else:
+                        keys = [f"C{i}" for i in range(1, len(entries) + 1)]
+                        responses, token_usage = await self._llm.score_multi(
+                            self._llm.prepare_candidates(
+                                batch.vacancy,
+                                {
+                                    k: (e.candidate_section, e.prepared.file_uris)
+                                    for k, e in zip(keys, entries)
+                                },
+                                tier,
+                            )
+                        )
+                        shares = split_token_usage(token_usage, len(entries))
+                        results = [(responses[k], share) for k, share in zip(keys, shares)]
+            except Exception as e:
+                logger.warning(
+                    "microbatch_failed",
+                    workspace_id=workspace_id,
+                    size=len(entries),
+                    error=str(e),
+                )
+                for entry in entries:
+                    if not entry.future.done():
+                        entry.future.set_exception(e)
+                return
+
+        for entry, result in zip(entries, results):
+            if not entry.future.done():
+                entry.future.set_result(result)
+
+    async def close(self) -> None:
+        """Send the open batches now and wait for every batch in flight."""
+        for batch in list(self._pending.values()):
+            self._flush(batch)
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
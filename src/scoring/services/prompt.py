@@ -1,6 +1,18 @@
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
 from scoring.models import ATSCandidate, AtsDocuments, ATSVacancy
+from scoring.services.lru import LRUCache
+
+VACANCY_SECTION_CACHE_SIZE = 1024
 
-SYSTEM_PROMPT = """\
+# "single": one candidate and one vacancy. "vacancies": one candidate against
+# several vacancies. "candidates": several candidates against one vacancy.
+PromptLayout = Literal["single", "vacancies", "candidates"]
+
+_SYSTEM_PROMPT_TEMPLATE = """\
 You are an expert recruitment analyst. Your task is to evaluate how well a candidate
 fits a specific vacancy. Analyze all provided candidate information against the vacancy
 requirements and produce a numerical score with clear reasoning.
@@ -26,14 +38,128 @@ and qualifications?
 ## Important Notes
 - Candidate information may be in Dutch — your reasoning MUST be in English.
 - Base your score strictly on the evidence provided. Do not assume information not present.
-- Provide 2-4 sentences of reasoning explaining the score."""
+- Provide {reasoning_sentences} sentences of reasoning explaining the score."""
+
+
+_LAYOUT_NOTES: dict[PromptLayout, str] = {
+    "single": "",
+    "vacancies": """
+- The candidate is evaluated against several vacancies, each introduced by its Vacancy ID.
+Score every vacancy independently, as if it were the only one, and return exactly one
+entry per Vacancy ID.""",
+    "candidates": """
+- Several candidates are evaluated against the same vacancy, each introduced by its
+Candidate ID; files attached just before a candidate's section belong to that candidate.
+Score every candidate independently, without comparing them to each other, and return
+exactly one entry per Candidate ID.""",
+}
+
+
+@lru_cache(maxsize=16)
+def system_prompt(reasoning_sentences: str = "2-4", layout: PromptLayout = "single") -> str:
+    """The system prompt asking for the given reasoning length, e.g. "1-2".
+
+    For the multi-scoring layouts it also explains how the user prompt is
+    laid out (see ``build_multi_vacancy_prompt`` and ``candidate_batch_part``).
+    """
+    prompt = _SYSTEM_PROMPT_TEMPLATE.replace("{reasoning_sentences}", reasoning_sentences)
+    return prompt + _LAYOUT_NOTES[layout]
+
+
+SYSTEM_PROMPT = system_prompt()
+
+
+@dataclass(frozen=True)
+class VacancySection:
+    content_hash: str
+    text: str
+
+
+_vacancy_sections: LRUCache[str, VacancySection] = LRUCache(VACANCY_SECTION_CACHE_SIZE)
+
+
+def vacancy_content_hash(vacancy: ATSVacancy) -> str:
+    """Hash of the vacancy fields that appear in the prompt."""
+    h = hashlib.blake2b(digest_size=16)
+    addr = vacancy.address
+    for value in (
+        vacancy.title,
+        vacancy.description,
+        vacancy.hard_requirements,
+        vacancy.soft_requirements,
+        vacancy.about_company,
+        addr.street if addr else "",
+        addr.city if addr else "",
+        addr.zip_code if addr else "",
+        addr.country if addr else "",
+    ):
+        h.update(value.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def render_vacancy_section(vacancy: ATSVacancy) -> VacancySection:
+    """Vacancy block of the user prompt, memoized by content hash.
+
+    A vacancy is scored against many candidates, so the block is rendered
+    once per vacancy version and kept in a bounded LRU.
+    """
+    content_hash = vacancy_content_hash(vacancy)
+    section = _vacancy_sections.get(content_hash)
+    if section is None:
+        section = VacancySection(content_hash, _render_vacancy(vacancy))
+        _vacancy_sections.put(content_hash, section)
+    return section
+
+
+def _render_vacancy(vacancy: ATSVacancy) -> str:
+    parts = ["\n## Vacancy Description"]
+    if vacancy.title:
+        parts.append(f"**Title**: {vacancy.title}")
+    if vacancy.description:
+        parts.append(vacancy.description)
+    if vacancy.hard_requirements:
+        parts.append(f"\n**Hard Requirements**: {vacancy.hard_requirements}")
+    if vacancy.soft_requirements:
+        parts.append(f"\n**Soft Requirements**: {vacancy.soft_requirements}")
+    if vacancy.about_company:
+        parts.append(f"\n**About the Company**: {vacancy.about_company}")
+    addr = vacancy.address
+    if addr and (addr.city or addr.country):
+        location_parts = [p for p in [addr.street, addr.city, addr.zip_code, addr.country] if p]
+        parts.append(f"\n**Location**: {', '.join(location_parts)}")
+    return "\n".join(parts)
 
 
 def build_user_prompt(
     candidate: ATSCandidate,
     vacancy: ATSVacancy,
     ats_documents: AtsDocuments,
+    vacancy_section: VacancySection | None = None,
+) -> str:
+    candidate_section = render_candidate_section(candidate, ats_documents)
+    return "\n".join([candidate_section, (vacancy_section or render_vacancy_section(vacancy)).text])
+
+
+def build_multi_vacancy_prompt(
+    candidate: ATSCandidate,
+    ats_documents: AtsDocuments,
+    vacancy_sections: dict[str, VacancySection],
 ) -> str:
+    """The candidate once, followed by each vacancy under its key (Vacancy ID)."""
+    parts = [render_candidate_section(candidate, ats_documents)]
+    for key, section in vacancy_sections.items():
+        parts.append(f"\n---\n**Vacancy ID**: {key}")
+        parts.append(section.text)
+    return "\n".join(parts)
+
+
+def candidate_batch_part(key: str, candidate_section: str) -> str:
+    """A candidate's section in a "candidates" prompt, after the shared vacancy."""
+    return f"---\n**Candidate ID**: {key}\n{candidate_section}"
+
+
+def render_candidate_section(candidate: ATSCandidate, ats_documents: AtsDocuments) -> str:
     parts = []
 
     # --- Candidate section ---
@@ -66,21 +192,4 @@ def build_user_prompt(
         parts.append("\n### Assessment")
         parts.append(ats_documents.assessment)
 
-    # --- Vacancy section ---
-    parts.append("\n## Vacancy Description")
-    if vacancy.title:
-        parts.append(f"**Title**: {vacancy.title}")
-    if vacancy.description:
-        parts.append(vacancy.description)
-    if vacancy.hard_requirements:
-        parts.append(f"\n**Hard Requirements**: {vacancy.hard_requirements}")
-    if vacancy.soft_requirements:
-        parts.append(f"\n**Soft Requirements**: {vacancy.soft_requirements}")
-    if vacancy.about_company:
-        parts.append(f"\n**About the Company**: {vacancy.about_company}")
-    addr = vacancy.address
-    if addr and (addr.city or addr.country):
-        location_parts = [p for p in [addr.street, addr.city, addr.zip_code, addr.country] if p]
-        parts.append(f"\n**Location**: {', '.join(location_parts)}")
-
     return "\n".join(parts)
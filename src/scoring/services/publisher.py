@@ -1,36 +1,109 @@
 import json
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
 
 import structlog
-from google.cloud import pubsub_v1
 from opentelemetry import trace
 
-from scoring.config import Settings
+from scoring.config import OrderingKeyStrategy, Settings
 from scoring.models import EventAttributes, EventPayload
+from scoring.observability.metrics import record_publish, record_publish_resumed
+from scoring.services.breaker import CircuitBreaker, CircuitOpenError
+
+if TYPE_CHECKING:
+    from google.cloud import pubsub_v1
 
 logger = structlog.get_logger()
 tracer = trace.get_tracer(__name__)
 
+_REFERENCE_FIELDS = {"application": "application_id", "vacancy": "vacancy_id"}
+
 
 class EventPublisher:
-    def __init__(self, client: pubsub_v1.PublisherClient, settings: Settings) -> None:
+    def __init__(
+        self,
+        client: "pubsub_v1.PublisherClient",
+        settings: Settings,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
         self._client = client
         self._settings = settings
+        self._breaker = breaker
 
     def _topic_path(self, topic: str) -> str:
         return self._client.topic_path(self._settings.gcp_project_id, topic)
 
+    def ordering_strategy(self, event_type: str) -> OrderingKeyStrategy:
+        return self._settings.publish_ordering_key_overrides.get(
+            event_type, self._settings.publish_ordering_key
+        )
+
+    def ordering_key(self, payload: EventPayload, attributes: EventAttributes) -> str:
+        """Build the Pub/Sub ordering key; an empty string disables ordering.
+
+        Application and vacancy keys are scoped by workspace, since ATS reference
+        IDs are only unique within a workspace. Events without the reference
+        fall back to the workspace key.
+        """
+        strategy = self.ordering_strategy(attributes.event_type)
+        if strategy == "none":
+            return ""
+        if strategy == "workspace":
+            return attributes.workspace_id
+        reference = (payload.data or payload.error or {}).get(_REFERENCE_FIELDS[strategy])
+        if not reference:
+            return attributes.workspace_id
+        return f"{attributes.workspace_id}/{reference}"
+
     def publish(self, payload: EventPayload, attributes: EventAttributes) -> str:
-        with tracer.start_as_current_span("publisher.publish"):
-            future = self._client.publish(
-                self._topic_path(self._settings.event_bus_topic),
-                data=json.dumps(payload.model_dump(mode="json")).encode("utf-8"),
-                ordering_key=attributes.workspace_id,
-                **attributes.to_pubsub_attributes(),
-            )
-            message_id = future.result()
+        with tracer.start_as_current_span("publisher.publish") as span:
+            topic_path = self._topic_path(self._settings.event_bus_topic)
+            strategy = self.ordering_strategy(attributes.event_type)
+            ordering_key = self.ordering_key(payload, attributes)
+            span.set_attribute("publisher.ordering_key", ordering_key)
+
+            start = time.monotonic()
+            outcome = "error"
+            try:
+                with self._breaker.guard() if self._breaker else nullcontext():
+                    future = self._client.publish(
+                        topic_path,
+                        data=json.dumps(payload.model_dump(mode="json")).encode("utf-8"),
+                        ordering_key=ordering_key,
+                        **attributes.to_pubsub_attributes(),
+                    )
+                    message_id = future.result()
+                outcome = "success"
+            except CircuitOpenError:
+                # Nothing was sent, so the ordering key was not paused
+                outcome = "circuit_open"
+                raise
+            except Exception as e:
+                # A failed publish pauses its ordering key: every later publish
+                # with the same key fails until the key is explicitly resumed.
+                if ordering_key:
+                    self._client.resume_publish(topic_path, ordering_key)
+                    record_publish_resumed(attributes.event_type, strategy)
+                    logger.warning(
+                        "publish_failed_ordering_key_resumed",
+                        event_type=attributes.event_type,
+                        ordering_key=ordering_key,
+                        error=str(e),
+                    )
+                raise
+            finally:
+                record_publish(
+                    (time.monotonic() - start) * 1000,
+                    attributes.event_type,
+                    strategy,
+                    outcome,
+                )
+
             logger.info(
                 "event_published",
                 event_type=attributes.event_type,
                 message_id=message_id,
+                ordering_key=ordering_key,
             )
             return message_id
@@ -0,0 +1,301 @@
+import asyncio
+import base64
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Protocol
+from uuid import uuid4
+
+import structlog
+from pydantic import ValidationError
+
+from scoring.config import Settings
+from scoring.models import (
+    EventAttributes,
+    PubSubEnvelope,
+    PubSubMessage,
+    ReplayFilter,
+    ReplayRequest,
+    ReplayRun,
+)
+from scoring.observability.metrics import record_dlq_replay
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.breaker import CircuitOpenError
+
+if TYPE_CHECKING:
+    from google.cloud import pubsub_v1
+
+logger = structlog.get_logger()
+
+# Runs a message through the push endpoint's pipeline and returns the response
+# status ("ok" or "skipped"); a failure raises.
+ReplayHandler = Callable[[PubSubEnvelope], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class PulledMessage:
+    ack_id: str
+    envelope: PubSubEnvelope
+
+
+class DeadLetterSubscription(Protocol):
+    async def pull(self, max_messages: int) -> list[PulledMessage]: ...
+
+    async def ack(self, ack_ids: list[str]) -> None: ...
+
+    async def lease(self, ack_ids: list[str], seconds: int) -> None:
+        """Set the ack deadline; 0 hands the messages back to the subscription."""
+
+
+class PubSubDeadLetterSubscription:
+    """The DLQ pull subscription, via the synchronous subscriber in worker threads."""
+
+    def __init__(self, client: "pubsub_v1.SubscriberClient", settings: Settings) -> None:
+        self._client = client
+        self._settings = settings
+        self.path = client.subscription_path(settings.gcp_project_id, settings.dlq_subscription)
+
+    async def pull(self, max_messages: int) -> list[PulledMessage]:
+        from google.api_core import exceptions
+
+        try:
+            response = await asyncio.to_thread(
+                self._client.pull,
+                request={"subscription": self.path, "max_messages": max_messages},
+                timeout=self._settings.dlq_replay_pull_timeout_s,
+            )
+        except exceptions.DeadlineExceeded:
+            return []
+        return [
+            PulledMessage(m.ack_id, _to_envelope(m.message, self.path))
+            for m in response.received_messages
+        ]
+
+    async def ack(self, ack_ids: list[str]) -> None:
+        if ack_ids:
+            await asyncio.to_thread(
+                self._client.acknowledge,
+                request={"subscription": self.path, "ack_ids": ack_ids},
+            )
+
+    async def lease(self, ack_ids: list[str], seconds: int) -> None:
+        if ack_ids:
+            await asyncio.to_thread(
+                self._client.modify_ack_deadline,
+                request={
+                    "subscription": self.path,
+                    "ack_ids": ack_ids,
+                    "ack_deadline_seconds": seconds,
+                },
+            )
+
+
+def _to_envelope(message, subscription: str) -> PubSubEnvelope:
+    # Pulled messages are rebuilt in the push format, so a replay is decoded
+    # exactly like the original delivery
+    publish_time = message.publish_time
+    return PubSubEnvelope(
+        message=PubSubMessage(
+            data=base64.b64encode(message.data).decode(),
+            attributes=dict(message.attributes),
+            messageId=message.message_id,
+            publishTime=publish_time.isoformat() if publish_time else "",
+        ),
+        subscription=subscription,
+    )
+
+
+class DeadLetterReplayer:
+    """Feeds dead-lettered messages back through the push pipeline.
+
+    Messages are pulled in batches of ``dlq_replay_batch_size``. Those that
+    match the run's filter start at most ``rate_per_s`` per second with
+    ``dlq_replay_concurrency`` in flight. A message is acked only once its
+    handler succeeds (or skips it as irrelevant). Its event ID is then
+    recorded, so a later pull of the same event is acked without running it
+    again. Filtered-out and failed messages stay leased until the run ends
+    and are then handed back to the DLQ.
+
+    The run's counters are checkpointed to Firestore after every batch. The
+    run stops when the DLQ has nothing new to offer, after ``max_messages``,
+    or when a dependency's circuit breaker opens.
+    """
+
+    def __init__(
+        self,
+        subscription: DeadLetterSubscription,
+        handler: ReplayHandler,
+        repo: FirestoreRepository,
+        settings: Settings,
+    ) -> None:
+        self._subscription = subscription
+        self._handler = handler
+        self._repo = repo
+        self._settings = settings
+        self._next_start = 0.0
+
+    def new_run(self, request: ReplayRequest) -> ReplayRun:
+        now = datetime.now(UTC)
+        return ReplayRun(
+            run_id=uuid4().hex,
+            filter=ReplayFilter.model_validate(
+                request.model_dump(include=set(ReplayFilter.model_fields))
+            ),
+            max_messages=request.max_messages,
+            rate_per_s=request.rate_per_s or self._settings.dlq_replay_rate_per_s,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + timedelta(seconds=self._settings.dlq_replay_ttl_s),
+        )
+
+    async def run(self, run: ReplayRun) -> ReplayRun:
+        run.status = "running"
+        run.finished_at = None
+        await self.checkpoint(run)
+        logger.info("dlq_replay_started", run_id=run.run_id, filter=run.filter.model_dump())
+
+        seen: set[str] = set()
+        leased: set[str] = set()
+        acked: set[str] = set()
+        slots = asyncio.Semaphore(self._settings.dlq_replay_concurrency)
+        try:
+            while run.max_messages is None or run.handled < run.max_messages:
+                batch = await self._subscription.pull(self._settings.dlq_replay_batch_size)
+                leased.update(m.ack_id for m in batch)
+                fresh = [m for m in batch if m.envelope.message.message_id not in seen]
+                if not fresh:
+                    # Drained, or only messages this run already left in place
+                    break
+                seen.update(m.envelope.message.message_id for m in fresh)
+                await self._subscription.lease(
+                    [m.ack_id for m in fresh], self._settings.dlq_replay_lease_s
+                )
+                await self._replay_batch(run, fresh, slots, acked)
+                await self._subscription.ack(sorted(acked.intersection(m.ack_id for m in fresh)))
+                await self.checkpoint(run)
+            run.status = "completed"
+        except asyncio.CancelledError:
+            run.status = "interrupted"
+            raise
+        except Exception as e:
+            run.status = "failed"
+            run.last_error = f"{type(e).__name__}: {e}"
+            logger.error("dlq_replay_failed", run_id=run.run_id, error=run.last_error)
+        finally:
+            run.finished_at = datetime.now(UTC)
+            try:
+                await self._subscription.lease(sorted(leased - acked), 0)
+            except Exception as e:
+                # Leases expire on their own; the messages come back a little later
+                logger.warning("dlq_replay_release_failed", run_id=run.run_id, error=str(e))
+            await self.checkpoint(run)
+            logger.info("dlq_replay_finished", **run.model_dump(include=_SUMMARY_FIELDS))
+        return run
+
+    async def _replay_batch(
+        self,
+        run: ReplayRun,
+        batch: list[PulledMessage],
+        slots: asyncio.Semaphore,
+        acked: set[str],
+    ) -> None:
+        """Replay a batch, adding the ack IDs of messages to ack to ``acked``."""
+        tasks: list[asyncio.Task] = []
+        budget = None if run.max_messages is None else run.max_messages - run.handled
+        for message in batch:
+            if budget is not None and len(tasks) >= budget:
+                break
+            run.pulled += 1
+            outcome, key = await self._admit(run, message)
+            record_dlq_replay(outcome)
+            if outcome == "filtered_out":
+                run.filtered_out += 1
+                continue
+            if outcome == "duplicate":
+                run.duplicates += 1
+                acked.add(message.ack_id)
+                continue
+            await self._pace(run.rate_per_s)
+            await slots.acquire()
+            task = asyncio.create_task(self._replay(run, message, key, acked))
+            task.add_done_callback(lambda _: slots.release())
+            tasks.append(task)
+        await asyncio.gather(*tasks)
+
+    async def _admit(self, run: ReplayRun, message: PulledMessage) -> tuple[str, str]:
+        """Decide whether to replay a message; returns the outcome and its dedup key."""
+        envelope = message.envelope
+        try:
+            attributes = EventAttributes.from_pubsub_attributes(envelope.message.attributes)
+        except ValidationError:
+            attributes = None
+
+        if attributes is None:
+            # Only an unfiltered run takes it, and the handler will skip it
+            key = f"message-{envelope.message.message_id}"
+            matches = run.filter == ReplayFilter()
+        else:
+            key = str(attributes.event_id)
+            matches = run.filter.matches(attributes)
+        if not matches:
+            return "filtered_out", key
+        if await self._repo.is_event_replayed(key):
+            return "duplicate", key
+        return "replay", key
+
+    async def _pace(self, rate_per_s: float) -> None:
+        now = time.monotonic()
+        if self._next_start > now:
+            await asyncio.sleep(self._next_start - now)
+        self._next_start = max(now, self._next_start) + 1.0 / rate_per_s
+
+    async def _replay(
+        self, run: ReplayRun, message: PulledMessage, key: str, acked: set[str]
+    ) -> None:
+        try:
+            status = await self._handler(message.envelope)
+        except CircuitOpenError:
+            # Every further message would fail the same way: end the run
+            run.failed += 1
+            record_dlq_replay("failed")
+            raise
+        except Exception as e:
+            run.failed += 1
+            run.last_error = f"{type(e).__name__}: {e}"
+            record_dlq_replay("failed")
+            logger.warning("dlq_replay_message_failed", run_id=run.run_id, key=key, error=str(e))
+            return
+
+        try:
+            await self._repo.mark_event_replayed(key, run.run_id)
+        except Exception as e:
+            # Acked regardless: the work is done, only the dedup marker is missing
+            logger.warning("dlq_replay_mark_failed", run_id=run.run_id, key=key, error=str(e))
+        acked.add(message.ack_id)
+        if status == "ok":
+            run.replayed += 1
+            record_dlq_replay("replayed")
+        else:
+            run.skipped += 1
+            record_dlq_replay("skipped")
+
+    async def checkpoint(self, run: ReplayRun) -> None:
+        run.updated_at = datetime.now(UTC)
+        try:
+            await self._repo.save_replay_run(run)
+        except Exception as e:
+            # The replay carries on; a poll sees the last checkpoint written
+            logger.warning("dlq_replay_checkpoint_failed", run_id=run.run_id, error=str(e))
+
+
+_SUMMARY_FIELDS = {
+    "run_id",
+    "status",
+    "pulled",
+    "replayed",
+    "skipped",
+    "filtered_out",
+    "duplicates",
+    "failed",
+}
@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import time
+from collections.abc import Callable
+
+import structlog
+
+from scoring.config import Settings
+from scoring.observability.metrics import record_rescore, record_rescore_enqueued
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.scoring import ScoringService
+
+logger = structlog.get_logger()
+
+RescoreKey = tuple[str, str]  # (workspace_id, application_id)
+
+
+class RescoreWorker:
+    """Rescores stale applications in the background, debounced and rate limited.
+
+    Each enqueue pushes the application's due time out by the debounce
+    window, so a burst of edits to a vacancy or candidate produces one
+    rescore. Due applications start at most ``stale_rescore_rate_per_s`` per
+    second with ``stale_rescore_concurrency`` in flight. Rescoring goes
+    through the input fingerprint check, so changes that do not affect the
+    prompt only clear the stale flag.
+
+    The queue is in memory: pending work is lost on shutdown, but the stale
+    flag stays on the stored score.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable[[], ScoringService],
+        repo_factory: Callable[[], FirestoreRepository],
+        settings: Settings,
+    ) -> None:
+        self._service_factory = service_factory
+        self._repo_factory = repo_factory
+        self._settings = settings
+        self._due: dict[RescoreKey, float] = {}
+        # (due, key) entries; superseded entries are skipped when popped
+        self._heap: list[tuple[float, RescoreKey]] = []
+        self._wake = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._due)
+
+    def enqueue(self, workspace_id: str, application_id: str) -> bool:
+        key = (workspace_id, application_id)
+        if key in self._due:
+            outcome = "collapsed"
+        elif len(self._due) >= self._settings.stale_rescore_max_pending:
+            record_rescore_enqueued("dropped")
+            logger.warning("rescore_queue_full", workspace_id=workspace_id, pending=self.pending)
+            return False
+        else:
+            outcome = "queued"
+        due = time.monotonic() + self._settings.stale_rescore_debounce_s
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+        self._wake.set()
+        record_rescore_enqueued(outcome)
+        return True
+
+    def _pop_due(self, now: float) -> RescoreKey | float | None:
+        """Return a due key, else the next due time, else None if idle."""
+        while self._heap:
+            due, key = self._heap[0]
+            if self._due.get(key) != due:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                return due
+            heapq.heappop(self._heap)
+            del self._due[key]
+            return key
+        return None
+
+    async def run(self) -> None:
+        interval = 1.0 / self._settings.stale_rescore_rate_per_s
+        slots = asyncio.Semaphore(self._settings.stale_rescore_concurrency)
+        next_start = 0.0
+        tasks: set[asyncio.Task] = set()
+
+        def done(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            slots.release()
+
+        try:
+            while True:
+                now = time.monotonic()
+                item = self._pop_due(now)
+                if not isinstance(item, tuple):
+                    self._wake.clear()
+                    timeout = None if item is None else item - now
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout)
+                    except TimeoutError:
+                        pass
+                    continue
+
+                if next_start > now:
+                    await asyncio.sleep(next_start - now)
+                next_start = max(now, next_start) + interval
+                await slots.acquire()
+                task = asyncio.create_task(self._rescore(*item))
+                tasks.add(task)
+                task.add_done_callback(done)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _rescore(self, workspace_id: str, application_id: str) -> None:
+        repo = self._repo_factory()
+        try:
+            existing = await repo.get_scoring_result(workspace_id, application_id)
+            if not existing.stale:
+                # Rescored by some other path since it was queued
+                record_rescore("skipped")
+                return
+            result = await self._service_factory().process(
+                application_id=application_id,
+                candidate_reference_id=existing.candidate_id,
+                vacancy_reference_id=existing.vacancy_id,
+                workspace_id=workspace_id,
+                file_uris=existing.file_uris,
+                previous=existing,
+                lane="backfill",
+            )
+            if result is existing:
+                # process has cleared the stale flag
+                record_rescore("unchanged")
+            else:
+                record_rescore("rescored")
+        except Exception as e:
+            record_rescore("failed")
+            logger.error(
+                "stale_rescore_failed",
+                workspace_id=workspace_id,
+                application_id=application_id,
+                error=str(e),
+            )
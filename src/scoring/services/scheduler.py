@@ -0,0 +1,221 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import structlog
+
+from scoring.config import Lane, Settings
+from scoring.observability.metrics import (
+    record_llm_granted,
+    record_llm_queue_depth,
+    record_llm_queue_wait,
+    record_llm_rejected,
+)
+
+logger = structlog.get_logger()
+
+LANES: tuple[Lane, ...] = ("interactive", "event", "backfill")
+
+
+def llm_capacity(settings: Settings) -> int:
+    """LLM calls an instance runs at once.
+
+    ``llm_max_concurrency`` when set, else 3/4 of the requests Cloud Run sends
+    the instance, so that requests beyond it wait in their lanes.
+    """
+    if settings.llm_max_concurrency is not None:
+        return settings.llm_max_concurrency
+    return max(1, settings.instance_request_concurrency * 3 // 4)
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """The workspace already has ``llm_workspace_max_queued`` calls waiting."""
+
+
+class _Stride:
+    def __init__(self, weight: float) -> None:
+        self.weight = weight
+        # Stride scheduling: the lowest pass goes next and each grant
+        # advances it by 1 / weight
+        self.pass_ = 0.0
+
+    def advance(self) -> None:
+        self.pass_ += 1.0 / self.weight
+
+
+class _TenantQueue(_Stride):
+    def __init__(self, weight: float) -> None:
+        super().__init__(weight)
+        self.waiters: deque[asyncio.Future] = deque()
+        # Calls granted in this lane and not yet released
+        self.active = 0
+
+
+class _LaneQueue(_Stride):
+    def __init__(self, weight: float) -> None:
+        super().__init__(weight)
+        self.tenants: dict[str, _TenantQueue] = {}
+        # Pass of the last tenant granted in this lane
+        self.vtime = 0.0
+
+    @property
+    def waiting(self) -> bool:
+        return any(t.waiters for t in self.tenants.values())
+
+
+class LLMScheduler:
+    """Bounds concurrent LLM calls and shares them between lanes and workspaces.
+
+    Interactive requests, bus events and backfills wait in separate lanes.
+    When a slot frees up it goes to the waiting lane that has had the least
+    service relative to its weight, so under contention each lane gets at
+    least ``weight / sum(weights of waiting lanes)`` of the slots. Within a
+    lane the slot goes to a workspace the same way, by workspace weight, so a
+    large import in one workspace cannot starve the others. A workspace can
+    be capped to a number of calls in flight, and each workspace may have at
+    most ``llm_workspace_max_queued`` calls waiting. Idle lanes and
+    workspaces do not bank credit: a workspace with nothing waiting or in
+    flight in a lane is forgotten, and when it returns it starts at the
+    lane's virtual time, level with the workspace granted last.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._capacity = llm_capacity(settings)
+        self._in_use = 0
+        self._active: dict[str, int] = {}
+        self._queued: dict[str, int] = {}
+        weights = settings.llm_lane_weights
+        self._lanes = {lane: _LaneQueue(weights.get(lane, 1.0)) for lane in LANES}
+        self._vtime = 0.0
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def active(self, workspace_id: str) -> int:
+        return self._active.get(workspace_id, 0)
+
+    def queued(self, lane: Lane, workspace_id: str | None = None) -> int:
+        tenants = self._lanes[lane].tenants
+        if workspace_id is None:
+            return sum(len(t.waiters) for t in tenants.values())
+        tenant = tenants.get(workspace_id)
+        return len(tenant.waiters) if tenant else 0
+
+    def _below_cap(self, workspace_id: str) -> bool:
+        cap = self._settings.llm_workspace_caps.get(
+            workspace_id, self._settings.llm_workspace_default_cap
+        )
+        return cap is None or self.active(workspace_id) < cap
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane, workspace_id: str) -> AsyncIterator[None]:
+        start = time.monotonic()
+        await self._acquire(lane, workspace_id)
+        record_llm_queue_wait(lane, workspace_id, (time.monotonic() - start) * 1000)
+        record_llm_granted(lane, workspace_id)
+        try:
+            yield
+        finally:
+            self._release(lane, workspace_id)
+
+    async def _acquire(self, lane: Lane, workspace_id: str) -> None:
+        queued = self._queued.get(workspace_id, 0)
+        if queued >= self._settings.llm_workspace_max_queued:
+            record_llm_rejected(lane, workspace_id)
+            raise SchedulerQueueFullError(
+                f"workspace {workspace_id} has {queued} LLM calls queued"
+            )
+
+        queue = self._lanes[lane]
+        if not queue.waiting:
+            # A lane returning from idle starts at the current virtual time
+            queue.pass_ = max(queue.pass_, self._vtime)
+        tenant = queue.tenants.get(workspace_id)
+        if tenant is None:
+            weight = self._settings.llm_workspace_weights.get(workspace_id, 1.0)
+            tenant = queue.tenants[workspace_id] = _TenantQueue(weight)
+        if not tenant.waiters:
+            tenant.pass_ = max(tenant.pass_, queue.vtime)
+
+        waiter = asyncio.get_running_loop().create_future()
+        tenant.waiters.append(waiter)
+        self._queued[workspace_id] = queued + 1
+        record_llm_queue_depth(lane, 1)
+        # Grants immediately when a slot is free and nobody is ahead
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self._release(lane, workspace_id)
+            elif waiter in tenant.waiters:
+                tenant.waiters.remove(waiter)
+                self._dequeued(lane, workspace_id)
+                self._forget_idle(queue, workspace_id)
+            raise
+
+    def _dequeued(self, lane: Lane, workspace_id: str) -> None:
+        remaining = self._queued.pop(workspace_id) - 1
+        if remaining:
+            self._queued[workspace_id] = remaining
+        record_llm_queue_depth(lane, -1)
+
+    def _release(self, lane: Lane, workspace_id: str) -> None:
+        self._in_use -= 1
+        remaining = self._active.pop(workspace_id) - 1
+        if remaining:
+            self._active[workspace_id] = remaining
+        queue = self._lanes[lane]
+        queue.tenants[workspace_id].active -= 1
+        self._forget_idle(queue, workspace_id)
+        self._dispatch()
+
+    @staticmethod
+    def _forget_idle(queue: _LaneQueue, workspace_id: str) -> None:
+        """Drop the workspace's entry in ``queue`` once nothing waits or runs there."""
+        tenant = queue.tenants[workspace_id]
+        if not tenant.waiters and not tenant.active:
+            del queue.tenants[workspace_id]
+
+    def _next(self) -> tuple[Lane, str] | None:
+        """Pick the lane, then the workspace within it, that is furthest behind.
+
+        Workspaces at their cap are passed over, and so are lanes in which
+        every waiting workspace is at its cap.
+        """
+        best: tuple[float, float, Lane, str] | None = None
+        for lane, queue in self._lanes.items():
+            for workspace_id, tenant in queue.tenants.items():
+                if not tenant.waiters or not self._below_cap(workspace_id):
+                    continue
+                key = (queue.pass_, tenant.pass_, lane, workspace_id)
+                if best is None or key < best:
+                    best = key
+        return None if best is None else (best[2], best[3])
+
+    def _dispatch(self) -> None:
+        while self._in_use < self._capacity:
+            picked = self._next()
+            if picked is None:
+                return
+            lane, workspace_id = picked
+            queue = self._lanes[lane]
+            tenant = queue.tenants[workspace_id]
+            waiter = tenant.waiters.popleft()
+            self._dequeued(lane, workspace_id)
+            if waiter.cancelled():
+                self._forget_idle(queue, workspace_id)
+                continue
+            self._in_use += 1
+            self._active[workspace_id] = self.active(workspace_id) + 1
+            tenant.active += 1
+            self._vtime = queue.pass_
+            queue.advance()
+            queue.vtime = tenant.pass_
+            tenant.advance()
+            waiter.set_result(None)
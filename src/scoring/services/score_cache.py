@@ -0,0 +1,76 @@
+from datetime import UTC, datetime, timedelta
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import CachedScore, LLMScoringResponse
+from scoring.observability.metrics import record_score_cache_lookup
+from scoring.repositories.firestore import FirestoreRepository
+from scoring.services.lru import LRUCache
+
+logger = structlog.get_logger()
+
+
+class ScoreCache:
+    """Content-addressed scores: Firestore store with an in-process LRU in front.
+
+    Entries are keyed by workspace and the fingerprint of the LLM input, so a
+    re-application or replayed application with identical inputs reuses the
+    earlier score instead of calling Gemini again. The cache is best effort:
+    store errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        repo: FirestoreRepository,
+        front: LRUCache[str, CachedScore],
+        settings: Settings,
+    ) -> None:
+        self._repo = repo
+        self._front = front
+        self._settings = settings
+
+    async def get(self, workspace_id: str, fingerprint: str) -> CachedScore | None:
+        key = f"{workspace_id}/{fingerprint}"
+        now = datetime.now(UTC)
+        entry = self._front.get(key)
+        if entry is not None and entry.expires_at > now:
+            record_score_cache_lookup("front")
+            return entry
+
+        try:
+            entry = await self._repo.get_cached_score(workspace_id, fingerprint)
+        except Exception as e:
+            logger.warning("score_cache_lookup_failed", fingerprint=fingerprint, error=str(e))
+            entry = None
+        if entry is None or entry.expires_at <= now:
+            record_score_cache_lookup("miss")
+            return None
+
+        self._front.put(key, entry)
+        record_score_cache_lookup("store")
+        return entry
+
+    async def put(
+        self,
+        workspace_id: str,
+        fingerprint: str,
+        response: LLMScoringResponse,
+        model: str,
+        tokens: dict,
+    ) -> None:
+        now = datetime.now(UTC)
+        entry = CachedScore(
+            fingerprint=fingerprint,
+            score=response.score,
+            reasoning=response.reasoning,
+            model=model,
+            tokens=tokens,
+            created_at=now,
+            expires_at=now + timedelta(seconds=self._settings.score_cache_ttl_s),
+        )
+        self._front.put(f"{workspace_id}/{fingerprint}", entry)
+        try:
+            await self._repo.save_cached_score(workspace_id, entry)
+        except Exception as e:
+            logger.warning("score_cache_store_failed", fingerprint=fingerprint, error=str(e))
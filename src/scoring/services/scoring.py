@@ -1,27 +1,67 @@
 import asyncio
 import time
+from contextlib import nullcontext
 from datetime import UTC, datetime
 from uuid import uuid4
 
 import structlog
 from opentelemetry import trace
 
-from scoring.config import Settings
+from scoring.config import Lane, ScoringTier, Settings
 from scoring.models import (
+    ATSCandidate,
+    AtsDocuments,
+    ATSVacancy,
+    CandidateApplication,
     EventAttributes,
     EventPayload,
+    LLMScoringResponse,
     ScoreCalculatedData,
     ScoringResult,
 )
-from scoring.observability.metrics import record_failure, record_scoring
+from scoring.observability.metrics import record_budget_action, record_failure, record_scoring
 from scoring.repositories.firestore import FirestoreRepository
-from scoring.services.llm import LLMService
+from scoring.services.completions import CompletionBroker
+from scoring.services.documents import load_candidate_documents
+from scoring.services.llm import LLMService, PreparedPrompt, scoring_tier, split_token_usage
+from scoring.services.microbatch import MicroBatcher
 from scoring.services.publisher import EventPublisher
+from scoring.services.scheduler import LLMScheduler
+from scoring.services.score_cache import ScoreCache
+from scoring.services.usage import (
+    TokenBudgetExceededError,
+    UsageLedger,
+    capped_tier,
+    seconds_until_next_day,
+)
 
 logger = structlog.get_logger()
 tracer = trace.get_tracer(__name__)
 
 
+def score_calculated_event(
+    result: ScoringResult, settings: Settings
+) -> tuple[EventPayload, EventAttributes]:
+    """Build the carv.score.calculated event announcing a stored result."""
+    score_data = ScoreCalculatedData(
+        application_id=result.application_id,
+        candidate_id=result.candidate_id,
+        vacancy_id=result.vacancy_id,
+        score=result.score,
+        reasoning=result.reasoning,
+        model=result.model,
+    )
+    attributes = EventAttributes(
+        event_id=uuid4(),
+        event_type="carv.score.calculated",
+        status="success",
+        workspace_id=result.workspace_id,
+        timestamp=result.scored_at,
+        source_service=settings.source_service,
+    )
+    return EventPayload(data=score_data.model_dump()), attributes
+
+
 class ScoringService:
     def __init__(
         self,
@@ -29,11 +69,21 @@ class ScoringService:
         llm: LLMService,
         publisher: EventPublisher,
         settings: Settings,
+        score_cache: ScoreCache | None = None,
+        completions: CompletionBroker | None = None,
+        scheduler: LLMScheduler | None = None,
+        batcher: MicroBatcher | None = None,
+        usage: UsageLedger | None = None,
     ) -> None:
         self._repo = repo
         self._llm = llm
         self._publisher = publisher
         self._settings = settings
+        self._score_cache = score_cache
+        self._completions = completions
+        self._scheduler = scheduler
+        self._batcher = batcher
+        self._usage = usage
 
     async def process(
         self,
@@ -42,35 +92,107 @@ class ScoringService:
         vacancy_reference_id: str,
         workspace_id: str,
         file_uris: list[str] | None = None,
+        previous: ScoringResult | None = None,
+        force: bool = False,
+        lane: Lane = "event",
+        tier: ScoringTier | None = None,
     ) -> ScoringResult:
+        """Score an application, reusing earlier work when the inputs match.
+
+        With ``previous``, the stored result is returned as is when its input
+        fingerprint is unchanged. ``force`` always calls the model, bypassing
+        both that check and the score cache. ``lane`` selects the scheduler
+        queue the LLM call waits in; a full workspace queue raises
+        ``SchedulerQueueFullError``. ``tier`` overrides the tier configured
+        for the workspace or lane. In ``microbatch_lanes`` the call goes
+        through the micro-batcher, and its latency includes the batch window.
+        Past the workspace's token budget the tier is capped, and past its
+        hard budget a model call in ``usage_defer_lanes`` raises
+        ``TokenBudgetExceededError``.
+        """
         with tracer.start_as_current_span("scoring.process") as span:
             span.set_attribute("application_id", application_id)
             span.set_attribute("candidate_reference_id", candidate_reference_id)
             span.set_attribute("vacancy_reference_id", vacancy_reference_id)
+            span.set_attribute("scoring.lane", lane)
+            if tier is None:
+                tier = scoring_tier(self._settings, workspace_id, lane)
+            tier, deferred = await self._apply_budget(workspace_id, lane, tier)
+            span.set_attribute("scoring.tier", tier)
 
             try:
-                candidate, vacancy, ats_documents = await asyncio.gather(
+                # Without file URIs from the event, the ATS documents' files are used
+                candidate, vacancy, documents = await asyncio.gather(
                     self._repo.get_candidate(workspace_id, candidate_reference_id),
                     self._repo.get_vacancy(workspace_id, vacancy_reference_id),
-                    self._repo.get_ats_documents(workspace_id, candidate_reference_id),
+                    load_candidate_documents(
+                        self._repo,
+                        self._settings,
+                        workspace_id,
+                        candidate_reference_id,
+                        file_uris,
+                    ),
                 )
+                event_file_uris = file_uris
+                ats_documents, file_uris = documents.ats_documents, documents.file_uris
+                span.set_attribute("scoring.document_tokens_saved", documents.tokens_saved)
 
-                # Fallback: if no file URIs from the event, check ATS documents
-                if not file_uris:
-                    file_uris = await self._repo.get_ats_document_file_uris(
-                        workspace_id, candidate_reference_id
+                prepared = self._llm.prepare(
+                    candidate, vacancy, ats_documents, file_uris=file_uris, tier=tier
+                )
+                if (
+                    previous is not None
+                    and not force
+                    and self._unchanged(
+                        previous, prepared, candidate, vacancy, ats_documents, file_uris
                     )
-                    if file_uris:
-                        logger.info(
-                            "file_uris_from_ats_documents",
-                            count=len(file_uris),
-                            uris=file_uris,
-                        )
+                ):
+                    span.set_attribute("scoring.unchanged", True)
+                    logger.info(
+                        "score_unchanged",
+                        application_id=application_id,
+                        input_fingerprint=prepared.fingerprint,
+                    )
+                    if previous.stale:
+                        await self._repo.clear_stale(workspace_id, application_id)
+                        previous.stale, previous.stale_since = False, None
+                    return previous
 
                 start = time.monotonic()
-                llm_response, token_usage = await self._llm.score_candidate(
-                    candidate, vacancy, ats_documents, file_uris=file_uris
-                )
+                cached = None
+                if self._score_cache is not None and not force:
+                    cached = await self._score_cache.get(workspace_id, prepared.fingerprint)
+                span.set_attribute("scoring.cache_hit", cached is not None)
+                if cached is None and deferred:
+                    self._defer(workspace_id)
+
+                if cached is not None:
+                    llm_response = LLMScoringResponse(
+                        score=cached.score, reasoning=cached.reasoning
+                    )
+                    # No tokens were spent on this result
+                    token_usage = {}
+                elif self._batcher is not None and lane in self._settings.microbatch_lanes:
+                    # The batcher takes the scheduler slot for the whole batch
+                    llm_response, token_usage = await self._batcher.score(
+                        workspace_id, lane, candidate, vacancy, ats_documents, prepared
+                    )
+                else:
+                    slot = (
+                        self._scheduler.slot(lane, workspace_id)
+                        if self._scheduler
+                        else nullcontext()
+                    )
+                    async with slot:
+                        # Queue wait is reported per lane and workspace, not as LLM latency
+                        start = time.monotonic()
+                        llm_response, token_usage = await self._llm.score_candidate(
+                            candidate,
+                            vacancy,
+                            ats_documents,
+                            file_uris=file_uris,
+                            prepared=prepared,
+                        )
                 latency_ms = int((time.monotonic() - start) * 1000)
 
                 now = datetime.now(UTC)
@@ -86,31 +208,26 @@ class ScoringService:
                     latency_ms=latency_ms,
                     tokens=token_usage,
                     scored_at=now,
+                    cache_hit=cached is not None,
+                    input_fingerprint=prepared.fingerprint,
+                    tier=None if cached is not None else tier,
+                    file_uris=event_file_uris or None,
                 )
 
                 await self._repo.save_scoring_result(result)
+                if self._usage is not None:
+                    self._usage.record(workspace_id, result.model, token_usage)
+                if self._score_cache is not None and cached is None:
+                    await self._score_cache.put(
+                        workspace_id, prepared.fingerprint, llm_response, result.model, token_usage
+                    )
 
-                # Publish carv.score.calculated event
-                score_data = ScoreCalculatedData(
-                    application_id=application_id,
-                    candidate_id=candidate_reference_id,
-                    vacancy_id=vacancy_reference_id,
-                    score=result.score,
-                    reasoning=result.reasoning,
-                    model=result.model,
-                )
-                attributes = EventAttributes(
-                    event_id=uuid4(),
-                    event_type="carv.score.calculated",
-                    status="success",
-                    workspace_id=workspace_id,
-                    timestamp=now,
-                    source_service=self._settings.source_service,
-                )
-                payload = EventPayload(data=score_data.model_dump())
+                payload, attributes = score_calculated_event(result, self._settings)
                 self._publisher.publish(payload=payload, attributes=attributes)
 
                 record_scoring(result, latency_ms)
+                if self._completions is not None:
+                    self._completions.publish(result)
 
                 logger.info(
                     "candidate_scored",
@@ -119,6 +236,7 @@ class ScoringService:
                     vacancy_reference_id=vacancy_reference_id,
                     score=result.score,
                     latency_ms=latency_ms,
+                    cache_hit=result.cache_hit,
                 )
 
                 return result
@@ -133,3 +251,236 @@ class ScoringService:
                     error=str(e),
                 )
                 raise
+
+    async def process_candidate(
+        self,
+        workspace_id: str,
+        candidate_reference_id: str,
+        applications: list[CandidateApplication],
+        file_uris: list[str] | None = None,
+        lane: Lane = "event",
+        tier: ScoringTier | None = None,
+    ) -> list[ScoringResult]:
+        """Score one candidate's applications to several vacancies together.
+
+        The candidate, their documents and files are sent once per call with
+        up to ``multi_vacancy_max`` vacancies, instead of once per
+        application. Each application still gets its own result, cache entry
+        and carv.score.calculated event; the results carry the fingerprint a
+        single-vacancy scoring would have, so either path reuses the other's
+        work. The call's tokens are shared between its results.
+        """
+        with tracer.start_as_current_span("scoring.process_candidate") as span:
+            span.set_attribute("candidate_reference_id", candidate_reference_id)
+            span.set_attribute("scoring.applications", len(applications))
+            span.set_attribute("scoring.lane", lane)
+            if tier is None:
+                tier = scoring_tier(self._settings, workspace_id, lane)
+            tier, deferred = await self._apply_budget(workspace_id, lane, tier)
+            span.set_attribute("scoring.tier", tier)
+
+            try:
+                vacancy_ids = list(dict.fromkeys(a.vacancy_reference_id for a in applications))
+                candidate, documents, *vacancy_list = await asyncio.gather(
+                    self._repo.get_candidate(workspace_id, candidate_reference_id),
+                    load_candidate_documents(
+                        self._repo, self._settings, workspace_id, candidate_reference_id, file_uris
+                    ),
+                    *(self._repo.get_vacancy(workspace_id, v) for v in vacancy_ids),
+                )
+                vacancies: dict[str, ATSVacancy] = dict(zip(vacancy_ids, vacancy_list))
+                ats_documents, file_uris = documents.ats_documents, documents.file_uris
+
+                prepared = {
+                    vacancy_id: self._llm.prepare(
+                        candidate, vacancy, ats_documents, file_uris=file_uris, tier=tier
+                    )
+                    for vacancy_id, vacancy in vacancies.items()
+                }
+
+                # vacancy ID -> (response, tokens, latency_ms, cache hit)
+                scored: dict[str, tuple[LLMScoringResponse, dict, int, bool]] = {}
+                if self._score_cache is not None:
+                    hits = await asyncio.gather(
+                        *(
+                            self._score_cache.get(workspace_id, p.fingerprint)
+                            for p in prepared.values()
+                        )
+                    )
+                    for vacancy_id, cached in zip(prepared, hits):
+                        if cached is not None:
+                            response = LLMScoringResponse(
+                                score=cached.score, reasoning=cached.reasoning
+                            )
+                            scored[vacancy_id] = (response, {}, 0, True)
+                span.set_attribute("scoring.cache_hits", len(scored))
+
+                misses = [v for v in vacancy_ids if v not in scored]
+                if misses and deferred:
+                    self._defer(workspace_id)
+                size = self._settings.multi_vacancy_max
+                chunks = [misses[i : i + size] for i in range(0, len(misses), size)]
+                for chunk_results in await asyncio.gather(
+                    *(
+                        self._score_vacancies(
+                            workspace_id,
+                            candidate,
+                            ats_documents,
+                            {v: vacancies[v] for v in chunk},
+                            [prepared[v] for v in chunk],
+                            file_uris,
+                            lane,
+                            tier,
+                        )
+                        for chunk in chunks
+                    )
+                ):
+                    scored.update(chunk_results)
+
+                now = datetime.now(UTC)
+                results = []
+                for application in applications:
+                    vacancy_id = application.vacancy_reference_id
+                    response, token_usage, latency_ms, cache_hit = scored[vacancy_id]
+                    results.append(
+                        ScoringResult(
+                            application_id=application.application_id,
+                            candidate_id=candidate_reference_id,
+                            vacancy_id=vacancy_id,
+                            workspace_id=workspace_id,
+                            score=response.score,
+                            reasoning=response.reasoning,
+                            model=self._settings.gemini_model,
+                            latency_ms=latency_ms,
+                            tokens=token_usage,
+                            scored_at=now,
+                            cache_hit=cache_hit,
+                            input_fingerprint=prepared[vacancy_id].fingerprint,
+                            tier=None if cache_hit else tier,
+                        )
+                    )
+
+                await self._repo.save_scoring_results(results)
+                if self._usage is not None:
+                    for vacancy_id in misses:
+                        self._usage.record(
+                            workspace_id, self._settings.gemini_model, scored[vacancy_id][1]
+                        )
+                if self._score_cache is not None:
+                    for vacancy_id in misses:
+                        response, token_usage, _, _ = scored[vacancy_id]
+                        await self._score_cache.put(
+                            workspace_id,
+                            prepared[vacancy_id].fingerprint,
+                            response,
+                            self._settings.gemini_model,
+                            token_usage,
+                        )
+
+                for result in results:
+                    payload, attributes = score_calculated_event(result, self._settings)
+                    self._publisher.publish(payload=payload, attributes=attributes)
+                    record_scoring(result, result.latency_ms)
+                    if self._completions is not None:
+                        self._completions.publish(result)
+
+                logger.info(
+                    "candidate_scored_multi",
+                    candidate_reference_id=candidate_reference_id,
+                    applications=len(results),
+                    llm_calls=len(chunks),
+                    cache_hits=len(vacancy_ids) - len(misses),
+                )
+                return results
+
+            except Exception as e:
+                record_failure(type(e).__name__)
+                logger.error(
+                    "scoring_failed",
+                    candidate_reference_id=candidate_reference_id,
+                    application_ids=[a.application_id for a in applications],
+                    error=str(e),
+                )
+                raise
+
+    def _unchanged(
+        self,
+        previous: ScoringResult,
+        prepared: PreparedPrompt,
+        candidate: ATSCandidate,
+        vacancy: ATSVacancy,
+        ats_documents: AtsDocuments,
+        file_uris: list[str],
+    ) -> bool:
+        """Whether ``previous`` was scored from the inputs the model would get now.
+
+        Callers pass the files ``previous`` was scored with, and the
+        comparison uses its tier: a push-event result re-scored from
+        /re-score (interactive lane) still matches when nothing changed.
+        """
+        if previous.input_fingerprint is None:
+            return False
+        if previous.input_fingerprint == prepared.fingerprint:
+            return True
+        if previous.tier == prepared.tier or previous.tier not in self._settings.gemini_tiers:
+            return False
+        then = self._llm.prepare(
+            candidate, vacancy, ats_documents, file_uris=file_uris, tier=previous.tier
+        )
+        return then.fingerprint == previous.input_fingerprint
+
+    async def _apply_budget(
+        self, workspace_id: str, lane: Lane, tier: ScoringTier
+    ) -> tuple[ScoringTier, bool]:
+        """The tier the workspace's token budget allows, and whether model calls must wait."""
+        if self._usage is None:
+            return tier, False
+        state = await self._usage.budget_state(workspace_id)
+        if state == "ok":
+            return tier, False
+        trace.get_current_span().set_attribute("scoring.budget", state)
+        capped = capped_tier(tier, self._settings.usage_soft_budget_tier)
+        if capped != tier:
+            record_budget_action(workspace_id, "downgraded")
+        return capped, state == "hard" and lane in self._settings.usage_defer_lanes
+
+    def _defer(self, workspace_id: str) -> None:
+        record_budget_action(workspace_id, "deferred")
+        logger.warning("token_budget_exceeded", workspace_id=workspace_id)
+        raise TokenBudgetExceededError(workspace_id, seconds_until_next_day())
+
+    async def _score_vacancies(
+        self,
+        workspace_id: str,
+        candidate: ATSCandidate,
+        ats_documents: AtsDocuments,
+        vacancies: dict[str, ATSVacancy],
+        prepared: list[PreparedPrompt],
+        file_uris: list[str] | None,
+        lane: Lane,
+        tier: ScoringTier,
+    ) -> dict[str, tuple[LLMScoringResponse, dict, int, bool]]:
+        """One LLM call for a chunk of vacancies, in one scheduler slot."""
+        slot = self._scheduler.slot(lane, workspace_id) if self._scheduler else nullcontext()
+        async with slot:
+            start = time.monotonic()
+            if len(vacancies) == 1:
+                # A lone vacancy uses the plain prompt and schema
+                ((vacancy_id, vacancy),) = vacancies.items()
+                response, token_usage = await self._llm.score_candidate(
+                    candidate, vacancy, ats_documents, file_uris=file_uris, prepared=prepared[0]
+                )
+                responses = {vacancy_id: response}
+            else:
+                responses, token_usage = await self._llm.score_multi(
+                    self._llm.prepare_vacancies(
+                        candidate, vacancies, ats_documents, file_uris=file_uris, tier=tier
+                    )
+                )
+            latency_ms = int((time.monotonic() - start) * 1000)
+
+        shares = split_token_usage(token_usage, len(responses))
+        return {
+            vacancy_id: (responses[vacancy_id], share, latency_ms, False)
+            for vacancy_id, share in zip(vacancies, shares)
+        }
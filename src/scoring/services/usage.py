@@ -0,0 +1,224 @@
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+import structlog
+
+from scoring.config import ScoringTier, Settings, TokenBudget
+from scoring.models import TokenCounts
+from scoring.observability.metrics import record_token_usage
+from scoring.repositories.firestore import FirestoreRepository
+
+logger = structlog.get_logger()
+
+BudgetState = Literal["ok", "soft", "hard"]
+
+_TIER_ORDER: tuple[ScoringTier, ...] = ("fast", "standard", "thorough")
+
+# (workspace, UTC day, model)
+_LedgerKey = tuple[str, str, str]
+
+
+class TokenBudgetExceededError(RuntimeError):
+    """The workspace is past its hard token budget for today."""
+
+    def __init__(self, workspace_id: str, retry_after_s: float) -> None:
+        super().__init__(f"workspace {workspace_id} is over its daily token budget")
+        self.workspace_id = workspace_id
+        self.retry_after_s = retry_after_s
+
+
+def usage_day(now: datetime | None = None) -> str:
+    """The ledger day (UTC, YYYY-MM-DD) that ``now`` falls on."""
+    return (now or datetime.now(UTC)).strftime("%Y-%m-%d")
+
+
+def seconds_until_next_day(now: datetime | None = None) -> float:
+    now = now or datetime.now(UTC)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+def capped_tier(tier: ScoringTier, ceiling: ScoringTier) -> ScoringTier:
+    """``tier``, or ``ceiling`` when that is the cheaper of the two."""
+    return min(tier, ceiling, key=_TIER_ORDER.index)
+
+
+def token_counts(
+    settings: Settings, model: str, token_usage: dict, batch: bool = False
+) -> TokenCounts:
+    """One scoring's token usage, priced at the model's list price.
+
+    Models without a price in ``usage_model_prices`` are counted at no cost.
+    """
+    prompt = token_usage.get("prompt_tokens") or 0
+    completion = token_usage.get("completion_tokens") or 0
+    thinking = token_usage.get("thinking_tokens") or 0
+    cost = 0.0
+    price = settings.usage_model_prices.get(model)
+    if price is not None:
+        cost = (
+            prompt * price.input_per_mtok + (completion + thinking) * price.output_per_mtok
+        ) / 1_000_000
+        if batch:
+            cost *= settings.usage_batch_discount
+    return TokenCounts(
+        scorings=1,
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        thinking_tokens=thinking,
+        total_tokens=token_usage.get("total_tokens") or prompt + completion + thinking,
+        cost_usd=cost,
+    )
+
+
+def _add(counts: TokenCounts, other: TokenCounts) -> TokenCounts:
+    return TokenCounts(
+        **{name: value + getattr(other, name) for name, value in counts.model_dump().items()}
+    )
+
+
+@dataclass
+class _Spent:
+    """Tokens a workspace has spent today, as last read plus added since."""
+
+    day: str
+    tokens: int
+    read_at: float
+
+
+class UsageLedger:
+    """Aggregates token usage per workspace, model and UTC day, and applies budgets.
+
+    Every scoring that called the model is exported as metrics and added to
+    an in-memory tally, which is written to the workspace's ``TokenUsage``
+    ledger in Firestore every ``usage_flush_interval_s``: one document per
+    day, with totals and a breakdown per model. Writes are server-side
+    increments, so each instance adds its own share.
+
+    A workspace's budget is checked against today's ledger total, read at
+    most every ``usage_refresh_s`` and kept current in between with this
+    instance's own usage, so other instances' usage shows up within a
+    refresh. Without ``usage_ledger_enabled`` nothing is written or read and
+    budgets apply to this instance's usage only.
+    """
+
+    def __init__(
+        self,
+        repo_factory: Callable[[], FirestoreRepository],
+        settings: Settings,
+    ) -> None:
+        self._repo_factory = repo_factory
+        self._settings = settings
+        self._pending: dict[_LedgerKey, TokenCounts] = {}
+        self._spent: dict[str, _Spent] = {}
+        # Held by flush and by ledger reads, so usage moving from _pending to
+        # the ledger is never counted in both or in neither
+        self._ledger_lock = asyncio.Lock()
+
+    def record(
+        self, workspace_id: str, model: str, token_usage: dict, batch: bool = False
+    ) -> TokenCounts | None:
+        """Account for one scoring's tokens; empty usage (a cache hit) is skipped."""
+        if not token_usage:
+            return None
+        counts = token_counts(self._settings, model, token_usage, batch)
+        record_token_usage(workspace_id, model, counts)
+
+        day = usage_day()
+        if self._settings.usage_ledger_enabled:
+            key = (workspace_id, day, model)
+            self._pending[key] = _add(self._pending.get(key, TokenCounts()), counts)
+        spent = self._spent.get(workspace_id)
+        if spent is not None and spent.day == day:
+            spent.tokens += counts.total_tokens
+        elif not self._settings.usage_ledger_enabled:
+            self._spent[workspace_id] = _Spent(day, counts.total_tokens, time.monotonic())
+        return counts
+
+    def budget(self, workspace_id: str) -> TokenBudget | None:
+        return self._settings.usage_budgets.get(
+            workspace_id, self._settings.usage_default_budget
+        )
+
+    async def budget_state(self, workspace_id: str) -> BudgetState:
+        """Where the workspace stands against its budget today."""
+        budget = self.budget(workspace_id)
+        if budget is None or (budget.soft_tokens is None and budget.hard_tokens is None):
+            return "ok"
+        tokens = await self._spent_today(workspace_id)
+        if budget.hard_tokens is not None and tokens >= budget.hard_tokens:
+            return "hard"
+        if budget.soft_tokens is not None and tokens >= budget.soft_tokens:
+            return "soft"
+        return "ok"
+
+    async def _spent_today(self, workspace_id: str) -> int:
+        day = usage_day()
+        now = time.monotonic()
+        spent = self._spent.get(workspace_id)
+        if spent is not None and spent.day == day:
+            if (
+                not self._settings.usage_ledger_enabled
+                or now - spent.read_at < self._settings.usage_refresh_s
+            ):
+                return spent.tokens
+        if not self._settings.usage_ledger_enabled:
+            return 0
+
+        async with self._ledger_lock:
+            spent = self._spent.get(workspace_id)
+            if spent is not None and spent.day == day and spent.read_at >= now:
+                # Refreshed by another check while this one waited
+                return spent.tokens
+            try:
+                entries = await self._repo_factory().get_token_usage(workspace_id, [day])
+            except Exception as e:
+                # Budgets are best effort: carry on with what this instance knows
+                logger.warning("usage_read_failed", workspace_id=workspace_id, error=str(e))
+                if spent is not None and spent.day == day:
+                    return spent.tokens
+                return self._unflushed(workspace_id, day)
+            # No flush ran during the read, so the ledger holds none of _pending
+            tokens = (entries[0].total_tokens if entries else 0) + self._unflushed(
+                workspace_id, day
+            )
+            self._spent[workspace_id] = _Spent(day, tokens, time.monotonic())
+            return tokens
+
+    def _unflushed(self, workspace_id: str, day: str) -> int:
+        return sum(
+            counts.total_tokens
+            for (ws, d, _), counts in self._pending.items()
+            if ws == workspace_id and d == day
+        )
+
+    async def flush(self) -> None:
+        """Write the usage recorded since the last flush to the ledger."""
+        if not self._pending:
+            return
+        async with self._ledger_lock:
+            repo = self._repo_factory()
+            # One entry at a time, so a cancelled flush leaves the rest pending
+            for key in list(self._pending):
+                counts = self._pending.pop(key)
+                workspace_id, day, model = key
+                try:
+                    await repo.add_token_usage(workspace_id, day, model, counts)
+                except Exception as e:
+                    # Kept for the next flush; lost only if the instance stops first
+                    self._pending[key] = _add(self._pending.get(key, TokenCounts()), counts)
+                    logger.warning(
+                        "usage_flush_failed", workspace_id=workspace_id, day=day, error=str(e)
+                    )
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.usage_flush_interval_s)
+            await self.flush()
+
+    async def close(self) -> None:
+        await self.flush()
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+import structlog
+
+from scoring.config import Settings
+from scoring.models import DependencyStatus, ReadinessResponse
+
+logger = structlog.get_logger()
+
+WarmupCheck = Callable[[], Awaitable[None]]
+
+
+class Warmup:
+    """Connects to each dependency once before the instance reports ready.
+
+    Checks run concurrently; a failed check is retried with exponential
+    backoff until it succeeds, so a transient error at startup delays
+    readiness instead of leaving the instance unready for good.
+    """
+
+    def __init__(self, checks: dict[str, WarmupCheck], settings: Settings) -> None:
+        self._checks = checks
+        self._settings = settings
+        self.dependencies = {name: DependencyStatus() for name in checks}
+
+    @property
+    def ready(self) -> bool:
+        return all(d.status == "ok" for d in self.dependencies.values())
+
+    def report(self) -> ReadinessResponse:
+        return ReadinessResponse(
+            status="ready" if self.ready else "warming",
+            dependencies={k: v.model_copy() for k, v in self.dependencies.items()},
+        )
+
+    async def run(self) -> None:
+        start = time.monotonic()
+        await asyncio.gather(*(self._warm(name, check) for name, check in self._checks.items()))
+        logger.info(
+            "warmup_complete",
+            total_ms=round((time.monotonic() - start) * 1000, 1),
+            latency_ms={k: v.latency_ms for k, v in self.dependencies.items()},
+        )
+
+    async def _warm(self, name: str, check: WarmupCheck) -> None:
+        status = self.dependencies[name]
+        backoff = 0.5
+        while True:
+            status.attempts += 1
+            start = time.monotonic()
+            try:
+                await asyncio.wait_for(check(), timeout=self._settings.warmup_timeout_s)
+            except Exception as e:
+                status.status = "failed"
+                status.latency_ms = round((time.monotonic() - start) * 1000, 1)
+                status.error = f"{type(e).__name__}: {e}"
+                logger.warning(
+                    "warmup_failed", dependency=name, attempt=status.attempts, error=status.error
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self._settings.warmup_retry_max_interval_s)
+                continue
+            status.status = "ok"
+            status.latency_ms = round((time.monotonic() - start) * 1000, 1)
+            status.error = None
+            return
+
+
+def build_warmup(firestore_client, publisher_client, llm_backend, settings: Settings) -> Warmup:
+    async def firestore() -> None:
+        # A point read of a missing document: one round trip over the gRPC channel
+        await firestore_client.collection("Workspaces").document("_warmup").get()
+
+    async def pubsub() -> None:
+        await asyncio.to_thread(_resolve_topic, publisher_client, settings)
+
+    return Warmup(
+        {"firestore": firestore, "gemini": llm_backend.warm_up, "pubsub": pubsub},
+        settings,
+    )
+
+
+def _resolve_topic(publisher_client, settings: Settings) -> None:
+    from google.api_core import exceptions
+
+    topic_path = publisher_client.topic_path(settings.gcp_project_id, settings.event_bus_topic)
+    try:
+        publisher_client.get_topic(
+            request={"topic": topic_path}, timeout=settings.warmup_timeout_s
+        )
+    except exceptions.PermissionDenied:
+        # Publish-only identities cannot read topic metadata; the channel and
+        # credentials are warm either way. A missing topic still fails.
+        pass
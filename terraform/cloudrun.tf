@@ -1,3 +1,8 @@
+locals {
+  # Requests per instance; the service derives its LLM slots from it
+  request_concurrency = 10
+}
+
 resource "google_cloud_run_v2_service" "scoring_worker" {
   name     = "scoring-worker"
   location = var.region
@@ -11,7 +16,7 @@ resource "google_cloud_run_v2_service" "scoring_worker" {
       max_instance_count = 20
     }
 
-    max_instance_request_concurrency = 10
+    max_instance_request_concurrency = local.request_concurrency
     timeout                          = "300s"
 
     containers {
@@ -49,18 +54,26 @@ resource "google_cloud_run_v2_service" "scoring_worker" {
         name  = "OTEL_ENABLED"
         value = "true"
       }
+      env {
+        # The LLM scheduler sizes its slots from it (LLM_MAX_CONCURRENCY)
+        name  = "INSTANCE_REQUEST_CONCURRENCY"
+        value = tostring(local.request_concurrency)
+      }
 
       ports {
         container_port = 8080
       }
 
+      # /ready turns 200 once Firestore, Gemini and Pub/Sub have each answered
+      # a warm-up call, so new instances only take traffic with warm connections
       startup_probe {
         http_get {
-          path = "/health"
+          path = "/ready"
         }
-        initial_delay_seconds = 5
-        period_seconds        = 10
-        failure_threshold     = 3
+        initial_delay_seconds = 2
+        period_seconds        = 2
+        timeout_seconds       = 1
+        failure_threshold     = 30
       }
 
       liveness_probe {
@@ -25,3 +25,54 @@ resource "google_firestore_index" "scoring_results_by_candidate_time" {
     order      = "DESCENDING"
   }
 }
+
+# Cached scores are reusable for SCORE_CACHE_TTL_S; expired entries are
+# ignored by the service and deleted by Firestore TTL.
+resource "google_firestore_field" "score_cache_ttl" {
+  database   = var.firestore_database_name
+  collection = "ScoreCache"
+  field      = "expires_at"
+
+  ttl_config {}
+  index_config {}
+}
+
+# Async scoring jobs are kept for JOB_TTL_S after submission
+resource "google_firestore_field" "scoring_jobs_ttl" {
+  database   = var.firestore_database_name
+  collection = "ScoringJobs"
+  field      = "expires_at"
+
+  ttl_config {}
+  index_config {}
+}
+
+# DLQ replay runs and the event IDs they replayed are kept for
+# DLQ_REPLAY_TTL_S, which bounds how long a replay is deduplicated
+resource "google_firestore_field" "dlq_replays_ttl" {
+  database   = var.firestore_database_name
+  collection = "DlqReplays"
+  field      = "expires_at"
+
+  ttl_config {}
+  index_config {}
+}
+
+resource "google_firestore_field" "dlq_replayed_events_ttl" {
+  database   = var.firestore_database_name
+  collection = "DlqReplayedEvents"
+  field      = "expires_at"
+
+  ttl_config {}
+  index_config {}
+}
+
+# Workspace backfill runs are kept for BACKFILL_TTL_S
+resource "google_firestore_field" "backfills_ttl" {
+  database   = var.firestore_database_name
+  collection = "Backfills"
+  field      = "expires_at"
+
+  ttl_config {}
+  index_config {}
+}
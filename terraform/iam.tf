@@ -40,6 +40,47 @@ resource "google_storage_bucket_iam_member" "scoring_gcs_reader" {
   member = "serviceAccount:${google_service_account.scoring_service.email}"
 }
 
+# Batch scoring input and output under gs://<bucket>/batch-scoring
+# (scripts/batch_score.py); the script lists the output, so it also needs the
+# object viewer role above. The bucket holds candidate resumes, so batch
+# grants are limited to that prefix (IAM conditions need uniform bucket-level
+# access on the bucket)
+locals {
+  batch_objects_prefix = "projects/_/buckets/${var.gcs_bucket}/objects/batch-scoring/"
+}
+
+resource "google_storage_bucket_iam_member" "scoring_gcs_batch_writer" {
+  bucket = var.gcs_bucket
+  role   = "roles/storage.objectCreator"
+  member = "serviceAccount:${google_service_account.scoring_service.email}"
+
+  condition {
+    title      = "batch-scoring-only"
+    expression = "resource.name.startsWith(\"${local.batch_objects_prefix}\")"
+  }
+}
+
+# Vertex AI batch prediction jobs read their input and write their output as
+# the Vertex AI service agent
+resource "google_storage_bucket_iam_member" "vertex_batch_gcs" {
+  bucket = var.gcs_bucket
+  role   = "roles/storage.objectAdmin"
+  member = "serviceAccount:service-${data.google_project.current.number}@gcp-sa-aiplatform.iam.gserviceaccount.com"
+
+  condition {
+    title      = "batch-scoring-only"
+    expression = "resource.name.startsWith(\"${local.batch_objects_prefix}\")"
+  }
+}
+
+# Batch requests attach candidate PDFs by URI, which the service agent reads;
+# it gets no write or delete on them
+resource "google_storage_bucket_iam_member" "vertex_batch_gcs_reader" {
+  bucket = var.gcs_bucket
+  role   = "roles/storage.objectViewer"
+  member = "serviceAccount:service-${data.google_project.current.number}@gcp-sa-aiplatform.iam.gserviceaccount.com"
+}
+
 # Pub/Sub publisher (for outgoing events on the shared event bus)
 resource "google_pubsub_topic_iam_member" "scoring_publish_outgoing" {
   topic  = var.outgoing_topic_id
@@ -47,6 +88,13 @@ resource "google_pubsub_topic_iam_member" "scoring_publish_outgoing" {
   member = "serviceAccount:${google_service_account.scoring_service.email}"
 }
 
+# Pub/Sub viewer on the outgoing topic (startup warm-up resolves the topic)
+resource "google_pubsub_topic_iam_member" "scoring_view_outgoing" {
+  topic  = var.outgoing_topic_id
+  role   = "roles/pubsub.viewer"
+  member = "serviceAccount:${google_service_account.scoring_service.email}"
+}
+
 # Service account for Pub/Sub push subscription OIDC auth
 resource "google_service_account" "pubsub_invoker" {
   account_id   = "pubsub-invoker"
@@ -30,6 +30,42 @@ resource "google_pubsub_subscription" "scoring_push" {
   depends_on = [google_project_service.apis]
 }
 
+# Push subscription: vacancy/candidate changes → mark stored scores stale
+resource "google_pubsub_subscription" "scoring_changes_push" {
+  name  = "scoring-worker-changes-push"
+  topic = var.incoming_topic_id
+
+  filter = "attributes.event_type = \"uats.vacancy.upserted\" OR attributes.event_type = \"uats.candidate.upserted\""
+
+  ack_deadline_seconds = 60
+
+  push_config {
+    push_endpoint = "${google_cloud_run_v2_service.scoring_worker.uri}/entity-changed"
+
+    oidc_token {
+      service_account_email = google_service_account.pubsub_invoker.email
+    }
+  }
+
+  retry_policy {
+    minimum_backoff = "10s"
+    maximum_backoff = "600s"
+  }
+
+  dead_letter_policy {
+    dead_letter_topic     = var.scoring_dlq_topic_id
+    max_delivery_attempts = 5
+  }
+
+  depends_on = [google_project_service.apis]
+}
+
+resource "google_pubsub_subscription_iam_member" "changes_subscriber" {
+  subscription = google_pubsub_subscription.scoring_changes_push.id
+  role         = "roles/pubsub.subscriber"
+  member       = "serviceAccount:service-${data.google_project.current.number}@gcp-sa-pubsub.iam.gserviceaccount.com"
+}
+
 # Pub/Sub needs publisher role on DLQ topic to forward dead-lettered messages
 resource "google_pubsub_topic_iam_member" "dlq_publisher" {
   topic  = var.scoring_dlq_topic_id
@@ -54,4 +90,11 @@ resource "google_pubsub_subscription" "scoring_dlq_pull" {
   depends_on = [google_project_service.apis]
 }
 
+# The service pulls and acks the DLQ during replays (POST /admin/dlq-replay)
+resource "google_pubsub_subscription_iam_member" "dlq_replay_subscriber" {
+  subscription = google_pubsub_subscription.scoring_dlq_pull.name
+  role         = "roles/pubsub.subscriber"
+  member       = "serviceAccount:${google_service_account.scoring_service.email}"
+}
+
 data "google_project" "current" {}
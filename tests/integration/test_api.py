@@ -7,7 +7,7 @@ from uuid import uuid4
 import pytest
 from fastapi.testclient import TestClient
 
-from scoring.models import LLMScoringResponse
+from scoring.models import AtsDocuments, LLMScoringResponse
 
 
 def _make_envelope(
@@ -53,6 +53,14 @@ def client(settings):
     app.state.settings = settings
     app.state.firestore_client = AsyncMock()
     app.state.publisher_client = MagicMock()
+    app.state.llm_backend = AsyncMock()
+    app.state.score_cache_front = None
+    app.state.rescore_worker = None
+    app.state.job_executor = None
+    app.state.completion_broker = None
+    app.state.llm_scheduler = None
+    app.state.breakers = None
+    app.state.dlq_replay_task = None
 
     return TestClient(app, raise_server_exceptions=False)
 
@@ -63,17 +71,63 @@ def test_health(client):
     assert response.json() == {"status": "ok"}
 
 
+def test_ready_while_warming_returns_503(client):
+    from scoring.services.warmup import Warmup
+
+    client.app.state.warmup = Warmup({"firestore": AsyncMock()}, client.app.state.settings)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "warming"
+    assert body["dependencies"]["firestore"]["status"] == "pending"
+
+
+def test_ready_after_warmup(client):
+    from scoring.services.warmup import Warmup
+
+    warmup = Warmup({"firestore": AsyncMock(), "gemini": AsyncMock()}, client.app.state.settings)
+    for status in warmup.dependencies.values():
+        status.status = "ok"
+        status.latency_ms = 12.5
+    client.app.state.warmup = warmup
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["dependencies"]["gemini"]["latency_ms"] == 12.5
+
+
+def test_ready_reports_breaker_state(client, settings):
+    from scoring.services.breaker import build_breakers
+    from scoring.services.warmup import Warmup
+
+    client.app.state.warmup = Warmup({}, settings)
+    client.app.state.breakers = build_breakers(settings)
+    client.app.state.breakers["gemini"]._transition("open")
+
+    response = client.get("/ready")
+
+    # An open breaker is reported but does not take the instance out of rotation
+    assert response.status_code == 200
+    assert response.json()["breakers"] == {
+        "gemini": "open",
+        "firestore": "closed",
+        "pubsub": "closed",
+    }
+
+
 def test_process_candidate_success(
     client, sample_candidate, sample_vacancy, sample_ats_documents, settings
 ):
     mock_repo = AsyncMock()
     mock_repo.get_candidate.return_value = sample_candidate
     mock_repo.get_vacancy.return_value = sample_vacancy
-    mock_repo.get_ats_documents.return_value = sample_ats_documents
+    mock_repo.get_ats_documents_and_files.return_value = (sample_ats_documents, [])
     mock_repo.save_scoring_result.return_value = "doc-123"
 
     mock_llm = AsyncMock()
     mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
     mock_llm.score_candidate.return_value = (
         LLMScoringResponse(score=72, reasoning="Good fit overall."),
         {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
@@ -100,6 +154,7 @@ def test_process_candidate_success(
 def test_process_candidate_failure_returns_500(client, settings):
     mock_repo = AsyncMock()
     mock_repo.get_candidate.side_effect = ValueError("Not found")
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
 
     with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo), patch(
         "scoring.api.dependencies.LLMService", return_value=AsyncMock()
@@ -113,6 +168,25 @@ def test_process_candidate_failure_returns_500(client, settings):
     assert response.status_code == 500
 
 
+def test_process_candidate_circuit_open_returns_503(client, settings):
+    from scoring.services.breaker import CircuitOpenError
+
+    mock_repo = AsyncMock()
+    mock_repo.get_candidate.side_effect = CircuitOpenError("firestore", 12.3)
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
+
+    with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo), patch(
+        "scoring.api.dependencies.LLMService", return_value=AsyncMock()
+    ), patch(
+        "scoring.api.dependencies.EventPublisher", return_value=MagicMock()
+    ), patch("scoring.services.scoring.record_failure"):
+        response = client.post("/process-candidate", json=_make_envelope())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "13"
+    assert response.json()["detail"] == "firestore is unavailable"
+
+
 def test_process_candidate_invalid_message(client):
     envelope = {
         "message": {
@@ -135,6 +209,28 @@ def test_process_candidate_invalid_message(client):
     assert response.json()["status"] == "skipped"
 
 
+def test_process_candidate_malformed_envelope_returns_422(client):
+    with patch("scoring.api.routes.build_scoring_service") as get_service:
+        response = client.post(
+            "/process-candidate",
+            content=b'{"message": {"attributes": {}}}',
+            headers={"Content-Type": "application/json"},
+        )
+    assert response.status_code == 422
+    get_service.assert_not_called()
+
+
+@pytest.mark.parametrize("data", [base64.b64encode(b"not json").decode(), "eyJkYXRhIjpudWxsfQ==é"])
+def test_process_candidate_invalid_message_skips_before_building_service(client, data):
+    envelope = _make_envelope()
+    envelope["message"]["data"] = data
+    with patch("scoring.api.routes.build_scoring_service") as get_service:
+        response = client.post("/process-candidate", json=envelope)
+    assert response.status_code == 200
+    assert response.json() == {"status": "skipped", "reason": "invalid message format"}
+    get_service.assert_not_called()
+
+
 def test_process_candidate_invalid_attributes(client):
     """Missing or invalid attributes should be skipped."""
     envelope = {
@@ -198,11 +294,12 @@ def test_process_candidate_with_file_uris(
     mock_repo = AsyncMock()
     mock_repo.get_candidate.return_value = sample_candidate
     mock_repo.get_vacancy.return_value = sample_vacancy
-    mock_repo.get_ats_documents.return_value = sample_ats_documents
+    mock_repo.get_ats_documents_and_files.return_value = (sample_ats_documents, [])
     mock_repo.save_scoring_result.return_value = "doc-123"
 
     mock_llm = AsyncMock()
     mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
     mock_llm.score_candidate.return_value = (
         LLMScoringResponse(score=80, reasoning="Strong match."),
         {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
@@ -238,3 +335,66 @@ def test_process_candidate_with_file_uris(
 
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
+
+
+def test_entity_changed_marks_scores_stale_and_queues_rescore(client):
+    mock_repo = AsyncMock()
+    mock_repo.mark_scores_stale.return_value = ["app-1", "app-2"]
+    worker = MagicMock()
+    worker.enqueue.return_value = True
+    client.app.state.rescore_worker = worker
+
+    envelope = _make_envelope(
+        event_type="uats.vacancy.upserted", after={"vacancy_id": "vac-1", "title": "Nieuw"}
+    )
+    with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo), patch(
+        "scoring.api.routes.record_scores_marked_stale"
+    ):
+        response = client.post("/entity-changed", json=envelope)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "marked_stale": 2, "queued": 2}
+    mock_repo.mark_scores_stale.assert_awaited_once_with("ws-1", "vacancy_id", "vac-1")
+    assert worker.enqueue.call_count == 2
+
+
+def test_entity_changed_skips_application_events(client):
+    response = client.post("/entity-changed", json=_make_envelope())
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "skipped"
+
+
+def test_dlq_replay_starts_a_background_run(client, settings):
+    from scoring.services.replay import DeadLetterReplayer
+
+    replayer = DeadLetterReplayer(AsyncMock(), AsyncMock(), AsyncMock(), settings)
+    replayer.run = AsyncMock()
+    with patch("scoring.api.admin.build_dlq_replayer", AsyncMock(return_value=replayer)):
+        response = client.post(
+            "/admin/dlq-replay",
+            json={"workspace_id": "ws-1", "event_types": ["uats.application.upserted"]},
+        )
+
+    assert response.status_code == 202
+    body = response.json()
+    assert response.headers["Location"] == f"/admin/dlq-replay/{body['run_id']}"
+    assert body["filter"]["workspace_id"] == "ws-1"
+    assert body["status"] == "running"
+    assert body["rate_per_s"] == settings.dlq_replay_rate_per_s
+
+
+def test_dlq_replay_rejects_naive_time_filters(client):
+    response = client.post("/admin/dlq-replay", json={"since": "2025-01-01T00:00:00"})
+
+    assert response.status_code == 422
+
+
+def test_dlq_replay_run_not_found(client):
+    mock_repo = AsyncMock()
+    mock_repo.get_replay_run.side_effect = ValueError("Not found")
+
+    with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo):
+        response = client.get("/admin/dlq-replay/missing")
+
+    assert response.status_code == 404
@@ -0,0 +1,84 @@
+"""DLQ replay against the Pub/Sub emulator.
+
+Runs only when PUBSUB_EMULATOR_HOST is set, e.g.:
+
+    gcloud beta emulators pubsub start --project=test-project --host-port=localhost:8085
+    PUBSUB_EMULATOR_HOST=localhost:8085 pytest tests/integration/test_replay_emulator.py
+"""
+
+import base64
+import json
+import os
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from scoring.models import ReplayRequest
+from scoring.services.replay import DeadLetterReplayer, PubSubDeadLetterSubscription
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("PUBSUB_EMULATOR_HOST"), reason="needs the Pub/Sub emulator"
+)
+
+
+@pytest.fixture
+def dlq(settings):
+    from google.cloud import pubsub_v1
+
+    settings.dlq_subscription = f"scoring-dlq-pull-{uuid4().hex[:8]}"
+    settings.dlq_replay_pull_timeout_s = 2.0
+    settings.dlq_replay_rate_per_s = 1000.0
+    publisher = pubsub_v1.PublisherClient()
+    subscriber = pubsub_v1.SubscriberClient()
+    topic = publisher.topic_path(settings.gcp_project_id, f"scoring-dlq-{uuid4().hex[:8]}")
+    publisher.create_topic(request={"name": topic})
+    path = subscriber.subscription_path(settings.gcp_project_id, settings.dlq_subscription)
+    subscriber.create_subscription(request={"name": path, "topic": topic})
+
+    def publish(workspace_id: str) -> None:
+        attributes = {
+            "event_id": str(uuid4()),
+            "event_type": "uats.application.upserted",
+            "status": "success",
+            "workspace_id": workspace_id,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "source_service": "uats",
+        }
+        data = json.dumps({"data": {"before": None, "after": None}}).encode()
+        publisher.publish(topic, data=data, **attributes).result()
+
+    yield publish, subscriber
+    subscriber.delete_subscription(request={"subscription": path})
+    publisher.delete_topic(request={"topic": topic})
+    subscriber.close()
+
+
+async def test_replay_acks_only_what_it_replayed(dlq, settings):
+    publish, subscriber = dlq
+    for workspace_id in ("ws-1", "ws-1", "ws-2"):
+        publish(workspace_id)
+    replayed = []
+
+    async def handler(envelope):
+        payload = json.loads(base64.b64decode(envelope.message.data))
+        assert payload == {"data": {"before": None, "after": None}}
+        replayed.append(envelope.message.attributes["workspace_id"])
+        return "ok"
+
+    repo = AsyncMock()
+    repo.is_event_replayed.return_value = False
+    subscription = PubSubDeadLetterSubscription(subscriber, settings)
+    replayer = DeadLetterReplayer(subscription, handler, repo, settings)
+
+    with patch("scoring.services.replay.record_dlq_replay"):
+        run = await replayer.run(replayer.new_run(ReplayRequest(workspace_id="ws-1")))
+
+        assert run.status == "completed"
+        assert (run.replayed, run.filtered_out) == (2, 1)
+        assert replayed == ["ws-1", "ws-1"]
+
+        # The filtered-out message was handed back; the replayed ones are gone
+        left = await subscription.pull(10)
+        assert [m.envelope.message.attributes["workspace_id"] for m in left] == ["ws-2"]
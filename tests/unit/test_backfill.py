@@ -0,0 +1,206 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from scoring.models import ApplicationSnapshot
+from scoring.services.backfill import WorkspaceBackfiller
+from scoring.services.breaker import CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.backfill.record_backfill"):
+        yield
+
+
+@pytest.fixture
+def backfill_settings(settings):
+    settings.backfill_page_size = 3
+    settings.backfill_rate_per_s = 1000.0
+    return settings
+
+
+class FakeRepo:
+    """Applications in document ID order, plus the IDs that have a score."""
+
+    def __init__(self, applications: list[ApplicationSnapshot], scored: set[str]) -> None:
+        self.applications = applications
+        self.scored = set(scored)
+        self.checkpoints: list[tuple[str | None, str]] = []
+
+    async def count_applications(self, workspace_id):
+        return len(self.applications)
+
+    async def list_applications(self, workspace_id, after, limit):
+        ids = [a.application_id for a in self.applications]
+        start = 0 if after is None else ids.index(after) + 1
+        page = self.applications[start : start + limit]
+        return page, page[-1].application_id if page else None
+
+    async def scored_application_ids(self, workspace_id, application_ids):
+        return self.scored.intersection(application_ids)
+
+    async def save_backfill_run(self, run):
+        self.checkpoints.append((run.cursor, run.status))
+
+
+def _applications(n: int) -> list[ApplicationSnapshot]:
+    return [
+        ApplicationSnapshot(application_id=f"app-{i:02d}", candidate_id=f"c-{i}", vacancy_id="v")
+        for i in range(n)
+    ]
+
+
+def _backfiller(repo, settings):
+    scoring = AsyncMock()
+
+    async def process(application_id, **kwargs):
+        repo.scored.add(application_id)
+
+    scoring.process.side_effect = process
+    return WorkspaceBackfiller(repo, scoring, settings), scoring
+
+
+async def test_scores_only_unscored_applications(backfill_settings):
+    repo = FakeRepo(_applications(7), scored={"app-01", "app-05"})
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert run.status == "completed"
+    assert (run.total, run.scanned, run.already_scored, run.scored) == (7, 7, 2, 5)
+    scored_ids = sorted(c.kwargs["application_id"] for c in scoring.process.await_args_list)
+    assert scored_ids == ["app-00", "app-02", "app-03", "app-04", "app-06"]
+    assert {c.kwargs["lane"] for c in scoring.process.await_args_list} == {"backfill"}
+    # Checkpointed at the start, after each of the three pages and at the end
+    assert [cursor for cursor, _ in repo.checkpoints] == [
+        None, "app-02", "app-05", "app-06", "app-06"
+    ]
+
+
+async def test_applications_without_references_are_skipped(backfill_settings):
+    orphan = ApplicationSnapshot(application_id="app-x", candidate_id="", vacancy_id="v")
+    repo = FakeRepo([*_applications(2), orphan], scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert (run.scored, run.skipped) == (2, 1)
+    assert scoring.process.await_count == 2
+
+
+async def test_resumes_after_the_checkpointed_cursor(backfill_settings):
+    repo = FakeRepo(_applications(6), scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+    run = backfiller.new_run("ws-1")
+    run.cursor = "app-02"
+
+    run = await backfiller.run(run)
+
+    assert run.scored == 3
+    assert sorted(c.kwargs["application_id"] for c in scoring.process.await_args_list) == [
+        "app-03", "app-04", "app-05"
+    ]
+
+
+async def test_failures_are_counted_and_passed_over(backfill_settings):
+    repo = FakeRepo(_applications(3), scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+    scoring.process.side_effect = [None, ValueError("Vacancy v not found"), None]
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert run.status == "completed"
+    assert (run.scored, run.failed) == (2, 1)
+    assert run.last_error == "ValueError: Vacancy v not found"
+
+
+async def test_open_circuit_ends_the_run_before_the_cursor_moves(backfill_settings):
+    repo = FakeRepo(_applications(6), scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+    scoring.process.side_effect = CircuitOpenError("gemini", 30)
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert run.status == "failed"
+    assert "gemini circuit is open" in run.last_error
+    assert run.cursor is None
+
+
+async def test_open_circuit_cancels_the_page_and_leaves_it_uncounted(backfill_settings):
+    repo = FakeRepo(_applications(6), scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+    cancelled = []
+
+    async def process(application_id, **kwargs):
+        if application_id == "app-03":
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(application_id)
+                raise
+        if application_id == "app-04":
+            raise CircuitOpenError("gemini", 30)
+        repo.scored.add(application_id)
+
+    scoring.process.side_effect = process
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert run.status == "failed"
+    assert cancelled == ["app-03"]
+    # Only the first page counts; a resumed run reads the second one again
+    assert (run.cursor, run.scanned, run.scored, run.failed) == ("app-02", 3, 3, 0)
+
+
+async def test_reports_progress_with_an_eta(backfill_settings):
+    repo = FakeRepo(_applications(6), scored=set())
+    reports = []
+    scoring = AsyncMock()
+    backfiller = WorkspaceBackfiller(
+        repo, scoring, backfill_settings, on_progress=lambda r, p: reports.append((r.scanned, p))
+    )
+
+    await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert [scanned for scanned, _ in reports] == [3, 6]
+    first, last = reports[0][1], reports[-1][1]
+    assert first.eta_s is not None and first.eta_s > 0
+    assert first.scored_per_s > 0
+    assert last.eta_s == 0
+
+
+async def test_groups_a_candidates_applications_into_one_scoring(backfill_settings):
+    applications = [
+        ApplicationSnapshot(application_id="app-00", candidate_id="c-1", vacancy_id="v-1"),
+        ApplicationSnapshot(application_id="app-01", candidate_id="c-2", vacancy_id="v-1"),
+        ApplicationSnapshot(application_id="app-02", candidate_id="c-1", vacancy_id="v-2"),
+    ]
+    repo = FakeRepo(applications, scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+
+    run = await backfiller.run(backfiller.new_run("ws-1"))
+
+    assert run.scored == 3
+    assert scoring.process.await_args.kwargs["application_id"] == "app-01"
+    grouped = scoring.process_candidate.await_args.kwargs
+    assert grouped["candidate_reference_id"] == "c-1"
+    assert [a.application_id for a in grouped["applications"]] == ["app-00", "app-02"]
+
+
+async def test_the_rate_counts_applications_not_scorings(backfill_settings):
+    backfill_settings.backfill_rate_per_s = 20.0
+    applications = [
+        ApplicationSnapshot(application_id=f"app-{i:02d}", candidate_id="c-1", vacancy_id=f"v-{i}")
+        for i in range(3)
+    ]
+    repo = FakeRepo(applications, scored=set())
+    backfiller, scoring = _backfiller(repo, backfill_settings)
+
+    started = asyncio.get_running_loop().time()
+    await backfiller.run(backfiller.new_run("ws-1"))
+
+    # One scoring of three applications waits for three starts at 20/s
+    scoring.process_candidate.assert_awaited_once()
+    assert asyncio.get_running_loop().time() - started >= 0.09
@@ -0,0 +1,181 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from scoring.models import BatchScoringRun, DocumentFile, ScoreRequest
+from scoring.services.batch import BatchScorer, LocalBatchSubmitter, simulated_response
+from scoring.services.llm import LLMService
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.batch.record_batch_results"):
+        yield
+
+
+@pytest.fixture
+def batch_settings(settings):
+    settings.batch_poll_interval_s = 0.0
+    return settings
+
+
+@pytest.fixture
+def mock_repo(sample_candidate, sample_vacancy, sample_ats_documents):
+    repo = AsyncMock()
+    repo.get_candidate.return_value = sample_candidate
+    repo.get_vacancy.return_value = sample_vacancy
+    repo.get_ats_documents_and_files.return_value = (
+        sample_ats_documents,
+        [DocumentFile(uri="gs://bucket/cover-letter.pdf")],
+    )
+    return repo
+
+
+def _requests(n: int) -> list[ScoreRequest]:
+    return [
+        ScoreRequest(
+            workspace_id="ws-1",
+            application_id=f"app-{i}",
+            candidate_reference_id="cand-1",
+            vacancy_reference_id="vac-1",
+        )
+        for i in range(n)
+    ]
+
+
+def _scorer(repo, settings, submitter):
+    llm = LLMService(settings, backend=MagicMock())
+    return BatchScorer(repo, llm, MagicMock(), submitter, settings), llm
+
+
+async def test_scores_applications_through_a_local_job(mock_repo, batch_settings, tmp_path):
+    submitter = LocalBatchSubmitter(tmp_path)
+    scorer, llm = _scorer(mock_repo, batch_settings, submitter)
+
+    run = await scorer.run("backfill", _requests(3))
+
+    assert run.status == "succeeded"
+    assert (run.submitted, run.saved, run.invalid, run.failed) == (3, 3, 0, 0)
+    (results,) = mock_repo.save_scoring_results.await_args.args
+    assert sorted(r.application_id for r in results) == ["app-0", "app-1", "app-2"]
+    expected = llm.prepare(
+        mock_repo.get_candidate.return_value,
+        mock_repo.get_vacancy.return_value,
+        mock_repo.get_ats_documents_and_files.return_value[0],
+        file_uris=["gs://bucket/cover-letter.pdf"],
+    ).fingerprint
+    # Same fingerprint as /score, so unchanged inputs are not rescored later
+    assert {r.input_fingerprint for r in results} == {expected}
+    assert all(r.batch_job_id == run.job_id and r.tokens["total_tokens"] for r in results)
+    assert scorer._publisher.publish.call_count == 3
+
+
+async def test_batch_input_matches_the_online_request(mock_repo, batch_settings, tmp_path):
+    scorer, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path))
+
+    run = await scorer.submit("backfill", _requests(1))
+
+    (line,) = [json.loads(x) for x in (tmp_path / run.job_id / "input.jsonl").open()]
+    request = line["request"]
+    parts = request["contents"][0]["parts"]
+    assert parts[0]["fileData"] == {
+        "fileUri": "gs://bucket/cover-letter.pdf",
+        "mimeType": "application/pdf",
+    }
+    assert "Tandartsassistent" in parts[1]["text"]
+    assert request["generationConfig"]["responseMimeType"] == "application/json"
+    assert request["generationConfig"]["maxOutputTokens"] == batch_settings.gemini_max_tokens
+    assert "thinkingConfig" not in request["generationConfig"]
+
+
+async def test_invalid_and_failed_responses_are_not_saved(mock_repo, batch_settings, tmp_path):
+    calls = []
+
+    def responder(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise RuntimeError("quota")
+        if len(calls) == 2:
+            response = simulated_response(request)
+            response["candidates"][0]["content"]["parts"][0]["text"] = '{"score": 140}'
+            return response
+        return simulated_response(request)
+
+    scorer, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path, responder))
+
+    run = await scorer.run("backfill", _requests(3))
+
+    assert (run.saved, run.invalid, run.failed) == (1, 1, 1)
+    (results,) = mock_repo.save_scoring_results.await_args.args
+    assert [r.application_id for r in results] == ["app-2"]
+
+
+async def test_a_failed_publish_does_not_stop_the_collection(
+    mock_repo, batch_settings, tmp_path
+):
+    from scoring.services.breaker import CircuitOpenError
+
+    publisher = MagicMock()
+    publisher.publish.side_effect = [None, CircuitOpenError("pubsub", 5.0), None]
+    usage = MagicMock()
+    llm = LLMService(batch_settings, backend=MagicMock())
+    scorer = BatchScorer(
+        mock_repo, llm, publisher, LocalBatchSubmitter(tmp_path), batch_settings, usage
+    )
+
+    run = await scorer.run("backfill", _requests(3))
+
+    assert (run.status, run.saved, run.unpublished) == ("succeeded", 3, 1)
+    assert publisher.publish.call_count == 3
+    assert usage.record.call_count == 3
+
+
+async def test_a_failed_save_fails_the_run(mock_repo, batch_settings, tmp_path):
+    mock_repo.save_scoring_results.side_effect = RuntimeError("deadline exceeded")
+    scorer, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path))
+
+    run = await scorer.run("backfill", _requests(2))
+
+    assert (run.status, run.saved) == ("failed", 0)
+    assert run.finished_at is not None
+    scorer._publisher.publish.assert_not_called()
+
+
+async def test_unloadable_inputs_are_skipped(mock_repo, batch_settings, tmp_path):
+    candidate = mock_repo.get_candidate.return_value
+    mock_repo.get_candidate.side_effect = [ValueError("not found"), candidate, candidate]
+    scorer, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path))
+
+    run = await scorer.run("backfill", _requests(3))
+
+    assert (run.submitted, run.skipped, run.saved) == (2, 1, 2)
+
+
+async def test_collects_a_job_submitted_by_another_process(
+    mock_repo, batch_settings, tmp_path
+):
+    first, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path))
+    submitted = await first.wait(await first.submit("backfill", _requests(2)))
+
+    second, _ = _scorer(mock_repo, batch_settings, LocalBatchSubmitter(tmp_path))
+    run = BatchScoringRun(
+        job_id=submitted.job_id, name="backfill", created_at=submitted.created_at
+    )
+    run = await second.collect(await second.wait(run))
+
+    assert (run.status, run.saved) == ("succeeded", 2)
+
+
+async def test_job_that_times_out_fails(mock_repo, batch_settings, tmp_path):
+    batch_settings.batch_timeout_s = 0.0
+    submitter = AsyncMock()
+    submitter.submit.return_value = "job-1"
+    submitter.state.return_value = ("running", None)
+    scorer, _ = _scorer(mock_repo, batch_settings, submitter)
+
+    run = await scorer.run("backfill", _requests(1))
+
+    assert run.status == "failed"
+    assert "Timed out" in run.error
+    mock_repo.save_scoring_results.assert_not_awaited()
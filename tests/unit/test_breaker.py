@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+import pytest
+
+from scoring.services.breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with (
+        patch("scoring.services.breaker.record_breaker_state"),
+        patch("scoring.services.breaker.record_breaker_rejected"),
+    ):
+        yield
+
+
+@pytest.fixture
+def clock():
+    now = [1000.0]
+    with patch("scoring.services.breaker.time.monotonic", side_effect=lambda: now[0]):
+        yield now
+
+
+@pytest.fixture
+def breaker(settings):
+    settings.breaker_min_calls = 4
+    settings.breaker_error_rate = 0.5
+    settings.breaker_window_s = 30.0
+    settings.breaker_open_s = 10.0
+    settings.breaker_half_open_probes = 2
+    settings.breaker_slow_call_ms = {"firestore": 500.0}
+    return CircuitBreaker("firestore", settings)
+
+
+def _call(breaker: CircuitBreaker, error: Exception | None = None) -> None:
+    try:
+        with breaker.guard():
+            if error is not None:
+                raise error
+    except type(error) if error is not None else ():
+        pass
+
+
+def test_opens_when_error_rate_reaches_threshold(breaker, clock):
+    _call(breaker)
+    _call(breaker)
+    _call(breaker, ConnectionError("down"))
+    assert breaker.state == "closed"
+
+    _call(breaker, ConnectionError("down"))
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as exc:
+        _call(breaker)
+    assert exc.value.dependency == "firestore"
+    assert exc.value.retry_after_s == 10.0
+
+
+def test_needs_minimum_calls_before_opening(breaker, clock):
+    for _ in range(3):
+        _call(breaker, ConnectionError("down"))
+
+    assert breaker.state == "closed"
+
+
+def test_ignored_errors_count_as_successes(breaker, clock):
+    for _ in range(10):
+        _call(breaker, ValueError("not found"))
+
+    assert breaker.state == "closed"
+
+
+def test_old_outcomes_leave_the_window(breaker, clock):
+    for _ in range(3):
+        _call(breaker, ConnectionError("down"))
+    clock[0] += 31
+
+    _call(breaker, ConnectionError("down"))
+
+    assert breaker.state == "closed"
+
+
+def test_opens_on_slow_calls(breaker, clock, settings):
+    settings.breaker_slow_rate = 0.5
+
+    for _ in range(4):
+        with breaker.guard():
+            clock[0] += 0.6
+
+    assert breaker.state == "open"
+
+
+def test_half_open_probes_close_the_breaker(breaker, clock):
+    for _ in range(4):
+        _call(breaker, ConnectionError("down"))
+    clock[0] += 10
+
+    assert breaker.state == "half_open"
+    probe_1 = breaker.guard()
+    probe_2 = breaker.guard()
+    probe_1.__enter__()
+    probe_2.__enter__()
+    # Only breaker_half_open_probes calls are let through
+    with pytest.raises(CircuitOpenError):
+        _call(breaker)
+    probe_1.__exit__(None, None, None)
+    probe_2.__exit__(None, None, None)
+
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_breaker(breaker, clock):
+    for _ in range(4):
+        _call(breaker, ConnectionError("down"))
+    clock[0] += 10
+
+    _call(breaker, ConnectionError("still down"))
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        _call(breaker)
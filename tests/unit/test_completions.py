@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from datetime import UTC, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scoring.api.scores import score_event_stream
+from scoring.models import ScoringResult
+from scoring.services.completions import (
+    CompletionBroker,
+    CompletionFilter,
+    FirestoreCompletionSource,
+    TooManySubscribersError,
+)
+
+
+def _result(application_id: str = "app-1", vacancy_id: str = "vac-1", minute: int = 0):
+    return ScoringResult(
+        application_id=application_id,
+        candidate_id="cand-1",
+        vacancy_id=vacancy_id,
+        workspace_id="ws-1",
+        score=70,
+        reasoning="Fit.",
+        model="gemini-2.5-flash",
+        latency_ms=10,
+        scored_at=datetime(2025, 1, 1, 12, minute, tzinfo=UTC),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.completions.record_completion_dropped"):
+        yield
+
+
+def test_publish_respects_filters(settings):
+    broker = CompletionBroker(settings)
+    by_vacancy = broker.subscribe(CompletionFilter("ws-1", vacancy_id="vac-2"))
+    by_application = broker.subscribe(
+        CompletionFilter("ws-1", application_ids=frozenset({"app-1"}))
+    )
+    other_workspace = broker.subscribe(CompletionFilter("ws-2"))
+
+    assert broker.publish(_result("app-1", "vac-1")) == 1
+    assert broker.publish(_result("app-2", "vac-2")) == 1
+
+    assert by_vacancy._queue.get_nowait().application_id == "app-2"
+    assert by_application._queue.get_nowait().application_id == "app-1"
+    assert other_workspace._queue.empty()
+
+
+def test_duplicate_completions_are_delivered_once(settings):
+    broker = CompletionBroker(settings)
+    sub = broker.subscribe(CompletionFilter("ws-1"))
+
+    broker.publish(_result())
+    broker.publish(_result())
+
+    assert sub._queue.qsize() == 1
+
+
+def test_full_buffer_drops_oldest(settings):
+    settings.sse_buffer_size = 2
+    broker = CompletionBroker(settings)
+    sub = broker.subscribe(CompletionFilter("ws-1"))
+
+    for minute in range(3):
+        broker.publish(_result(minute=minute))
+
+    assert sub.take_dropped() == 1
+    assert sub._queue.get_nowait().scored_at.minute == 1
+
+
+def test_source_watches_while_workspace_has_subscribers(settings):
+    source = MagicMock()
+    broker = CompletionBroker(settings, source)
+
+    first = broker.subscribe(CompletionFilter("ws-1"))
+    second = broker.subscribe(CompletionFilter("ws-1"))
+    broker.unsubscribe(first)
+    source.unwatch.assert_not_called()
+    broker.unsubscribe(second)
+
+    source.watch.assert_called_once_with("ws-1")
+    source.unwatch.assert_called_once_with("ws-1")
+
+
+def test_subscriber_limit(settings):
+    settings.sse_max_subscribers = 1
+    broker = CompletionBroker(settings)
+    broker.subscribe(CompletionFilter("ws-1"))
+
+    with pytest.raises(TooManySubscribersError):
+        broker.subscribe(CompletionFilter("ws-1"))
+
+
+async def test_event_stream_sends_heartbeats_and_scores(settings):
+    broker = CompletionBroker(settings)
+    sub = broker.subscribe(CompletionFilter("ws-1"))
+    stream = score_event_stream(broker, sub, heartbeat_s=0.01)
+
+    assert await anext(stream) == b": connected\n\n"
+    assert await anext(stream) == b": heartbeat\n\n"
+    broker.publish(_result())
+    event = (await anext(stream)).decode()
+    await stream.aclose()
+
+    assert event.startswith("event: score\nid: app-1:2025-01-01T12:00:00+00:00\ndata: {")
+    assert broker.subscriber_count == 0
+
+
+async def test_event_stream_reports_overflow(settings):
+    settings.sse_buffer_size = 1
+    broker = CompletionBroker(settings)
+    sub = broker.subscribe(CompletionFilter("ws-1"))
+    stream = score_event_stream(broker, sub, heartbeat_s=1.0)
+    await anext(stream)
+
+    broker.publish(_result(minute=0))
+    broker.publish(_result(minute=1))
+
+    assert await asyncio.wait_for(anext(stream), 1) == b'event: overflow\ndata: {"dropped": 1}\n\n'
+    await stream.aclose()
+
+
+async def test_firestore_source_starts_and_stops_listeners_off_the_loop(settings):
+    client = MagicMock()
+    listeners = {}
+    threads = []
+
+    def on_snapshot(callback):
+        threads.append(threading.current_thread())
+        listener = MagicMock()
+        listeners[len(listeners)] = listener
+        return listener
+
+    scores = client.collection.return_value.document.return_value.collection.return_value
+    scores.where.return_value.on_snapshot.side_effect = on_snapshot
+    source = FirestoreCompletionSource(settings, asyncio.get_running_loop(), client)
+
+    source.watch("ws-1")
+    source.unwatch("ws-1")
+    source.watch("ws-2")
+    await source.close()
+
+    assert len(threads) == 2 and threading.main_thread() not in threads
+    # In the order asked: ws-1 stopped once it was started, ws-2 at close
+    assert all(listener.unsubscribe.call_count == 1 for listener in listeners.values())
+    client.close.assert_called_once()
@@ -0,0 +1,126 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from scoring.models import AtsDocuments, DocumentFile
+from scoring.services.documents import load_candidate_documents, plan_documents
+
+RESUME_TEXT = "Verpleegkundige met tien jaar ervaring in de ouderenzorg. " * 20
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.documents.record_document_tokens_saved") as record:
+        yield record
+
+
+def test_a_full_resume_text_replaces_the_file_it_was_extracted_from(settings):
+    plan = plan_documents(
+        AtsDocuments(resume=RESUME_TEXT),
+        [
+            DocumentFile(uri="gs://bucket/resume.pdf", kind="resume", text=RESUME_TEXT, pages=2),
+            DocumentFile(uri="gs://bucket/diploma.pdf"),
+        ],
+        settings,
+    )
+
+    assert plan.ats_documents.resume == RESUME_TEXT
+    # A file that is not the source of a text is always sent
+    assert plan.file_uris == ["gs://bucket/diploma.pdf"]
+    assert plan.dropped == [("resume", "file", 2 * settings.documents_pdf_page_tokens)]
+
+
+def test_a_file_is_kept_unless_it_is_the_source_of_the_text(settings):
+    plan = plan_documents(
+        AtsDocuments(resume=RESUME_TEXT),
+        [
+            # Same kind, but its ATS document holds an older extraction
+            DocumentFile(uri="gs://bucket/old-cv.pdf", kind="resume", text="Thomas van den Berg"),
+            DocumentFile(uri="gs://bucket/CV_Thomas.pdf"),
+        ],
+        settings,
+    )
+
+    assert plan.ats_documents.resume == RESUME_TEXT
+    assert plan.file_uris == ["gs://bucket/old-cv.pdf", "gs://bucket/CV_Thomas.pdf"]
+    assert plan.dropped == []
+
+
+def test_a_short_text_is_dropped_for_the_file(settings):
+    text = "Thomas van den Berg"
+    plan = plan_documents(
+        AtsDocuments(resume=text),
+        [DocumentFile(uri="gs://bucket/cv.pdf", kind="resume", text=text)],
+        settings,
+    )
+
+    assert plan.ats_documents.resume is None
+    assert plan.file_uris == ["gs://bucket/cv.pdf"]
+    assert [(kind, representation) for kind, representation, _ in plan.dropped] == [
+        ("resume", "text")
+    ]
+
+
+def test_a_text_longer_than_the_file_is_dropped(settings):
+    settings.documents_min_text_chars = 10
+    text = RESUME_TEXT * 10
+    plan = plan_documents(
+        AtsDocuments(resume=text),
+        [DocumentFile(uri="gs://bucket/resume.pdf", kind="resume", text=text, pages=1)],
+        settings,
+    )
+
+    assert plan.ats_documents.resume is None
+    assert plan.file_uris == ["gs://bucket/resume.pdf"]
+
+
+def test_duplicate_texts_and_files_are_sent_once(settings):
+    plan = plan_documents(
+        AtsDocuments(resume=RESUME_TEXT, assessment=RESUME_TEXT.upper()),
+        [
+            DocumentFile(uri="gs://bucket/diploma.pdf"),
+            DocumentFile(uri="gs://bucket/diploma.pdf"),
+        ],
+        settings,
+    )
+
+    assert plan.ats_documents.resume == RESUME_TEXT
+    assert plan.ats_documents.assessment is None
+    assert plan.file_uris == ["gs://bucket/diploma.pdf"]
+    assert plan.tokens_saved == len(RESUME_TEXT) // 4
+
+
+async def test_load_matches_event_files_to_the_ats_documents(settings, _no_metrics):
+    repo = AsyncMock()
+    repo.get_ats_documents_and_files.return_value = (
+        AtsDocuments(resume=RESUME_TEXT),
+        [DocumentFile(uri="gs://bucket/upload-1.pdf", kind="resume", text=RESUME_TEXT)],
+    )
+
+    plan = await load_candidate_documents(
+        repo,
+        settings,
+        "ws-1",
+        "cand-1",
+        file_uris=["gs://bucket/upload-1.pdf", "gs://bucket/upload-2.pdf"],
+    )
+
+    assert plan.file_uris == ["gs://bucket/upload-2.pdf"]
+    _no_metrics.assert_called_once_with(
+        "resume", "file", settings.documents_pdf_default_pages * settings.documents_pdf_page_tokens
+    )
+
+
+async def test_load_without_dedupe_sends_everything(settings):
+    settings.documents_dedupe_enabled = False
+    repo = AsyncMock()
+    repo.get_ats_documents_and_files.return_value = (
+        AtsDocuments(resume=RESUME_TEXT),
+        [DocumentFile(uri="gs://bucket/resume.pdf", kind="resume", text=RESUME_TEXT)],
+    )
+
+    plan = await load_candidate_documents(repo, settings, "ws-1", "cand-1")
+
+    assert plan.ats_documents.resume == RESUME_TEXT
+    assert plan.file_uris == ["gs://bucket/resume.pdf"]
+    assert plan.dropped == []
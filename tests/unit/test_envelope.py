@@ -0,0 +1,86 @@
+import base64
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from scoring.api.envelope import (
+    InvalidMessageError,
+    decode_entity_data,
+    decode_envelope,
+    decode_upserted_data,
+)
+
+
+def _encode(payload) -> str:
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_decode_envelope_from_bytes():
+    body = json.dumps(
+        {
+            "message": {
+                "data": _encode({}),
+                "attributes": {"event_type": "uats.application.upserted"},
+                "messageId": "msg-1",
+                "publishTime": "2025-01-01T00:00:00Z",
+            },
+            "subscription": "projects/test/subscriptions/test-sub",
+        }
+    ).encode()
+    envelope = decode_envelope(body)
+    assert envelope.message.message_id == "msg-1"
+    assert envelope.message.attributes["event_type"] == "uats.application.upserted"
+
+
+def test_decode_envelope_rejects_malformed_body():
+    with pytest.raises(ValidationError):
+        decode_envelope(b"not json")
+    with pytest.raises(ValidationError):
+        decode_envelope(b'{"subscription": "s"}')
+
+
+def test_decode_upserted_data():
+    data = _encode(
+        {
+            "data": {
+                "before": None,
+                "after": {
+                    "application_id": "app-1",
+                    "candidate_id": "cand-1",
+                    "vacancy_id": "vac-1",
+                    "files": {"resume": {"external_storage": {"gcs_uri": "gs://b/r.pdf"}}},
+                },
+            },
+            "error": None,
+        }
+    )
+    upserted = decode_upserted_data(data)
+    assert upserted.after is not None
+    assert upserted.after.application_id == "app-1"
+    assert upserted.after.files["resume"]["external_storage"]["gcs_uri"] == "gs://b/r.pdf"
+
+
+def test_decode_upserted_data_without_data_is_deletion_shaped():
+    upserted = decode_upserted_data(_encode({"data": None, "error": None}))
+    assert upserted.before is None
+    assert upserted.after is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        base64.b64encode(b"not json").decode(),
+        _encode({"data": {"after": {"application_id": "app-1"}}}),
+        "a",
+        "eyJkYXRhIjpudWxsfQ==é",
+    ],
+)
+def test_decode_upserted_data_rejects_invalid(data):
+    with pytest.raises(InvalidMessageError):
+        decode_upserted_data(data)
+
+
+def test_decode_entity_data_rejects_non_ascii():
+    with pytest.raises(InvalidMessageError):
+        decode_entity_data("dmFjLTE=ü")
@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from scoring.services.jobs import JobExecutor, JobQueueFullError
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.jobs.record_job"):
+        yield
+
+
+@pytest.fixture
+def repo():
+    repo = AsyncMock()
+    repo.saved = []
+    repo.save_job.side_effect = lambda job: repo.saved.append(job.model_copy())
+    return repo
+
+
+def _result():
+    from datetime import UTC, datetime
+
+    from scoring.models import ScoringResult
+
+    return ScoringResult(
+        application_id="app-1",
+        candidate_id="cand-1",
+        vacancy_id="vac-1",
+        workspace_id="ws-1",
+        score=70,
+        reasoning="Fit.",
+        model="gemini-2.5-flash",
+        latency_ms=10,
+        scored_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+
+
+async def test_job_state_is_persisted_through_completion(settings, repo):
+    executor = JobExecutor(lambda: repo, settings)
+    work = AsyncMock(return_value=_result())
+
+    job = await executor.submit("ws-1", "score", "app-1", work)
+    assert job.status == "queued"
+    await asyncio.sleep(0.01)
+
+    assert [j.status for j in repo.saved] == ["queued", "running", "succeeded"]
+    assert repo.saved[-1].result.score == 70
+    assert executor.open_jobs == 0
+
+
+async def test_failed_work_is_recorded(settings, repo):
+    executor = JobExecutor(lambda: repo, settings)
+
+    await executor.submit("ws-1", "score", "app-1", AsyncMock(side_effect=RuntimeError("boom")))
+    await asyncio.sleep(0.01)
+
+    assert repo.saved[-1].status == "failed"
+    assert repo.saved[-1].error == "RuntimeError: boom"
+
+
+async def test_submissions_beyond_capacity_are_rejected(settings, repo):
+    settings.jobs_max_concurrency = 1
+    settings.jobs_max_queued = 1
+    executor = JobExecutor(lambda: repo, settings)
+    blocker = asyncio.Event()
+
+    async def work():
+        await blocker.wait()
+        return _result()
+
+    await executor.submit("ws-1", "score", "app-1", work)
+    await executor.submit("ws-1", "score", "app-2", work)
+    with pytest.raises(JobQueueFullError):
+        await executor.submit("ws-1", "score", "app-3", work)
+
+    await executor.shutdown()
+    interrupted = [j for j in repo.saved if j.error and "interrupted" in j.error]
+    assert {j.application_id for j in interrupted} == {"app-1", "app-2"}
+
+
+async def test_work_does_not_hold_the_submitter(settings, repo):
+    executor = JobExecutor(lambda: repo, settings)
+    started = MagicMock()
+
+    async def work():
+        started()
+        await asyncio.sleep(10)
+
+    await asyncio.wait_for(executor.submit("ws-1", "score", "app-1", work), timeout=0.5)
+    await executor.shutdown()
+
+
+async def test_shutdown_saves_the_interrupted_state_after_the_work_unwinds(settings, repo):
+    executor = JobExecutor(lambda: repo, settings)
+    events = []
+    repo.save_job.side_effect = lambda job: events.append(job.status)
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.01)
+            events.append("unwound")
+            raise
+
+    await executor.submit("ws-1", "score", "app-1", work)
+    await asyncio.sleep(0)
+    await executor.shutdown()
+
+    assert events == ["queued", "running", "unwound", "failed"]
@@ -30,3 +30,82 @@ def test_llm_scoring_response_rejects_invalid_score():
 
     with pytest.raises(Exception):
         LLMScoringResponse(score=-1, reasoning="Too low")
+
+
+def test_prepare_fingerprint_tracks_llm_inputs(
+    settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    from scoring.services.llm import LLMService
+
+    llm = LLMService(settings=settings, backend=object())
+    base = llm.prepare(sample_candidate, sample_vacancy, sample_ats_documents, ["gs://b/cv.pdf"])
+
+    # The application and candidate IDs are not part of the prompt
+    same = llm.prepare(
+        sample_candidate.model_copy(update={"id": "cand-2"}),
+        sample_vacancy,
+        sample_ats_documents,
+        ["gs://b/cv.pdf"],
+    )
+    assert same.fingerprint == base.fingerprint
+
+    other_file = llm.prepare(sample_candidate, sample_vacancy, sample_ats_documents, [])
+    settings.gemini_model = "gemini-2.5-pro"
+    other_model = llm.prepare(
+        sample_candidate, sample_vacancy, sample_ats_documents, ["gs://b/cv.pdf"]
+    )
+    assert len({base.fingerprint, other_file.fingerprint, other_model.fingerprint}) == 3
+
+
+def test_prepare_fingerprint_tracks_tier(
+    settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    from scoring.services.llm import LLMService
+
+    llm = LLMService(settings=settings, backend=object())
+    standard = llm.prepare(sample_candidate, sample_vacancy, sample_ats_documents)
+    fast = llm.prepare(sample_candidate, sample_vacancy, sample_ats_documents, tier="fast")
+
+    assert (standard.tier, fast.tier) == ("standard", "fast")
+    assert standard.fingerprint != fast.fingerprint
+
+
+def test_tier_output_is_capped_by_max_tokens(settings):
+    from scoring.services.llm import LLMService
+
+    settings.gemini_max_tokens = 2048
+    llm = LLMService(settings=settings, backend=object())
+
+    assert llm.tier_settings("thorough").max_output_tokens == 2048
+    assert llm.tier_settings("fast").max_output_tokens == 1024
+    assert llm.tier_settings("standard").max_output_tokens == 2048
+    assert settings.gemini_tiers["thorough"].max_output_tokens == 16384
+
+
+def test_default_tier_sends_the_pre_tier_generation_config(settings):
+    from scoring.services.llm import LLMService, generation_config
+    from scoring.services.prompt import system_prompt
+
+    llm = LLMService(settings=settings, backend=object())
+    standard = llm.tier_settings(settings.gemini_default_tier)
+    config = generation_config(
+        settings.gemini_temperature,
+        standard.max_output_tokens,
+        standard.thinking_budget,
+        standard.reasoning_sentences,
+    )
+
+    assert config.max_output_tokens == settings.gemini_max_tokens
+    assert config.thinking_config is None
+    assert config.system_instruction == system_prompt("2-4")
+
+
+def test_scoring_tier_prefers_workspace_then_lane(settings):
+    from scoring.services.llm import scoring_tier
+
+    settings.gemini_lane_tiers = {"backfill": "fast"}
+    settings.gemini_workspace_tiers = {"ws-vip": "thorough"}
+
+    assert scoring_tier(settings, "ws-1", "interactive") == "standard"
+    assert scoring_tier(settings, "ws-1", "backfill") == "fast"
+    assert scoring_tier(settings, "ws-vip", "backfill") == "thorough"
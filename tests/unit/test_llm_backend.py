@@ -0,0 +1,175 @@
+import random
+
+import httpx
+import pytest
+from google.genai import errors, types
+
+from scoring.models import LLMScoringResponse
+from scoring.services.llm import LLMService
+from scoring.services.llm_backend import (
+    SimulatedGeminiBackend,
+    VertexGeminiBackend,
+    create_llm_backend,
+)
+
+
+@pytest.fixture
+def sim_settings(settings):
+    settings.llm_backend = "simulated"
+    settings.llm_sim_base_latency_ms = 0.0
+    settings.llm_sim_ms_per_1k_prompt_tokens = 0.0
+    settings.llm_sim_ms_per_output_token = 0.0
+    settings.llm_sim_timeout_s = 0.0
+    return settings
+
+
+def test_create_llm_backend_selects_by_setting(sim_settings):
+    assert isinstance(create_llm_backend(sim_settings), SimulatedGeminiBackend)
+
+    sim_settings.llm_backend = "vertex"
+    assert isinstance(create_llm_backend(sim_settings), VertexGeminiBackend)
+
+
+@pytest.mark.asyncio
+async def test_simulated_backend_returns_schema_valid_response(sim_settings):
+    backend = SimulatedGeminiBackend(sim_settings, rng=random.Random(1))
+    config = types.GenerateContentConfig(system_instruction="x" * 400)
+
+    response = await backend.generate_content(
+        model="gemini-2.5-flash",
+        contents=[
+            types.Part.from_uri(file_uri="gs://b/r.pdf", mime_type="application/pdf"),
+            "y" * 4000,
+        ],
+        config=config,
+    )
+
+    result = LLMScoringResponse.model_validate_json(response.text)
+    assert 0 <= result.score <= 100
+    usage = response.usage_metadata
+    assert usage.prompt_token_count == 1100 + sim_settings.llm_sim_tokens_per_file
+    assert usage.candidates_token_count > 0
+    assert usage.thoughts_token_count > 0
+    assert usage.total_token_count == (
+        usage.prompt_token_count + usage.candidates_token_count + usage.thoughts_token_count
+    )
+
+
+@pytest.mark.asyncio
+async def test_simulated_backend_rate_limits(sim_settings):
+    sim_settings.llm_sim_rate_limit_rate = 1.0
+    backend = SimulatedGeminiBackend(sim_settings)
+
+    with pytest.raises(errors.ClientError) as exc_info:
+        await backend.generate_content(
+            "gemini-2.5-flash", ["prompt"], types.GenerateContentConfig()
+        )
+    assert exc_info.value.code == 429
+
+
+@pytest.mark.asyncio
+async def test_simulated_backend_times_out(sim_settings):
+    sim_settings.llm_sim_timeout_rate = 1.0
+    backend = SimulatedGeminiBackend(sim_settings)
+
+    with pytest.raises(httpx.TimeoutException):
+        await backend.generate_content(
+            "gemini-2.5-flash", ["prompt"], types.GenerateContentConfig()
+        )
+
+
+@pytest.mark.asyncio
+async def test_llm_service_with_simulated_backend(
+    sim_settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    service = LLMService(sim_settings, backend=SimulatedGeminiBackend(sim_settings))
+
+    result, token_usage = await service.score_candidate(
+        sample_candidate, sample_vacancy, sample_ats_documents
+    )
+
+    assert isinstance(result, LLMScoringResponse)
+    assert token_usage["prompt_tokens"] > 0
+    assert token_usage["total_tokens"] >= token_usage["prompt_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_simulated_backend_respects_thinking_budget(sim_settings):
+    backend = SimulatedGeminiBackend(sim_settings, rng=random.Random(1))
+    config = types.GenerateContentConfig(
+        thinking_config=types.ThinkingConfig(thinking_budget=0)
+    )
+
+    response = await backend.generate_content("gemini-2.5-flash", ["prompt"], config)
+
+    assert not response.usage_metadata.thoughts_token_count
+
+
+@pytest.mark.asyncio
+async def test_llm_service_reports_thinking_tokens_by_tier(
+    sim_settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    service = LLMService(sim_settings, backend=SimulatedGeminiBackend(sim_settings))
+
+    _, fast = await service.score_candidate(
+        sample_candidate, sample_vacancy, sample_ats_documents, tier="fast"
+    )
+    _, thorough = await service.score_candidate(
+        sample_candidate, sample_vacancy, sample_ats_documents, tier="thorough"
+    )
+
+    assert fast["thinking_tokens"] == 0
+    assert thorough["thinking_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_llm_service_scores_several_vacancies_in_one_call(
+    sim_settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    backend = SimulatedGeminiBackend(sim_settings)
+    service = LLMService(sim_settings, backend=backend)
+    other = sample_vacancy.model_copy(update={"id": "vac-2", "title": "Mondhygiënist"})
+
+    prepared = service.prepare_vacancies(
+        sample_candidate, {"vac-1": sample_vacancy, "vac-2": other}, sample_ats_documents
+    )
+    results, token_usage = await service.score_multi(prepared)
+
+    assert set(results) == {"vac-1", "vac-2"}
+    assert all(isinstance(r, LLMScoringResponse) for r in results.values())
+    assert token_usage["total_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_multi_vacancy_response_missing_a_vacancy_is_rejected(
+    sim_settings, sample_candidate, sample_vacancy, sample_ats_documents
+):
+    backend = SimulatedGeminiBackend(sim_settings)
+    service = LLMService(sim_settings, backend=backend)
+    prepared = service.prepare_vacancies(
+        sample_candidate, {"vac-1": sample_vacancy, "vac-2": sample_vacancy}, sample_ats_documents
+    )
+    # The model only answered for the first vacancy
+    backend._response_text = lambda contents, config: (
+        '{"scores": [{"vacancy_id": "vac-1", "score": 50, "reasoning": "Fine."}]}'
+    )
+
+    with pytest.raises(ValueError, match="vac-2"):
+        await service.score_multi(prepared)
+
+
+@pytest.mark.asyncio
+async def test_llm_service_scores_several_candidates_in_one_call(sim_settings, sample_vacancy):
+    backend = SimulatedGeminiBackend(sim_settings)
+    service = LLMService(sim_settings, backend=backend)
+
+    prepared = service.prepare_candidates(
+        sample_vacancy,
+        {"C1": ("## Candidate Information", ("gs://b/c1.pdf",)), "C2": ("## Candidate", ())},
+    )
+    results, _ = await service.score_multi(prepared)
+
+    assert set(results) == {"C1", "C2"}
+    # The vacancy is sent once, before the candidates
+    assert prepared.user_prompt.count("**Title**: Tandartsassistent") == 1
+    assert prepared.segments[1][0] == ("gs://b/c1.pdf",)
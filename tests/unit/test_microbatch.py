@@ -0,0 +1,170 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from scoring.models import AtsDocuments, LLMScoringResponse
+from scoring.services.llm import PreparedPrompt
+from scoring.services.microbatch import MicroBatcher
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.microbatch.record_microbatch") as record:
+        yield record
+
+
+@pytest.fixture
+def batch_settings(settings):
+    settings.microbatch_window_ms = 20.0
+    settings.microbatch_max_size = 8
+    return settings
+
+
+def _prepared(fingerprint: str, vacancy_hash: str = "vh-1") -> PreparedPrompt:
+    return PreparedPrompt(f"prompt {fingerprint}", (), fingerprint, vacancy_hash)
+
+
+def _llm():
+    llm = AsyncMock()
+    llm.prepare_candidates = MagicMock(side_effect=lambda vacancy, candidates, tier: candidates)
+
+    async def score_multi(candidates):
+        responses = {
+            key: LLMScoringResponse(score=10 * int(key[1:]), reasoning=f"Fit of {key}.")
+            for key in candidates
+        }
+        return responses, {"total_tokens": 100 * len(candidates) + 1}
+
+    llm.score_multi.side_effect = score_multi
+    llm.score_candidate.return_value = (
+        LLMScoringResponse(score=55, reasoning="Alone."),
+        {"total_tokens": 40},
+    )
+    return llm
+
+
+async def _score_all(batcher, candidate, vacancy, prepared_list):
+    return await asyncio.gather(
+        *(
+            batcher.score("ws-1", "event", candidate, vacancy, AtsDocuments(), p)
+            for p in prepared_list
+        )
+    )
+
+
+async def test_same_vacancy_within_the_window_is_one_call(
+    batch_settings, sample_candidate, sample_vacancy, _no_metrics
+):
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+
+    results = await _score_all(
+        batcher, sample_candidate, sample_vacancy, [_prepared(f"fp-{i}") for i in range(3)]
+    )
+
+    llm.score_multi.assert_awaited_once()
+    llm.score_candidate.assert_not_awaited()
+    # Each caller gets its own candidate's response and a share of the tokens
+    assert [r.score for r, _ in results] == [10, 20, 30]
+    assert [usage["total_tokens"] for _, usage in results] == [101, 100, 100]
+    lane, size, waits_ms = _no_metrics.call_args.args
+    assert (lane, size, len(waits_ms)) == ("event", 3, 3)
+
+
+async def test_a_full_batch_is_sent_without_waiting_for_the_window(
+    batch_settings, sample_candidate, sample_vacancy
+):
+    batch_settings.microbatch_window_ms = 60_000.0
+    batch_settings.microbatch_max_size = 2
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+
+    results = await asyncio.wait_for(
+        _score_all(batcher, sample_candidate, sample_vacancy, [_prepared("a"), _prepared("b")]),
+        timeout=1,
+    )
+
+    assert len(results) == 2
+    llm.score_multi.assert_awaited_once()
+
+
+async def test_the_token_budget_splits_batches(batch_settings, sample_candidate, sample_vacancy):
+    # Every addition would go over, so each scoring is sent on its own
+    batch_settings.microbatch_max_prompt_tokens = 1
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+
+    await _score_all(batcher, sample_candidate, sample_vacancy, [_prepared("a"), _prepared("b")])
+
+    assert llm.score_candidate.await_count == 2
+    llm.score_multi.assert_not_awaited()
+
+
+async def test_files_are_estimated_from_the_document_settings(
+    batch_settings, sample_candidate, sample_vacancy
+):
+    batch_settings.microbatch_max_prompt_tokens = 50_000
+    batch_settings.documents_pdf_default_pages = 100
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+    with_cv = [
+        PreparedPrompt(f"prompt {fp}", ("gs://bucket/cv.pdf",), fp, "vh-1") for fp in ("a", "b")
+    ]
+
+    await _score_all(batcher, sample_candidate, sample_vacancy, with_cv)
+
+    # Two 100-page files do not fit in one prompt
+    assert llm.score_candidate.await_count == 2
+
+
+async def test_other_vacancies_and_duplicates(batch_settings, sample_candidate, sample_vacancy):
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+
+    results = await _score_all(
+        batcher,
+        sample_candidate,
+        sample_vacancy,
+        [_prepared("a"), _prepared("a"), _prepared("b", vacancy_hash="vh-2")],
+    )
+
+    # The duplicate shares one scoring; the other vacancy is a batch of one
+    assert llm.score_candidate.await_count == 2
+    assert results[0] == results[1]
+
+
+async def test_a_failed_call_fails_every_scoring_in_the_batch(
+    batch_settings, sample_candidate, sample_vacancy
+):
+    llm = _llm()
+    llm.score_multi.side_effect = ValueError("Multi-scoring response has no score for ['C2']")
+    batcher = MicroBatcher(llm, batch_settings)
+
+    results = await asyncio.gather(
+        *(
+            batcher.score(
+                "ws-1", "event", sample_candidate, sample_vacancy, AtsDocuments(), _prepared(fp)
+            )
+            for fp in ("a", "b")
+        ),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+async def test_close_sends_open_batches(batch_settings, sample_candidate, sample_vacancy):
+    batch_settings.microbatch_window_ms = 60_000.0
+    llm = _llm()
+    batcher = MicroBatcher(llm, batch_settings)
+
+    pending = asyncio.ensure_future(
+        batcher.score(
+            "ws-1", "event", sample_candidate, sample_vacancy, AtsDocuments(), _prepared("a")
+        )
+    )
+    await asyncio.sleep(0)
+    await batcher.close()
+
+    assert (await pending)[0].score == 55
@@ -0,0 +1,137 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import (
+    NonRecordingSpan,
+    SpanContext,
+    Status,
+    StatusCode,
+    TraceFlags,
+    set_span_in_context,
+)
+
+from scoring.observability.sampling import TailRetentionProcessor, build_sampler
+from scoring.observability.setup import instrument_app
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.observability.sampling.record_trace_decision") as record:
+        yield record
+
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+
+def make_tracer(settings, exporter):
+    provider = TracerProvider(sampler=build_sampler(settings))
+    processor = SimpleSpanProcessor(exporter)
+    if settings.otel_tail_sampling:
+        processor = TailRetentionProcessor(processor, settings)
+    provider.add_span_processor(processor)
+    return provider.get_tracer(__name__)
+
+
+def remote_parent(sampled: bool):
+    flags = TraceFlags(TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT)
+    return set_span_in_context(
+        NonRecordingSpan(SpanContext(0xABC, 0xDEF, is_remote=True, trace_flags=flags))
+    )
+
+
+def test_children_follow_the_head_sampling_decision(settings, exporter):
+    settings.otel_trace_sample_ratio = 0.0
+    tracer = make_tracer(settings, exporter)
+
+    with tracer.start_as_current_span("request"), tracer.start_as_current_span("llm.generate"):
+        pass
+    with tracer.start_as_current_span("pubsub.push", context=remote_parent(sampled=True)):
+        pass
+
+    assert [s.name for s in exporter.get_finished_spans()] == ["pubsub.push"]
+
+
+def test_remote_parents_can_be_overruled_by_the_ratio(settings, exporter):
+    settings.otel_trace_sample_ratio = 0.0
+    settings.otel_trace_follow_remote_parent = False
+    tracer = make_tracer(settings, exporter)
+
+    with tracer.start_as_current_span("pubsub.push", context=remote_parent(sampled=True)):
+        pass
+
+    assert exporter.get_finished_spans() == ()
+
+
+def test_tail_sampling_retains_failed_and_slow_traces(settings, exporter, _no_metrics):
+    settings.otel_trace_sample_ratio = 0.0
+    settings.otel_tail_sampling = True
+    settings.otel_tail_latency_ms = 20
+    tracer = make_tracer(settings, exporter)
+
+    with tracer.start_as_current_span("fast"), tracer.start_as_current_span("fast.child"):
+        pass
+    with tracer.start_as_current_span("failed"):
+        with tracer.start_as_current_span("failed.child") as child:
+            child.set_status(Status(StatusCode.ERROR))
+    with tracer.start_as_current_span("slow", context=remote_parent(sampled=False)):
+        time.sleep(0.03)
+
+    spans = exporter.get_finished_spans()
+    assert [s.name for s in spans] == ["failed.child", "failed", "slow"]
+    assert all(s.context.trace_flags.sampled for s in spans)
+    assert [c.args[0] for c in _no_metrics.call_args_list] == ["dropped", "retained", "retained"]
+
+
+def test_tail_sampling_holds_a_bounded_number_of_traces(settings, exporter, _no_metrics):
+    settings.otel_trace_sample_ratio = 0.0
+    settings.otel_tail_sampling = True
+    settings.otel_tail_max_traces = 2
+    tracer = make_tracer(settings, exporter)
+
+    roots = [tracer.start_span(f"request-{i}") for i in range(3)]
+    for root in roots:
+        with tracer.start_as_current_span("child", context=set_span_in_context(root)) as child:
+            child.set_status(Status(StatusCode.ERROR))
+
+    for root in roots:
+        root.end()
+
+    # The first trace was evicted with its failed child, so its root ends alone
+    decisions = [c.args[0] for c in _no_metrics.call_args_list]
+    assert decisions == ["evicted", "dropped", "retained", "retained"]
+    assert [s.name for s in exporter.get_finished_spans()] == [
+        "child",
+        "request-1",
+        "child",
+        "request-2",
+    ]
+
+
+def test_instrumented_app_traces_requests_with_one_span(settings, exporter):
+    provider = TracerProvider(sampler=build_sampler(settings))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/scores")
+    async def scores():
+        return {"scores": []}
+
+    with TestClient(app) as client:
+        client.get("/scores")
+        instrument_app(app, settings, provider)
+        client.get("/health")
+        client.get("/scores")
+
+    assert [s.name for s in exporter.get_finished_spans()] == ["GET /scores"]
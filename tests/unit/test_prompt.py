@@ -1,5 +1,13 @@
 from scoring.models import ATSCandidate, AtsDocuments, ATSVacancy, ATSVacancyAddress
-from scoring.services.prompt import SYSTEM_PROMPT, build_user_prompt
+from scoring.services import prompt
+from scoring.services.prompt import (
+    SYSTEM_PROMPT,
+    build_multi_vacancy_prompt,
+    build_user_prompt,
+    render_vacancy_section,
+    system_prompt,
+    vacancy_content_hash,
+)
 
 
 def test_system_prompt_contains_scoring_rubric():
@@ -8,6 +16,11 @@ def test_system_prompt_contains_scoring_rubric():
     assert "English" in SYSTEM_PROMPT
 
 
+def test_system_prompt_asks_for_the_tier_reasoning_length():
+    assert "Provide 2-4 sentences" in SYSTEM_PROMPT
+    assert "Provide 1-2 sentences" in system_prompt("1-2")
+
+
 def test_build_user_prompt_includes_candidate_and_vacancy(
     sample_candidate, sample_vacancy, sample_ats_documents
 ):
@@ -73,3 +86,61 @@ def test_build_user_prompt_includes_location(sample_candidate, sample_ats_docume
 
     assert "Amsterdam" in prompt
     assert "Netherlands" in prompt
+
+
+def test_vacancy_content_hash_tracks_prompt_fields(sample_vacancy):
+    same = sample_vacancy.model_copy(update={"status": "closed", "id": "vac-2"})
+    edited = sample_vacancy.model_copy(update={"description": "Nieuwe omschrijving"})
+
+    assert vacancy_content_hash(same) == vacancy_content_hash(sample_vacancy)
+    assert vacancy_content_hash(edited) != vacancy_content_hash(sample_vacancy)
+
+
+def test_render_vacancy_section_is_memoized(sample_vacancy):
+    prompt._vacancy_sections.clear()
+
+    first = render_vacancy_section(sample_vacancy)
+    second = render_vacancy_section(sample_vacancy.model_copy())
+
+    assert second is first
+    assert prompt._vacancy_sections.hits == 1
+    assert "**Title**: Tandartsassistent" in first.text
+
+
+def test_build_user_prompt_same_with_precomputed_section(
+    sample_candidate, sample_vacancy, sample_ats_documents
+):
+    section = render_vacancy_section(sample_vacancy)
+
+    assert build_user_prompt(
+        sample_candidate, sample_vacancy, sample_ats_documents, section
+    ) == build_user_prompt(sample_candidate, sample_vacancy, sample_ats_documents)
+
+
+def test_vacancy_section_cache_is_bounded(monkeypatch):
+    cache = prompt.LRUCache(2)
+    monkeypatch.setattr(prompt, "_vacancy_sections", cache)
+
+    for i in range(3):
+        render_vacancy_section(ATSVacancy(title=f"Vacancy {i}"))
+
+    assert len(cache) == 2
+    assert vacancy_content_hash(ATSVacancy(title="Vacancy 0")) not in cache
+
+
+def test_multi_vacancy_prompt_has_the_candidate_once_and_every_vacancy(
+    sample_candidate, sample_vacancy, sample_ats_documents
+):
+    other = sample_vacancy.model_copy(update={"id": "vac-2", "title": "Mondhygiënist"})
+
+    text = build_multi_vacancy_prompt(
+        sample_candidate,
+        sample_ats_documents,
+        {"vac-1": render_vacancy_section(sample_vacancy), "vac-2": render_vacancy_section(other)},
+    )
+
+    assert text.count("Thomas van den Berg-Smit") == 1
+    assert text.index("**Vacancy ID**: vac-1") < text.index("**Title**: Tandartsassistent")
+    assert text.index("**Vacancy ID**: vac-2") < text.index("**Title**: Mondhygiënist")
+    assert "exactly one" in system_prompt(layout="vacancies")
+    assert "exactly one" not in SYSTEM_PROMPT
@@ -0,0 +1,99 @@
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from scoring.models import EventAttributes, EventPayload
+from scoring.services.publisher import EventPublisher
+
+
+def _attributes(event_type: str = "carv.score.calculated") -> EventAttributes:
+    return EventAttributes(
+        event_id=uuid4(),
+        event_type=event_type,
+        status="success",
+        workspace_id="ws-1",
+        timestamp=datetime.now(UTC),
+        source_service="carv-os-scoring",
+    )
+
+
+def _payload() -> EventPayload:
+    return EventPayload(
+        data={"application_id": "app-1", "candidate_id": "cand-1", "vacancy_id": "vac-1"}
+    )
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.topic_path.side_effect = lambda project, topic: f"projects/{project}/topics/{topic}"
+    client.publish.return_value.result.return_value = "msg-1"
+    return client
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [
+        ("none", ""),
+        ("workspace", "ws-1"),
+        ("application", "ws-1/app-1"),
+        ("vacancy", "ws-1/vac-1"),
+    ],
+)
+def test_ordering_key_strategies(client, settings, strategy, expected):
+    settings.publish_ordering_key = strategy
+    publisher = EventPublisher(client=client, settings=settings)
+
+    assert publisher.publish(_payload(), _attributes()) == "msg-1"
+    assert client.publish.call_args.kwargs["ordering_key"] == expected
+
+
+def test_ordering_key_override_per_event_type(client, settings):
+    settings.publish_ordering_key = "application"
+    settings.publish_ordering_key_overrides = {"carv.score.failed": "none"}
+    publisher = EventPublisher(client=client, settings=settings)
+
+    assert publisher.ordering_key(_payload(), _attributes("carv.score.failed")) == ""
+    assert publisher.ordering_key(_payload(), _attributes()) == "ws-1/app-1"
+
+
+def test_ordering_key_defaults_to_workspace_with_opt_in_overrides(client, settings):
+    settings.publish_ordering_key_overrides = {"carv.score.calculated": "application"}
+    publisher = EventPublisher(client=client, settings=settings)
+
+    assert publisher.ordering_key(_payload(), _attributes("carv.score.failed")) == "ws-1"
+    assert publisher.ordering_key(_payload(), _attributes()) == "ws-1/app-1"
+
+
+def test_ordering_key_falls_back_to_workspace(client, settings):
+    settings.publish_ordering_key = "vacancy"
+    publisher = EventPublisher(client=client, settings=settings)
+
+    payload = EventPayload(error={"message": "boom"})
+    assert publisher.ordering_key(payload, _attributes()) == "ws-1"
+
+
+def test_failed_publish_resumes_ordering_key(client, settings):
+    settings.publish_ordering_key = "application"
+    client.publish.return_value.result.side_effect = RuntimeError("publish failed")
+    publisher = EventPublisher(client=client, settings=settings)
+
+    with pytest.raises(RuntimeError, match="publish failed"):
+        publisher.publish(_payload(), _attributes())
+
+    client.resume_publish.assert_called_once_with(
+        "projects/test-project/topics/carv-events-dev", "ws-1/app-1"
+    )
+
+
+def test_failed_publish_without_ordering_key_does_not_resume(client, settings):
+    settings.publish_ordering_key = "none"
+    client.publish.side_effect = RuntimeError("publish failed")
+    publisher = EventPublisher(client=client, settings=settings)
+
+    with pytest.raises(RuntimeError):
+        publisher.publish(_payload(), _attributes())
+
+    client.resume_publish.assert_not_called()
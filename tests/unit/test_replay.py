@@ -0,0 +1,187 @@
+import base64
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from scoring.models import PubSubEnvelope, PubSubMessage, ReplayRequest
+from scoring.services.breaker import CircuitOpenError
+from scoring.services.replay import DeadLetterReplayer, PulledMessage
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.replay.record_dlq_replay"):
+        yield
+
+
+@pytest.fixture
+def replay_settings(settings):
+    settings.dlq_replay_batch_size = 2
+    settings.dlq_replay_rate_per_s = 1000.0
+    return settings
+
+
+def _message(
+    n: int,
+    workspace_id: str = "ws-1",
+    event_type: str = "uats.application.upserted",
+    event_id: str | None = None,
+) -> PulledMessage:
+    attributes = {
+        "event_id": event_id or str(uuid4()),
+        "event_type": event_type,
+        "status": "success",
+        "workspace_id": workspace_id,
+        "timestamp": datetime(2025, 1, 1, 12, tzinfo=UTC).isoformat(),
+        "source_service": "uats",
+    }
+    data = base64.b64encode(json.dumps({"data": None}).encode()).decode()
+    return PulledMessage(
+        ack_id=f"ack-{n}",
+        envelope=PubSubEnvelope(
+            message=PubSubMessage(data=data, attributes=attributes, messageId=f"msg-{n}")
+        ),
+    )
+
+
+class FakeSubscription:
+    """A DLQ that redelivers whatever is not acked, like the real subscription."""
+
+    def __init__(self, messages: list[PulledMessage]) -> None:
+        self.messages = list(messages)
+        self.acked: list[str] = []
+        self.released: list[str] = []
+        self._cursor = 0
+
+    async def pull(self, max_messages: int) -> list[PulledMessage]:
+        pending = [m for m in self.messages if m.ack_id not in self.acked]
+        if not pending:
+            return []
+        batch = [pending[(self._cursor + i) % len(pending)] for i in range(max_messages)]
+        self._cursor += max_messages
+        return list({m.ack_id: m for m in batch}.values())
+
+    async def ack(self, ack_ids: list[str]) -> None:
+        self.acked.extend(ack_ids)
+
+    async def lease(self, ack_ids: list[str], seconds: int) -> None:
+        if seconds == 0:
+            self.released.extend(ack_ids)
+
+
+def _replayer(subscription, settings, handler=None, repo=None):
+    if repo is None:
+        repo = AsyncMock()
+        repo.is_event_replayed.return_value = False
+    handler = handler or AsyncMock(return_value="ok")
+    return DeadLetterReplayer(subscription, handler, repo, settings), handler, repo
+
+
+async def test_replays_and_acks_every_message(replay_settings):
+    subscription = FakeSubscription([_message(i) for i in range(5)])
+    replayer, handler, repo = _replayer(subscription, replay_settings)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest()))
+
+    assert run.status == "completed"
+    assert run.replayed == 5
+    assert handler.await_count == 5
+    assert sorted(subscription.acked) == [f"ack-{i}" for i in range(5)]
+    assert repo.mark_event_replayed.await_count == 5
+    # Checkpointed at the start, after each batch and at the end
+    assert repo.save_replay_run.await_count >= 4
+
+
+async def test_filtered_out_messages_stay_in_the_dlq(replay_settings):
+    subscription = FakeSubscription(
+        [_message(0, workspace_id="ws-1"), _message(1, workspace_id="ws-2"), _message(2)]
+    )
+    replayer, handler, _ = _replayer(subscription, replay_settings)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest(workspace_id="ws-1")))
+
+    assert run.replayed == 2
+    assert run.filtered_out == 1
+    assert "ack-1" not in subscription.acked
+    assert "ack-1" in subscription.released
+
+
+async def test_filters_by_event_type_and_time_range(replay_settings):
+    subscription = FakeSubscription(
+        [_message(0), _message(1, event_type="uats.vacancy.upserted")]
+    )
+    replayer, _, _ = _replayer(subscription, replay_settings)
+
+    run = await replayer.run(
+        replayer.new_run(
+            ReplayRequest(
+                event_types=["uats.vacancy.upserted"],
+                since=datetime(2025, 1, 1, tzinfo=UTC),
+                until=datetime(2025, 1, 2, tzinfo=UTC),
+            )
+        )
+    )
+
+    assert (run.replayed, run.filtered_out) == (1, 1)
+    assert subscription.acked == ["ack-1"]
+
+
+async def test_already_replayed_events_are_acked_without_running(replay_settings):
+    replayed_id = str(uuid4())
+    subscription = FakeSubscription([_message(0, event_id=replayed_id), _message(1)])
+    repo = AsyncMock()
+    repo.is_event_replayed.side_effect = lambda key: key == replayed_id
+    replayer, handler, _ = _replayer(subscription, replay_settings, repo=repo)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest()))
+
+    assert (run.replayed, run.duplicates) == (1, 1)
+    assert handler.await_count == 1
+    assert sorted(subscription.acked) == ["ack-0", "ack-1"]
+
+
+async def test_failed_messages_are_not_acked(replay_settings):
+    subscription = FakeSubscription([_message(0), _message(1)])
+
+    async def handler(envelope):
+        if envelope.message.message_id == "msg-0":
+            raise RuntimeError("still broken")
+        return "ok"
+
+    replayer, _, _ = _replayer(subscription, replay_settings, handler=handler)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest()))
+
+    assert run.status == "completed"
+    assert (run.replayed, run.failed) == (1, 1)
+    assert run.last_error == "RuntimeError: still broken"
+    assert subscription.acked == ["ack-1"]
+    assert "ack-0" in subscription.released
+
+
+async def test_stops_after_max_messages(replay_settings):
+    subscription = FakeSubscription([_message(i) for i in range(6)])
+    replayer, handler, _ = _replayer(subscription, replay_settings)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest(max_messages=3)))
+
+    assert run.replayed == 3
+    assert handler.await_count == 3
+    assert len(subscription.acked) == 3
+
+
+async def test_open_circuit_ends_the_run(replay_settings):
+    subscription = FakeSubscription([_message(i) for i in range(4)])
+    handler = AsyncMock(side_effect=CircuitOpenError("gemini", 30))
+    replayer, _, _ = _replayer(subscription, replay_settings, handler=handler)
+
+    run = await replayer.run(replayer.new_run(ReplayRequest()))
+
+    assert run.status == "failed"
+    assert "gemini circuit is open" in run.last_error
+    assert handler.await_count <= 2
+    assert subscription.acked == []
+    assert set(subscription.released) >= {"ack-0", "ack-1"}
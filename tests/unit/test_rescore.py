@@ -0,0 +1,97 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from scoring.services.rescore import RescoreWorker
+
+
+@pytest.fixture
+def worker_settings(settings):
+    settings.stale_rescore_debounce_s = 0.05
+    settings.stale_rescore_rate_per_s = 1000.0
+    settings.stale_rescore_max_pending = 2
+    return settings
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.rescore.record_rescore"), patch(
+        "scoring.services.rescore.record_rescore_enqueued"
+    ):
+        yield
+
+
+def _existing(application_id: str) -> MagicMock:
+    return MagicMock(
+        stale=True,
+        candidate_id="cand-1",
+        vacancy_id="vac-1",
+        application_id=application_id,
+        file_uris=["gs://bucket/resume.pdf"],
+    )
+
+
+async def _drain(worker: RescoreWorker, seconds: float = 0.2) -> None:
+    task = asyncio.create_task(worker.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+
+
+async def test_repeated_changes_collapse_into_one_rescore(worker_settings):
+    repo = AsyncMock()
+    repo.get_scoring_result.side_effect = lambda ws, app_id: _existing(app_id)
+    service = AsyncMock()
+    worker = RescoreWorker(lambda: service, lambda: repo, worker_settings)
+
+    for _ in range(5):
+        worker.enqueue("ws-1", "app-1")
+    worker.enqueue("ws-1", "app-2")
+    assert worker.pending == 2
+
+    await _drain(worker)
+
+    assert service.process.await_count == 2
+    assert worker.pending == 0
+
+
+async def test_rescore_uses_the_stored_files(worker_settings):
+    existing = _existing("app-1")
+    repo = AsyncMock()
+    repo.get_scoring_result.return_value = existing
+    service = AsyncMock()
+    service.process.return_value = existing
+    worker = RescoreWorker(lambda: service, lambda: repo, worker_settings)
+
+    worker.enqueue("ws-1", "app-1")
+    await _drain(worker)
+
+    kwargs = service.process.call_args.kwargs
+    assert kwargs["previous"] is existing
+    assert kwargs["file_uris"] == ["gs://bucket/resume.pdf"]
+
+
+async def test_queue_is_bounded(worker_settings):
+    worker = RescoreWorker(AsyncMock, AsyncMock, worker_settings)
+
+    assert worker.enqueue("ws-1", "app-1")
+    assert worker.enqueue("ws-1", "app-2")
+    assert not worker.enqueue("ws-1", "app-3")
+    # Collapsing into an already queued application is always accepted
+    assert worker.enqueue("ws-1", "app-1")
+
+
+async def test_rescores_are_rate_limited(worker_settings):
+    worker_settings.stale_rescore_debounce_s = 0.0
+    worker_settings.stale_rescore_rate_per_s = 10.0
+    worker_settings.stale_rescore_max_pending = 100
+    repo = AsyncMock()
+    repo.get_scoring_result.side_effect = lambda ws, app_id: _existing(app_id)
+    service = AsyncMock()
+    worker = RescoreWorker(lambda: service, lambda: repo, worker_settings)
+
+    for i in range(10):
+        worker.enqueue("ws-1", f"app-{i}")
+    await _drain(worker, 0.25)
+
+    assert 2 <= service.process.await_count <= 4
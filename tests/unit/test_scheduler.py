@@ -0,0 +1,252 @@
+import asyncio
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from scoring.services.scheduler import LLMScheduler, SchedulerQueueFullError, llm_capacity
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with (
+        patch("scoring.services.scheduler.record_llm_queue_wait"),
+        patch("scoring.services.scheduler.record_llm_queue_depth"),
+        patch("scoring.services.scheduler.record_llm_granted"),
+        patch("scoring.services.scheduler.record_llm_rejected"),
+    ):
+        yield
+
+
+async def _grant_order(
+    scheduler: LLMScheduler, waiters: dict[str, int], workspace_id: str = "ws-1"
+) -> list[str]:
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("interactive", "ws-holder"):
+            await release.wait()
+
+    async def wait(lane):
+        async with scheduler.slot(lane, workspace_id):
+            order.append(lane)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(wait(lane)) for lane, n in waiters.items() for _ in range(n)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+async def test_slots_are_shared_by_lane_weight(settings):
+    settings.llm_max_concurrency = 1
+    scheduler = LLMScheduler(settings)
+
+    order = await _grant_order(scheduler, {"backfill": 20, "event": 20, "interactive": 20})
+
+    assert Counter(order[:10]) == {"interactive": 6, "event": 3, "backfill": 1}
+
+
+async def test_low_weight_lane_is_not_starved(settings):
+    settings.llm_max_concurrency = 1
+    settings.llm_lane_weights = {"interactive": 100.0, "event": 1.0, "backfill": 1.0}
+    settings.llm_workspace_max_queued = 1000
+    scheduler = LLMScheduler(settings)
+
+    order = await _grant_order(scheduler, {"interactive": 300, "backfill": 3})
+
+    assert order.index("backfill") < 110
+
+
+async def test_concurrency_is_bounded(settings):
+    settings.llm_max_concurrency = 2
+    scheduler = LLMScheduler(settings)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with scheduler.slot("event", "ws-1"):
+            peak = max(peak, scheduler.in_use)
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    assert peak == 2
+    assert scheduler.in_use == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue(settings):
+    settings.llm_max_concurrency = 1
+    scheduler = LLMScheduler(settings)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("event", "ws-1"):
+            await release.wait()
+
+    async def wait():
+        async with scheduler.slot("backfill", "ws-1"):
+            pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait())
+    await asyncio.sleep(0)
+    assert scheduler.queued("backfill") == 1
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    await holder
+
+    assert scheduler.queued("backfill") == 0
+    assert scheduler.in_use == 0
+
+
+async def _workspace_grant_order(
+    scheduler: LLMScheduler, waiters: list[tuple[str, int]], hold_for: float = 0
+) -> list[str]:
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("event", "ws-holder"):
+            await release.wait()
+
+    async def wait(workspace_id):
+        async with scheduler.slot("backfill", workspace_id):
+            order.append(workspace_id)
+            await asyncio.sleep(hold_for)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(wait(ws)) for ws, n in waiters for _ in range(n)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+async def test_busy_workspace_does_not_starve_others(settings):
+    settings.llm_max_concurrency = 1
+    scheduler = LLMScheduler(settings)
+
+    # The import queued first, but the small workspace alternates with it
+    order = await _workspace_grant_order(scheduler, [("ws-import", 50), ("ws-small", 3)])
+
+    assert order.index("ws-small") <= 1
+    assert order[:6].count("ws-small") == 3
+
+
+async def test_slots_are_shared_by_workspace_weight(settings):
+    settings.llm_max_concurrency = 1
+    settings.llm_workspace_weights = {"ws-gold": 3.0}
+    scheduler = LLMScheduler(settings)
+
+    order = await _workspace_grant_order(scheduler, [("ws-gold", 20), ("ws-basic", 20)])
+
+    assert Counter(order[:8]) == {"ws-gold": 6, "ws-basic": 2}
+
+
+async def test_idle_workspaces_are_forgotten(settings):
+    settings.llm_max_concurrency = 1
+    scheduler = LLMScheduler(settings)
+
+    await _workspace_grant_order(scheduler, [(f"ws-{i}", 2) for i in range(20)])
+
+    assert all(not queue.tenants for queue in scheduler._lanes.values())
+
+
+async def test_returning_workspace_starts_level_with_the_others(settings):
+    settings.llm_max_concurrency = 1
+    settings.llm_workspace_max_queued = 100
+    scheduler = LLMScheduler(settings)
+    # ws-small ran a lot earlier and left; its old pass must not hold it back
+    await _workspace_grant_order(scheduler, [("ws-small", 30)])
+    assert "ws-small" not in scheduler._lanes["backfill"].tenants
+
+    order = await _workspace_grant_order(scheduler, [("ws-import", 40), ("ws-small", 3)])
+
+    assert order[:6].count("ws-small") == 3
+
+
+async def test_workspace_cap_bounds_calls_in_flight(settings):
+    settings.llm_max_concurrency = 4
+    settings.llm_workspace_caps = {"ws-import": 1}
+    scheduler = LLMScheduler(settings)
+    peak = 0
+
+    async def call(workspace_id):
+        nonlocal peak
+        async with scheduler.slot("backfill", workspace_id):
+            if workspace_id == "ws-import":
+                peak = max(peak, scheduler.active("ws-import"))
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(call("ws-import") for _ in range(5)), *(call("ws-2") for _ in range(5)))
+
+    assert peak == 1
+    assert scheduler.in_use == 0
+
+
+async def test_capped_workspace_does_not_block_others(settings):
+    settings.llm_max_concurrency = 2
+    settings.llm_workspace_default_cap = 1
+    scheduler = LLMScheduler(settings)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("event", "ws-1"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert scheduler.queued("event", "ws-1") == 1
+
+    # A free slot still goes to another workspace
+    async with scheduler.slot("event", "ws-2"):
+        assert scheduler.in_use == 2
+
+    release.set()
+    await asyncio.gather(holder, queued)
+    assert scheduler.in_use == 0
+
+
+async def test_full_workspace_queue_is_refused(settings):
+    settings.llm_max_concurrency = 1
+    settings.llm_workspace_max_queued = 2
+    scheduler = LLMScheduler(settings)
+    release = asyncio.Event()
+
+    async def hold(workspace_id):
+        async with scheduler.slot("event", workspace_id):
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold("ws-1")) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(SchedulerQueueFullError):
+        async with scheduler.slot("event", "ws-1"):
+            pass
+    # Other workspaces still queue
+    tasks.append(asyncio.create_task(hold("ws-2")))
+    await asyncio.sleep(0)
+    assert scheduler.queued("event", "ws-2") == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+def test_capacity_stays_below_the_request_concurrency(settings):
+    assert llm_capacity(settings) == 7
+    settings.instance_request_concurrency = 1
+    assert llm_capacity(settings) == 1
+    settings.llm_max_concurrency = 12
+    assert llm_capacity(settings) == 12
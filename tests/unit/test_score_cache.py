@@ -0,0 +1,72 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from scoring.models import CachedScore, LLMScoringResponse
+from scoring.services.lru import LRUCache
+from scoring.services.score_cache import ScoreCache
+
+
+def _entry(fingerprint: str = "fp-1", expires_in: timedelta = timedelta(days=1)) -> CachedScore:
+    now = datetime.now(UTC)
+    return CachedScore(
+        fingerprint=fingerprint,
+        score=80,
+        reasoning="Strong fit.",
+        model="gemini-2.5-flash",
+        created_at=now,
+        expires_at=now + expires_in,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.score_cache.record_score_cache_lookup"):
+        yield
+
+
+async def test_get_from_store_fills_front_cache(settings):
+    repo = AsyncMock()
+    repo.get_cached_score.return_value = _entry()
+    cache = ScoreCache(repo=repo, front=LRUCache(8), settings=settings)
+
+    assert (await cache.get("ws-1", "fp-1")).score == 80
+    assert (await cache.get("ws-1", "fp-1")).score == 80
+
+    repo.get_cached_score.assert_awaited_once_with("ws-1", "fp-1")
+
+
+async def test_get_ignores_expired_entries(settings):
+    repo = AsyncMock()
+    repo.get_cached_score.return_value = _entry(expires_in=timedelta(seconds=-1))
+    cache = ScoreCache(repo=repo, front=LRUCache(8), settings=settings)
+
+    assert await cache.get("ws-1", "fp-1") is None
+
+
+async def test_store_errors_are_misses(settings):
+    repo = AsyncMock()
+    repo.get_cached_score.side_effect = RuntimeError("unavailable")
+    repo.save_cached_score.side_effect = RuntimeError("unavailable")
+    cache = ScoreCache(repo=repo, front=LRUCache(8), settings=settings)
+
+    assert await cache.get("ws-1", "fp-1") is None
+    await cache.put(
+        "ws-1", "fp-1", LLMScoringResponse(score=55, reasoning="Ok."), "gemini-2.5-flash", {}
+    )
+
+    # Still served from the front cache for this instance
+    assert (await cache.get("ws-1", "fp-1")).score == 55
+
+
+async def test_entries_are_scoped_by_workspace(settings):
+    repo = AsyncMock()
+    repo.get_cached_score.return_value = None
+    cache = ScoreCache(repo=repo, front=LRUCache(8), settings=settings)
+
+    await cache.put(
+        "ws-1", "fp-1", LLMScoringResponse(score=55, reasoning="Ok."), "gemini-2.5-flash", {}
+    )
+
+    assert await cache.get("ws-2", "fp-1") is None
@@ -1,10 +1,12 @@
+import asyncio
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from anyio.from_thread import start_blocking_portal
 from fastapi.testclient import TestClient
 
-from scoring.models import LLMScoringResponse, ScoringResult
+from scoring.models import AtsDocuments, DailyTokenUsage, LLMScoringResponse, ScoringResult
 
 
 def _make_scoring_result(**overrides) -> ScoringResult:
@@ -31,6 +33,14 @@ def client(settings):
     app.state.settings = settings
     app.state.firestore_client = AsyncMock()
     app.state.publisher_client = MagicMock()
+    app.state.llm_backend = AsyncMock()
+    app.state.score_cache_front = None
+    app.state.rescore_worker = None
+    app.state.job_executor = None
+    app.state.completion_broker = None
+    app.state.llm_scheduler = None
+    app.state.breakers = None
+    app.state.dlq_replay_task = None
 
     return TestClient(app, raise_server_exceptions=False)
 
@@ -107,6 +117,23 @@ def test_list_scores_with_filters(client):
     )
 
 
+def test_get_usage_reads_one_entry_per_day(client):
+    mock_repo = AsyncMock()
+    mock_repo.get_token_usage.return_value = [
+        DailyTokenUsage(workspace_id="ws-1", date="2025-01-02", scorings=3, total_tokens=4500)
+    ]
+
+    with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo):
+        response = client.get("/usage?workspace_id=ws-1&days=3")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+    assert response.json()["days"][0]["total_tokens"] == 4500
+    workspace_id, days = mock_repo.get_token_usage.await_args.args
+    assert workspace_id == "ws-1"
+    assert len(days) == 3 and days == sorted(days, reverse=True)
+
+
 def test_list_scores_missing_workspace_id(client):
     response = client.get("/scores")
     assert response.status_code == 422
@@ -120,10 +147,11 @@ def test_trigger_score(client, settings):
     mock_repo.save_scoring_result.return_value = "app-1"
     mock_repo.get_candidate.return_value = MagicMock()
     mock_repo.get_vacancy.return_value = MagicMock()
-    mock_repo.get_ats_documents.return_value = MagicMock()
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
 
     mock_llm = AsyncMock()
     mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
     mock_llm.score_candidate.return_value = (
         LLMScoringResponse(score=72, reasoning="Good fit overall."),
         {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
@@ -169,6 +197,7 @@ def test_trigger_score_requires_application_id(client):
 def test_trigger_score_failure(client):
     mock_repo = AsyncMock()
     mock_repo.get_candidate.side_effect = ValueError("Not found")
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
 
     with patch(
         "scoring.api.dependencies.FirestoreRepository", return_value=mock_repo
@@ -190,6 +219,86 @@ def test_trigger_score_failure(client):
     assert response.status_code == 500
 
 
+def test_trigger_score_workspace_queue_full(client):
+    from scoring.services.scheduler import SchedulerQueueFullError
+
+    service = AsyncMock()
+    service.process.side_effect = SchedulerQueueFullError("ws-1 has 200 LLM calls queued")
+
+    with patch("scoring.api.dependencies.ScoringService", return_value=service):
+        response = client.post(
+            "/score",
+            json={
+                "workspace_id": "ws-1",
+                "candidate_reference_id": "cand-1",
+                "vacancy_reference_id": "vac-1",
+                "application_id": "app-1",
+            },
+        )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_trigger_score_over_token_budget(client):
+    from scoring.services.usage import TokenBudgetExceededError
+
+    service = AsyncMock()
+    service.process.side_effect = TokenBudgetExceededError("ws-1", 3600.2)
+
+    with patch("scoring.api.dependencies.ScoringService", return_value=service):
+        response = client.post(
+            "/score",
+            json={
+                "workspace_id": "ws-1",
+                "candidate_reference_id": "cand-1",
+                "vacancy_reference_id": "vac-1",
+                "application_id": "app-1",
+            },
+        )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3601"
+
+
+# --- POST /score-candidate ---
+
+
+def test_score_candidate_returns_a_result_per_application(client):
+    service = AsyncMock()
+    service.process_candidate.return_value = [
+        _make_scoring_result(application_id="app-1", vacancy_id="vac-1"),
+        _make_scoring_result(application_id="app-2", vacancy_id="vac-2", score=40),
+    ]
+
+    with patch("scoring.api.dependencies.ScoringService", return_value=service):
+        response = client.post(
+            "/score-candidate",
+            json={
+                "workspace_id": "ws-1",
+                "candidate_reference_id": "cand-1",
+                "applications": [
+                    {"application_id": "app-1", "vacancy_reference_id": "vac-1"},
+                    {"application_id": "app-2", "vacancy_reference_id": "vac-2"},
+                ],
+            },
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert [r["score"] for r in body["results"]] == [72, 40]
+    assert service.process_candidate.call_args.kwargs["lane"] == "interactive"
+
+
+def test_score_candidate_requires_applications(client):
+    response = client.post(
+        "/score-candidate",
+        json={"workspace_id": "ws-1", "candidate_reference_id": "cand-1", "applications": []},
+    )
+    assert response.status_code == 422
+
+
 # --- POST /re-score/{application_id} ---
 
 
@@ -200,10 +309,11 @@ def test_re_score_success(client, settings):
     mock_repo.save_scoring_result.return_value = "app-1"
     mock_repo.get_candidate.return_value = MagicMock()
     mock_repo.get_vacancy.return_value = MagicMock()
-    mock_repo.get_ats_documents.return_value = MagicMock()
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
 
     mock_llm = AsyncMock()
     mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
     mock_llm.score_candidate.return_value = (
         LLMScoringResponse(score=80, reasoning="Better fit on re-evaluation."),
         {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
@@ -238,3 +348,109 @@ def test_re_score_not_found(client):
         response = client.post("/re-score/app-1?workspace_id=ws-1")
 
     assert response.status_code == 404
+
+
+@pytest.mark.parametrize("force, llm_calls", [(False, 0), (True, 1)])
+def test_re_score_skips_unchanged_inputs_unless_forced(client, settings, force, llm_calls):
+    existing = _make_scoring_result(input_fingerprint="fp-1", file_uris=["gs://bucket/cv.pdf"])
+    mock_repo = AsyncMock()
+    mock_repo.get_scoring_result.return_value = existing
+    mock_repo.get_candidate.return_value = MagicMock()
+    mock_repo.get_vacancy.return_value = MagicMock()
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
+
+    mock_llm = AsyncMock()
+    mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
+    mock_llm.score_candidate.return_value = (
+        LLMScoringResponse(score=80, reasoning="Better fit on re-evaluation."),
+        {},
+    )
+
+    with patch(
+        "scoring.api.dependencies.FirestoreRepository", return_value=mock_repo
+    ), patch("scoring.api.dependencies.LLMService", return_value=mock_llm), patch(
+        "scoring.api.dependencies.EventPublisher", return_value=MagicMock()
+    ), patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        response = client.post(f"/re-score/app-1?workspace_id=ws-1&force={str(force).lower()}")
+
+    assert response.status_code == 200
+    assert response.json()["score"] == (80 if force else 72)
+    assert mock_llm.score_candidate.await_count == llm_calls
+    # The files the stored result was scored with are scored again, and kept
+    assert mock_llm.prepare.call_args.kwargs["file_uris"] == ["gs://bucket/cv.pdf"]
+    assert response.json()["file_uris"] == ["gs://bucket/cv.pdf"]
+
+
+# --- Async jobs ---
+
+
+def test_trigger_score_async_returns_202_and_job_can_be_polled(client, settings):
+    from scoring.services.jobs import JobExecutor
+
+    jobs = {}
+    mock_repo = AsyncMock()
+    mock_repo.save_job.side_effect = lambda job: jobs.__setitem__(job.job_id, job.model_copy())
+    mock_repo.get_job.side_effect = lambda ws, job_id: jobs[job_id]
+    mock_repo.get_candidate.return_value = MagicMock()
+    mock_repo.get_vacancy.return_value = MagicMock()
+    mock_repo.get_ats_documents_and_files.return_value = (AtsDocuments(), [])
+
+    mock_llm = AsyncMock()
+    mock_llm._settings = settings
+    mock_llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
+    mock_llm.score_candidate.return_value = (
+        LLMScoringResponse(score=72, reasoning="Good fit overall."),
+        {},
+    )
+    client.app.state.job_executor = JobExecutor(lambda: mock_repo, settings)
+
+    # One event loop across requests, as in a server, so the job runs on
+    # after the response has been sent
+    with start_blocking_portal() as portal, patch.object(client, "portal", portal), patch(
+        "scoring.api.dependencies.FirestoreRepository", return_value=mock_repo
+    ), patch("scoring.api.dependencies.LLMService", return_value=mock_llm), patch(
+        "scoring.api.dependencies.EventPublisher", return_value=MagicMock()
+    ), patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.jobs.record_job"
+    ):
+        response = client.post(
+            "/score?async=true",
+            json={
+                "workspace_id": "ws-1",
+                "candidate_reference_id": "cand-1",
+                "vacancy_reference_id": "vac-1",
+                "application_id": "app-1",
+            },
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.headers["location"] == f"/jobs/{job_id}?workspace_id=ws-1"
+
+        for _ in range(100):
+            if not client.app.state.job_executor.open_jobs:
+                break
+            portal.call(asyncio.sleep, 0.01)
+        poll = client.get(f"/jobs/{job_id}?workspace_id=ws-1")
+
+    assert poll.status_code == 200
+    assert poll.json()["status"] == "succeeded"
+    assert poll.json()["result"]["score"] == 72
+
+
+def test_get_job_not_found(client):
+    mock_repo = AsyncMock()
+    mock_repo.get_job.side_effect = ValueError("Not found")
+
+    with patch("scoring.api.dependencies.FirestoreRepository", return_value=mock_repo):
+        response = client.get("/jobs/job-1?workspace_id=ws-1")
+
+    assert response.status_code == 404
+
+
+def test_score_events_unavailable_without_broker(client):
+    response = client.get("/score-events?workspace_id=ws-1")
+
+    assert response.status_code == 503
@@ -1,9 +1,16 @@
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from scoring.models import LLMScoringResponse, ScoringResult
+from scoring.models import (
+    CandidateApplication,
+    DocumentFile,
+    LLMScoringResponse,
+    ScoringResult,
+)
 from scoring.services.scoring import ScoringService
+from scoring.services.usage import TokenBudgetExceededError
 
 
 @pytest.fixture
@@ -11,7 +18,7 @@ def mock_repo(sample_candidate, sample_vacancy, sample_ats_documents):
     repo = AsyncMock()
     repo.get_candidate.return_value = sample_candidate
     repo.get_vacancy.return_value = sample_vacancy
-    repo.get_ats_documents.return_value = sample_ats_documents
+    repo.get_ats_documents_and_files.return_value = (sample_ats_documents, [])
     repo.save_scoring_result.return_value = "doc-123"
     return repo
 
@@ -20,6 +27,7 @@ def mock_repo(sample_candidate, sample_vacancy, sample_ats_documents):
 def mock_llm(settings):
     llm = AsyncMock()
     llm._settings = settings
+    llm.prepare = MagicMock(return_value=MagicMock(fingerprint="fp-1"))
     llm.score_candidate.return_value = (
         LLMScoringResponse(score=65, reasoning="Moderate fit due to field mismatch."),
         {"prompt_tokens": 500, "completion_tokens": 50, "total_tokens": 550},
@@ -55,7 +63,7 @@ async def test_process_success(mock_repo, mock_llm, mock_publisher, settings):
 
     mock_repo.get_candidate.assert_awaited_once_with("ws-1", "cand-1")
     mock_repo.get_vacancy.assert_awaited_once_with("ws-1", "vac-1")
-    mock_repo.get_ats_documents.assert_awaited_once_with("ws-1", "cand-1")
+    mock_repo.get_ats_documents_and_files.assert_awaited_once_with("ws-1", "cand-1")
     mock_llm.score_candidate.assert_awaited_once()
     mock_repo.save_scoring_result.assert_awaited_once()
     mock_publisher.publish.assert_called_once()
@@ -119,3 +127,331 @@ async def test_process_llm_error(mock_repo, mock_llm, mock_publisher, settings):
 
     mock_repo.save_scoring_result.assert_not_awaited()
     mock_publisher.publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_returns_cached_score(mock_repo, mock_llm, mock_publisher, settings):
+    score_cache = AsyncMock()
+    score_cache.get.return_value = MagicMock(score=81, reasoning="Seen before.")
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        score_cache=score_cache,
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        result = await service.process("app-2", "cand-1", "vac-1", "ws-1")
+
+    assert result.cache_hit is True
+    assert result.score == 81
+    assert result.tokens == {}
+    score_cache.get.assert_awaited_once_with("ws-1", "fp-1")
+    mock_llm.score_candidate.assert_not_awaited()
+    score_cache.put.assert_not_awaited()
+    mock_repo.save_scoring_result.assert_awaited_once()
+    mock_publisher.publish.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_process_stores_score_on_cache_miss(mock_repo, mock_llm, mock_publisher, settings):
+    prepared = MagicMock(fingerprint="fp-1")
+    mock_llm.prepare = MagicMock(return_value=prepared)
+    score_cache = AsyncMock()
+    score_cache.get.return_value = None
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        score_cache=score_cache,
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        result = await service.process("app-1", "cand-1", "vac-1", "ws-1")
+
+    assert result.cache_hit is False
+    assert mock_llm.score_candidate.call_args.kwargs["prepared"] is prepared
+    score_cache.put.assert_awaited_once()
+    assert score_cache.put.call_args.args[:2] == ("ws-1", "fp-1")
+
+
+@pytest.mark.asyncio
+async def test_process_returns_previous_result_when_inputs_unchanged(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    previous = ScoringResult(
+        application_id="app-1",
+        candidate_id="cand-1",
+        vacancy_id="vac-1",
+        workspace_id="ws-1",
+        score=70,
+        reasoning="Earlier run.",
+        model=settings.gemini_model,
+        latency_ms=1200,
+        input_fingerprint="fp-1",
+    )
+    service = ScoringService(
+        repo=mock_repo, llm=mock_llm, publisher=mock_publisher, settings=settings
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        unchanged = await service.process("app-1", "cand-1", "vac-1", "ws-1", previous=previous)
+        forced = await service.process(
+            "app-1", "cand-1", "vac-1", "ws-1", previous=previous, force=True
+        )
+
+    assert unchanged is previous
+    assert forced.score == 65
+    assert forced.input_fingerprint == "fp-1"
+    mock_llm.score_candidate.assert_awaited_once()
+    mock_repo.save_scoring_result.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_stale_result_is_no_longer_stale(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    previous = ScoringResult(
+        application_id="app-1",
+        candidate_id="cand-1",
+        vacancy_id="vac-1",
+        workspace_id="ws-1",
+        score=70,
+        reasoning="Earlier run.",
+        model=settings.gemini_model,
+        latency_ms=1200,
+        input_fingerprint="fp-1",
+        stale=True,
+        stale_since=datetime.now(UTC),
+    )
+    service = ScoringService(
+        repo=mock_repo, llm=mock_llm, publisher=mock_publisher, settings=settings
+    )
+
+    unchanged = await service.process("app-1", "cand-1", "vac-1", "ws-1", previous=previous)
+
+    assert unchanged is previous
+    assert (unchanged.stale, unchanged.stale_since) == (False, None)
+    mock_repo.clear_stale.assert_awaited_once_with("ws-1", "app-1")
+    mock_llm.score_candidate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_re_score_compares_with_the_tier_previously_used(
+    mock_repo, mock_llm, mock_publisher, settings, sample_ats_documents
+):
+    settings.gemini_lane_tiers = {"event": "fast"}
+    mock_repo.get_ats_documents_and_files.return_value = (
+        sample_ats_documents,
+        [DocumentFile(uri="gs://bucket/old.pdf")],
+    )
+    mock_llm.prepare.side_effect = lambda *args, file_uris, tier: MagicMock(
+        fingerprint=f"{tier}:{','.join(file_uris)}", tier=tier
+    )
+    service = ScoringService(
+        repo=mock_repo, llm=mock_llm, publisher=mock_publisher, settings=settings
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        # Scored from a push event, then re-scored from /re-score
+        previous = await service.process(
+            "app-1", "cand-1", "vac-1", "ws-1", file_uris=["gs://bucket/diploma.pdf"]
+        )
+        unchanged = await service.process(
+            "app-1",
+            "cand-1",
+            "vac-1",
+            "ws-1",
+            file_uris=previous.file_uris,
+            previous=previous,
+            lane="interactive",
+        )
+
+    assert previous.file_uris == ["gs://bucket/diploma.pdf"]
+    assert unchanged is previous
+    mock_llm.score_candidate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_process_publishes_completion(mock_repo, mock_llm, mock_publisher, settings):
+    completions = MagicMock()
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        completions=completions,
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        result = await service.process("app-1", "cand-1", "vac-1", "ws-1")
+
+    completions.publish.assert_called_once_with(result)
+
+
+@pytest.mark.asyncio
+async def test_process_uses_the_workspace_tier(mock_repo, mock_llm, mock_publisher, settings):
+    settings.gemini_workspace_tiers = {"ws-1": "fast"}
+    service = ScoringService(
+        repo=mock_repo, llm=mock_llm, publisher=mock_publisher, settings=settings
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        result = await service.process("app-1", "cand-1", "vac-1", "ws-1", lane="interactive")
+        await service.process("app-2", "cand-1", "vac-1", "ws-2", tier="thorough")
+
+    assert result.tier == "fast"
+    tiers = [c.kwargs["tier"] for c in mock_llm.prepare.call_args_list]
+    assert tiers == ["fast", "thorough"]
+
+
+@pytest.mark.asyncio
+async def test_process_candidate_fans_one_call_out_per_application(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    settings.multi_vacancy_max = 2
+    mock_llm.prepare = MagicMock(
+        side_effect=lambda candidate, vacancy, *args, **kwargs: MagicMock(
+            fingerprint=f"fp-{len(mock_llm.prepare.call_args_list)}"
+        )
+    )
+    mock_llm.prepare_vacancies = MagicMock()
+    mock_llm.score_multi.return_value = (
+        {
+            "vac-2": LLMScoringResponse(score=40, reasoning="Weak fit."),
+            "vac-3": LLMScoringResponse(score=90, reasoning="Strong fit."),
+        },
+        {"prompt_tokens": 901, "completion_tokens": 100, "total_tokens": 1001},
+    )
+    score_cache = AsyncMock()
+    # vac-1 was scored before
+    score_cache.get.side_effect = [MagicMock(score=81, reasoning="Seen before."), None, None, None]
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        score_cache=score_cache,
+    )
+    applications = [
+        CandidateApplication(application_id=f"app-{v}", vacancy_reference_id=f"vac-{v}")
+        for v in (1, 2, 3, 4)
+    ]
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        results = await service.process_candidate("ws-1", "cand-1", applications)
+
+    assert [(r.application_id, r.score) for r in results] == [
+        ("app-1", 81), ("app-2", 40), ("app-3", 90), ("app-4", 65)
+    ]
+    assert [r.input_fingerprint for r in results] == ["fp-1", "fp-2", "fp-3", "fp-4"]
+    assert results[0].cache_hit and results[0].tokens == {}
+    # The candidate is read once; vac-2 and vac-3 share a call, vac-4 goes alone
+    mock_repo.get_candidate.assert_awaited_once_with("ws-1", "cand-1")
+    mock_llm.score_multi.assert_awaited_once()
+    assert list(mock_llm.prepare_vacancies.call_args.args[1]) == ["vac-2", "vac-3"]
+    mock_llm.score_candidate.assert_awaited_once()
+    assert results[1].tokens == {"prompt_tokens": 451, "completion_tokens": 50, "total_tokens": 501}
+    assert results[2].tokens == {"prompt_tokens": 450, "completion_tokens": 50, "total_tokens": 500}
+    mock_repo.save_scoring_results.assert_awaited_once_with(results)
+    assert score_cache.put.await_count == 3
+    assert mock_publisher.publish.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_process_micro_batches_only_in_configured_lanes(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    settings.microbatch_lanes = ["event"]
+    batcher = AsyncMock()
+    batcher.score.return_value = (LLMScoringResponse(score=77, reasoning="Batched."), {})
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        batcher=batcher,
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ):
+        batched = await service.process("app-1", "cand-1", "vac-1", "ws-1", lane="event")
+        direct = await service.process("app-2", "cand-1", "vac-1", "ws-1", lane="interactive")
+
+    assert (batched.score, direct.score) == (77, 65)
+    batcher.score.assert_awaited_once()
+    mock_llm.score_candidate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_process_caps_the_tier_past_the_soft_budget(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    usage = AsyncMock()
+    usage.record = MagicMock()
+    usage.budget_state.return_value = "soft"
+    service = ScoringService(
+        repo=mock_repo, llm=mock_llm, publisher=mock_publisher, settings=settings, usage=usage
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ), patch("scoring.services.scoring.record_budget_action") as record_budget:
+        result = await service.process("app-1", "cand-1", "vac-1", "ws-1", tier="thorough")
+
+    assert result.tier == settings.usage_soft_budget_tier == "fast"
+    record_budget.assert_called_once_with("ws-1", "downgraded")
+    usage.record.assert_called_once_with("ws-1", settings.gemini_model, result.tokens)
+
+
+@pytest.mark.asyncio
+async def test_process_defers_model_calls_past_the_hard_budget(
+    mock_repo, mock_llm, mock_publisher, settings
+):
+    usage = AsyncMock()
+    usage.record = MagicMock()
+    usage.budget_state.return_value = "hard"
+    score_cache = AsyncMock()
+    score_cache.get.side_effect = [MagicMock(score=81, reasoning="Seen before."), None, None]
+    service = ScoringService(
+        repo=mock_repo,
+        llm=mock_llm,
+        publisher=mock_publisher,
+        settings=settings,
+        score_cache=score_cache,
+        usage=usage,
+    )
+
+    with patch("scoring.services.scoring.record_scoring"), patch(
+        "scoring.services.scoring.record_failure"
+    ), patch("scoring.services.scoring.record_budget_action"):
+        # Cache hits cost nothing and are still served
+        cached = await service.process("app-1", "cand-1", "vac-1", "ws-1", lane="event")
+        with pytest.raises(TokenBudgetExceededError) as exc_info:
+            await service.process("app-2", "cand-1", "vac-1", "ws-1", lane="event")
+        # Recruiters are not deferred by default, only downgraded
+        interactive = await service.process(
+            "app-3", "cand-1", "vac-1", "ws-1", lane="interactive"
+        )
+
+    assert cached.cache_hit is True
+    assert 0 < exc_info.value.retry_after_s <= 24 * 3600
+    assert interactive.tier == "fast"
+    mock_llm.score_candidate.assert_awaited_once()
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from scoring.observability.startup import StartupProfiler
+
+HEAVY_MODULES = [
+    "google.genai",
+    "google.cloud.firestore",
+    "google.cloud.pubsub_v1",
+    "opentelemetry.sdk.trace",
+    "opentelemetry.exporter.cloud_trace",
+    "opentelemetry.exporter.cloud_monitoring",
+]
+
+
+def test_importing_main_defers_heavy_modules():
+    code = (
+        "import sys, scoring.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert out == ""
+
+
+def test_startup_profiler_records_phases():
+    profiler = StartupProfiler(enabled=True)
+
+    assert profiler.timed("double", lambda x: x * 2, 21) == 42
+    profiler.import_module("json")
+    profiler.finish()
+
+    report = profiler.to_dict()
+    assert set(report["phases"]) == {"double", "import json"}
+    assert report["total_ms"] >= 0
+
+
+def test_lifespan_profiles_client_setup(monkeypatch):
+    from scoring.main import app
+
+    monkeypatch.setenv("STARTUP_PROFILE", "true")
+    monkeypatch.setenv("LLM_BACKEND", "simulated")
+    monkeypatch.setenv("OTEL_ENABLED", "false")
+
+    with patch("google.cloud.firestore.AsyncClient") as firestore_client, patch(
+        "scoring.main._create_publisher_client", return_value=MagicMock()
+    ):
+        with TestClient(app):
+            phases = app.state.startup_profile.phases
+
+    firestore_client.assert_called_once_with(project="test-project")
+    assert {
+        "import google.cloud.firestore",
+        "import google.cloud.pubsub_v1",
+        "import google.genai",
+        "firestore_client",
+        "llm_backend",
+        "publisher_client",
+    } <= set(phases)
@@ -0,0 +1,141 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from scoring.config import TokenBudget
+from scoring.models import DailyTokenUsage
+from scoring.services.usage import UsageLedger, capped_tier, token_counts, usage_day
+
+USAGE = {
+    "prompt_tokens": 1000,
+    "completion_tokens": 100,
+    "thinking_tokens": 400,
+    "total_tokens": 1500,
+}
+
+
+@pytest.fixture(autouse=True)
+def _no_metrics():
+    with patch("scoring.services.usage.record_token_usage") as record:
+        yield record
+
+
+@pytest.fixture
+def repo():
+    repo = AsyncMock()
+    repo.get_token_usage.return_value = []
+    return repo
+
+
+def test_token_counts_price_thinking_as_output(settings):
+    counts = token_counts(settings, "gemini-2.5-flash", USAGE)
+    batch = token_counts(settings, "gemini-2.5-flash", USAGE, batch=True)
+    unknown = token_counts(settings, "gemini-next", USAGE)
+
+    assert counts.cost_usd == pytest.approx((1000 * 0.30 + 500 * 2.50) / 1_000_000)
+    assert batch.cost_usd == pytest.approx(counts.cost_usd * settings.usage_batch_discount)
+    assert (unknown.total_tokens, unknown.cost_usd) == (1500, 0.0)
+
+
+def test_capped_tier():
+    assert capped_tier("thorough", "fast") == "fast"
+    assert capped_tier("fast", "standard") == "fast"
+
+
+async def test_flush_adds_one_entry_per_workspace_day_and_model(settings, repo, _no_metrics):
+    ledger = UsageLedger(lambda: repo, settings)
+
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    ledger.record("ws-2", "gemini-2.5-flash", USAGE)
+    # Cache hits spent nothing
+    assert ledger.record("ws-1", "gemini-2.5-flash", {}) is None
+    await ledger.flush()
+    await ledger.flush()
+
+    assert repo.add_token_usage.await_count == 2
+    workspace_id, day, model, counts = repo.add_token_usage.await_args_list[0].args
+    assert (workspace_id, day, model) == ("ws-1", usage_day(), "gemini-2.5-flash")
+    assert (counts.scorings, counts.total_tokens) == (2, 3000)
+    assert _no_metrics.call_count == 3
+
+
+async def test_a_failed_flush_is_retried(settings, repo):
+    repo.add_token_usage.side_effect = [RuntimeError("unavailable"), None]
+    ledger = UsageLedger(lambda: repo, settings)
+
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    await ledger.flush()
+    await ledger.flush()
+
+    assert repo.add_token_usage.await_count == 2
+    assert repo.add_token_usage.await_args.args[3].total_tokens == 1500
+
+
+async def test_budget_state_counts_the_ledger_and_unflushed_usage(settings, repo):
+    settings.usage_budgets = {"ws-1": TokenBudget(soft_tokens=10_000, hard_tokens=12_000)}
+    repo.get_token_usage.return_value = [
+        DailyTokenUsage(workspace_id="ws-1", date=usage_day(), total_tokens=9_000)
+    ]
+    ledger = UsageLedger(lambda: repo, settings)
+
+    assert await ledger.budget_state("ws-1") == "ok"
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    assert await ledger.budget_state("ws-1") == "soft"
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    assert await ledger.budget_state("ws-1") == "hard"
+    # Without a budget nothing is read
+    assert await ledger.budget_state("ws-2") == "ok"
+
+    # Read once, then kept current until usage_refresh_s passes
+    repo.get_token_usage.assert_awaited_once_with("ws-1", [usage_day()])
+
+
+async def test_budget_without_the_ledger_uses_local_usage(settings, repo):
+    settings.usage_ledger_enabled = False
+    settings.usage_default_budget = TokenBudget(hard_tokens=2_000)
+    ledger = UsageLedger(lambda: repo, settings)
+
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    assert await ledger.budget_state("ws-1") == "ok"
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+    assert await ledger.budget_state("ws-1") == "hard"
+    await ledger.flush()
+
+    repo.get_token_usage.assert_not_awaited()
+    repo.add_token_usage.assert_not_awaited()
+
+
+async def test_a_flush_during_a_budget_read_is_counted_once(settings, repo):
+    settings.usage_default_budget = TokenBudget(hard_tokens=2_000)
+    stored = {"tokens": 0}
+    reading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def get_token_usage(workspace_id, days):
+        reading.set()
+        await release.wait()
+        return [
+            DailyTokenUsage(workspace_id=workspace_id, date=days[0], total_tokens=stored["tokens"])
+        ]
+
+    async def add_token_usage(workspace_id, day, model, counts):
+        stored["tokens"] += counts.total_tokens
+
+    repo.get_token_usage.side_effect = get_token_usage
+    repo.add_token_usage.side_effect = add_token_usage
+    ledger = UsageLedger(lambda: repo, settings)
+    ledger.record("ws-1", "gemini-2.5-flash", USAGE)
+
+    state = asyncio.create_task(ledger.budget_state("ws-1"))
+    await reading.wait()
+    flush = asyncio.create_task(ledger.flush())
+    await asyncio.sleep(0)
+    release.set()
+
+    # 1,500 tokens either pending or in the ledger, never both
+    assert await state == "ok"
+    await flush
+    assert stored["tokens"] == 1_500
+    assert await ledger._spent_today("ws-1") == 1_500
@@ -0,0 +1,62 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.api_core import exceptions
+
+from scoring.services.warmup import Warmup, build_warmup
+
+
+@pytest.fixture
+def fast_settings(settings):
+    settings.warmup_timeout_s = 1.0
+    settings.warmup_retry_max_interval_s = 0.01
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_warmup_reports_pending_then_ready(fast_settings):
+    warmup = Warmup({"firestore": AsyncMock(), "gemini": AsyncMock()}, fast_settings)
+
+    report = warmup.report()
+    assert report.status == "warming"
+    assert report.dependencies["firestore"].status == "pending"
+
+    await warmup.run()
+
+    report = warmup.report()
+    assert report.status == "ready"
+    assert report.dependencies["gemini"].status == "ok"
+    assert report.dependencies["gemini"].latency_ms is not None
+    assert report.dependencies["gemini"].attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_warmup_retries_failed_checks(fast_settings, monkeypatch):
+    monkeypatch.setattr("scoring.services.warmup.asyncio.sleep", AsyncMock())
+    check = AsyncMock(side_effect=[RuntimeError("unavailable"), None])
+    warmup = Warmup({"firestore": check}, fast_settings)
+
+    await warmup.run()
+
+    status = warmup.dependencies["firestore"]
+    assert status.status == "ok"
+    assert status.attempts == 2
+    assert status.error is None
+
+
+@pytest.mark.asyncio
+async def test_build_warmup_checks(fast_settings):
+    firestore_client = MagicMock()
+    firestore_client.collection.return_value.document.return_value.get = AsyncMock()
+    publisher_client = MagicMock()
+    publisher_client.topic_path.return_value = "projects/test-project/topics/carv-events-dev"
+    publisher_client.get_topic.side_effect = exceptions.PermissionDenied("no topics.get")
+    llm_backend = AsyncMock()
+
+    warmup = build_warmup(firestore_client, publisher_client, llm_backend, fast_settings)
+    await warmup.run()
+
+    assert warmup.ready
+    firestore_client.collection.assert_called_once_with("Workspaces")
+    publisher_client.get_topic.assert_called_once()
+    llm_backend.warm_up.assert_awaited_once()